@@ -0,0 +1,1056 @@
+#!/usr/bin/env python3
+import argparse
+import heapq
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from campus_navigator_backend import (ROUTING_PROFILES, SEARCH_STATS, DisjointSet, Graph, LocationIndex, RouteTable,
+                                      create_campus_graph)
+from contraction import ContractionHierarchy
+
+
+def generate_campus_city_graph(n_edges: int, seed: int = 0) -> Graph:
+
+    # The real campus graph bolted onto a square street grid, with a sprinkle
+    # of longer "arterial" roads so the graph is not perfectly regular.
+    rnd = random.Random(seed)
+    g, _ = create_campus_graph()
+    side = max(2, int(math.sqrt(n_edges / 2)))
+    for r in range(side):
+        for c in range(side):
+            u = f"C_{r}_{c}"
+            if c + 1 < side:
+                g.add_edge(u, f"C_{r}_{c + 1}", float(rnd.randint(1, 9)))
+            if r + 1 < side:
+                g.add_edge(u, f"C_{r + 1}_{c}", float(rnd.randint(1, 9)))
+    for _ in range(max(0, n_edges - 2 * side * (side - 1))):
+        a = f"C_{rnd.randrange(side)}_{rnd.randrange(side)}"
+        b = f"C_{rnd.randrange(side)}_{rnd.randrange(side)}"
+        if a != b:
+            g.add_edge(a, b, float(rnd.randint(20, 60)))
+    g.add_edge("OutsideArea", "C_0_0", 12.0)
+    return g
+
+
+def generate_grid_graph(n_nodes: int, seed: int = 0) -> Graph:
+
+    rnd = random.Random(seed)
+    side = max(2, int(math.sqrt(n_nodes)))
+    g = Graph(undirected=True)
+    for r in range(side):
+        for c in range(side):
+            u = f"G_{r}_{c}"
+            if c + 1 < side:
+                g.add_edge(u, f"G_{r}_{c + 1}", float(rnd.randint(1, 9)))
+            if r + 1 < side:
+                g.add_edge(u, f"G_{r + 1}_{c}", float(rnd.randint(1, 9)))
+    return g
+
+
+def generate_multi_building_graph(n_nodes: int, floors: int = 4, seed: int = 0) -> Graph:
+
+    # Buildings on a square lot grid; each floor is a k x k corridor grid
+    # with 10 m spacing, floors joined by a stairwell at one corner, and
+    # ground-floor entrances joined by outdoor paths to neighbouring buildings.
+    rnd = random.Random(seed)
+    k = 6
+    per_building = floors * k * k
+    side = max(1, int(math.ceil(math.sqrt(n_nodes / per_building))))
+    lot = k * 10.0 + 40.0
+    g = Graph(undirected=True)
+
+    def node(bx, by, f, r, c):
+        name = f"B{bx}_{by}_F{f}_{r}_{c}"
+        if name not in g.adj:
+            g.add_node(name, pos=(bx * lot + c * 10.0, by * lot + r * 10.0), floor=f)
+        return name
+
+    for bx in range(side):
+        for by in range(side):
+            for f in range(floors):
+                for r in range(k):
+                    for c in range(k):
+                        u = node(bx, by, f, r, c)
+                        if c + 1 < k:
+                            g.add_edge(u, node(bx, by, f, r, c + 1), 10.0 * rnd.uniform(1.0, 1.3))
+                        if r + 1 < k:
+                            g.add_edge(u, node(bx, by, f, r + 1, c), 10.0 * rnd.uniform(1.0, 1.3))
+                if f + 1 < floors:
+                    g.add_edge(node(bx, by, f, 0, 0), node(bx, by, f + 1, 0, 0), 15.0)
+            door = node(bx, by, 0, 0, 0)
+            for nx, ny in ((bx + 1, by), (bx, by + 1)):
+                if nx < side and ny < side:
+                    g.add_edge(door, node(nx, ny, 0, 0, 0), lot * rnd.uniform(1.0, 1.2))
+    return g
+
+
+def generate_random_geometric_graph(n_nodes: int, degree: float = 6.0, seed: int = 0) -> Graph:
+
+    # Points scattered over a square; every pair closer than the radius that
+    # gives the requested mean degree is joined, weighted by its length.
+    # Points are bucketed into radius-sized cells so only neighbouring cells
+    # are compared.
+    rnd = random.Random(seed)
+    side = 1000.0 * math.sqrt(n_nodes / 1000)
+    radius = math.sqrt(degree * side * side / (math.pi * n_nodes))
+    g = Graph(undirected=True)
+    cells: Dict[Tuple[int, int], List[Tuple[str, float, float]]] = {}
+    for i in range(n_nodes):
+        x, y = rnd.uniform(0, side), rnd.uniform(0, side)
+        name = f"R_{i}"
+        g.add_node(name, pos=(x, y))
+        cx, cy = int(x // radius), int(y // radius)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for other, ox, oy in cells.get((cx + dx, cy + dy), ()):
+                    d = math.hypot(x - ox, y - oy)
+                    if d <= radius:
+                        g.add_edge(name, other, d)
+        cells.setdefault((cx, cy), []).append((name, x, y))
+    return g
+
+
+# The 1M-node graphs take minutes to generate and query in pure Python.
+SUITE_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+GENERATORS = {
+    "grid": generate_grid_graph,
+    "geometric": generate_random_geometric_graph,
+    "multi-building": generate_multi_building_graph,
+}
+
+
+def random_pairs(g: Graph, count: int, seed: int = 1) -> List[Tuple[str, str]]:
+
+    rnd = random.Random(seed)
+    nodes = g.nodes()
+    return [(rnd.choice(nodes), rnd.choice(nodes)) for _ in range(count)]
+
+
+def time_calls(fn: Callable, args_list: List[tuple]) -> float:
+
+    t0 = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - t0) / max(1, len(args_list))
+
+
+def dict_dijkstra(adj: Dict[str, List[Tuple[str, float]]], src: str, dst: str) -> Tuple[float, List[str]]:
+
+    # The original dict-of-lists implementation, kept as the baseline.
+    dist = {node: float("inf") for node in adj}
+    prev = {node: None for node in adj}
+    dist[src] = 0.0
+    pq = [(0.0, src)]
+    while pq:
+        d, u = heapq.heappop(pq)
+        if d > dist[u]:
+            continue
+        if u == dst:
+            break
+        for v, w in adj[u]:
+            nd = d + w
+            if nd < dist[v]:
+                dist[v] = nd
+                prev[v] = u
+                heapq.heappush(pq, (nd, v))
+    if dist[dst] == float("inf"):
+        return float("inf"), []
+    path = []
+    cur = dst
+    while cur is not None:
+        path.append(cur)
+        cur = prev[cur]
+    path.reverse()
+    return dist[dst], path
+
+
+def dict_bfs(adj: Dict[str, List[Tuple[str, float]]], start: str) -> List[str]:
+
+    q = deque([start])
+    visited = {start}
+    order = []
+    while q:
+        u = q.popleft()
+        order.append(u)
+        for v, _ in adj[u]:
+            if v not in visited:
+                visited.add(v)
+                q.append(v)
+    return order
+
+
+def sorted_kruskal(g: Graph) -> Tuple[float, List[Tuple[str, str, float]]]:
+
+    # The original full re-sort Kruskal, kept as the baseline.
+    dsu = DisjointSet()
+    for u in g.adj:
+        dsu.make_set(u)
+    mst = []
+    total = 0.0
+    for u, v, w in sorted(g.edges(), key=lambda e: e[2]):
+        if dsu.find(u) != dsu.find(v):
+            dsu.union(u, v)
+            mst.append((u, v, w))
+            total += w
+    return total, mst
+
+
+class RecursiveBST:
+
+    # The original unbalanced BST, kept as the baseline for location search.
+    def __init__(self):
+        self.root = None
+
+    def insert(self, key: str):
+        self.root = self._insert(self.root, key)
+
+    def _insert(self, node, key):
+        if node is None:
+            return [key, None, None]
+        if key < node[0]:
+            node[1] = self._insert(node[1], key)
+        elif key > node[0]:
+            node[2] = self._insert(node[2], key)
+        return node
+
+    def search(self, key: str) -> bool:
+        cur = self.root
+        while cur:
+            if key == cur[0]:
+                return True
+            cur = cur[1] if key < cur[0] else cur[2]
+        return False
+
+
+def bench_compiled_graph(n_edges: int, queries: int = 20) -> dict:
+
+    tracemalloc.start()
+    g = generate_campus_city_graph(n_edges)
+    adj_bytes = tracemalloc.get_traced_memory()[0]
+    t0 = time.perf_counter()
+    cg = g.compile()
+    compile_s = time.perf_counter() - t0
+    csr_bytes = tracemalloc.get_traced_memory()[0] - adj_bytes
+    tracemalloc.stop()
+
+    pairs = random_pairs(g, queries)
+    starts = [(a,) for a, _ in pairs[: max(1, queries // 4)]]
+    return {
+        "nodes": len(cg),
+        "edges": len(cg.targets) // (2 if g.undirected else 1),
+        "adj_bytes": adj_bytes,
+        "csr_bytes": csr_bytes,
+        "csr_array_bytes": cg.nbytes(),
+        "compile_s": compile_s,
+        "dijkstra_dict_s": time_calls(lambda a, b: dict_dijkstra(g.adj, a, b), pairs),
+        "dijkstra_csr_s": time_calls(g.dijkstra, pairs),
+        "bfs_dict_s": time_calls(lambda a: dict_bfs(g.adj, a), starts),
+        "bfs_csr_s": time_calls(g.bfs, starts),
+    }
+
+
+def bench_route_table(sizes: List[int], queries: int = 200) -> List[dict]:
+
+    results = []
+    for n in sizes:
+        g = generate_grid_graph(n)
+        cg = g.compile()
+        t0 = time.perf_counter()
+        table = RouteTable.build(cg)
+        build_s = time.perf_counter() - t0
+        pairs = random_pairs(g, queries)
+        results.append({
+            "nodes": len(cg),
+            "build_s": build_s,
+            "table_bytes": table.nbytes(),
+            "graph_bytes": cg.nbytes(),
+            "dijkstra_s": time_calls(g.dijkstra, pairs),
+            "table_s": time_calls(table.route, pairs),
+        })
+    return results
+
+
+def bench_astar(n_nodes: int, queries: int = 50) -> dict:
+
+    g = generate_multi_building_graph(n_nodes)
+    cg = g.compile()
+    rnd = random.Random(1)
+    pairs = [(rnd.randrange(len(cg)), rnd.randrange(len(cg))) for _ in range(queries)]
+    dijkstra_expanded = sum(cg.astar(s, t, use_heuristic=False)[2] for s, t in pairs)
+    astar_expanded = sum(cg.astar(s, t)[2] for s, t in pairs)
+    bidirectional_expanded = sum(cg.bidirectional_dijkstra(s, t)[2] for s, t in pairs)
+    return {
+        "nodes": len(cg),
+        "dijkstra_expanded": dijkstra_expanded / queries,
+        "astar_expanded": astar_expanded / queries,
+        "bidirectional_expanded": bidirectional_expanded / queries,
+        "dijkstra_s": time_calls(cg.dijkstra, pairs),
+        "astar_s": time_calls(cg.astar, pairs),
+        "bidirectional_s": time_calls(cg.bidirectional_dijkstra, pairs),
+    }
+
+
+def bench_contraction(sizes: List[int], queries: int = 200) -> List[dict]:
+
+    results = []
+    for n in sizes:
+        g = generate_grid_graph(n)
+        cg = g.compile()
+        t0 = time.perf_counter()
+        ch = ContractionHierarchy.build(cg)
+        build_s = time.perf_counter() - t0
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "campus.ch")
+            ch.save(path)
+            t0 = time.perf_counter()
+            ch = ContractionHierarchy.load(path)
+            load_s = time.perf_counter() - t0
+            rnd = random.Random(1)
+            pairs = [(rnd.randrange(len(cg)), rnd.randrange(len(cg))) for _ in range(queries)]
+            results.append({
+                "nodes": len(cg),
+                "build_s": build_s,
+                "load_s": load_s,
+                "index_bytes": os.path.getsize(path),
+                "shortcuts": ch.shortcut_count(),
+                "dijkstra_s": time_calls(cg.dijkstra, pairs),
+                "ch_s": time_calls(ch.query, pairs),
+            })
+            del ch
+    return results
+
+
+def bench_incremental_mst(n_nodes: int, edits: int = 200) -> dict:
+
+    def run(query: Callable[[Graph], object]) -> float:
+        g = generate_grid_graph(n_nodes)
+        query(g)
+        rnd = random.Random(3)
+        nodes = g.nodes()
+        t0 = time.perf_counter()
+        for _ in range(edits):
+            u = rnd.choice(nodes)
+            op = rnd.random()
+            if op < 0.5 and g.adj[u]:
+                g.update_edge(u, rnd.choice(g.adj[u])[0], float(rnd.randint(1, 9)))
+            elif op < 0.75 and g.adj[u]:
+                g.remove_edge(u, rnd.choice(g.adj[u])[0])
+            else:
+                g.add_edge(u, rnd.choice(nodes), float(rnd.randint(1, 9)))
+            query(g)
+        return (time.perf_counter() - t0) / edits
+
+    return {
+        "nodes": n_nodes,
+        "edits": edits,
+        "full_kruskal_s": run(sorted_kruskal),
+        "incremental_s": run(lambda g: g.kruskal_mst()),
+    }
+
+
+def bench_distance_matrix(n_nodes: int, k: int = 20) -> dict:
+
+    g = generate_grid_graph(n_nodes)
+    cg = g.compile()
+    rnd = random.Random(4)
+    nodes = g.nodes()
+    sources = rnd.sample(nodes, k)
+    targets = rnd.sample(nodes, k)
+    pairs = [(cg.index[a], cg.index[b]) for a in sources for b in targets]
+    t0 = time.perf_counter()
+    ch = ContractionHierarchy.build(cg)
+    build_s = time.perf_counter() - t0
+    result = {"nodes": len(cg), "sources": k, "targets": k, "ch_build_s": build_s}
+    for label, fn in (
+        ("per_pair", lambda: [cg.dijkstra(a, b) for a, b in pairs]),
+        ("many_to_many", lambda: g.many_to_many(sources, targets)),
+        ("ch_buckets", lambda: list(ch.iter_many_to_many(sources, targets))),
+    ):
+        t0 = time.perf_counter()
+        fn()
+        result[f"{label}_s"] = time.perf_counter() - t0
+
+    # The same comparison over HTTP on the campus graph: one request per pair
+    # against a single streamed matrix.
+    from web_server import app, navigator
+    client = app.test_client()
+    names = navigator.get_locations()
+    t0 = time.perf_counter()
+    for a in names:
+        for b in names:
+            client.post("/api/shortest-path", json={"start": a, "end": b})
+    result["http_per_pair_s"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    client.post("/api/distance-matrix", json={"sources": names, "targets": names}).get_data()
+    result["http_matrix_s"] = time.perf_counter() - t0
+    result["http_pairs"] = len(names) ** 2
+    return result
+
+
+def bench_concurrency(n_nodes: int, readers: int = 4, duration: float = 5.0) -> dict:
+
+    # Readers run shortest-path queries on snapshots while one writer edits
+    # edges in small batches. Every answer is checked against the snapshot it
+    # came from: the path must exist there and its weights must add up to the
+    # reported distance, and versions seen by a reader must never go back.
+    def edge_weight(cg, u: int, v: int) -> float:
+        return min(w for x, w in cg.neighbors(u) if x == v)
+
+    def reader(g: Graph, seed: int, stop: threading.Event, out: dict):
+        rnd = random.Random(seed)
+        latencies, errors, last = [], 0, -1
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            cg = g.compile()
+            s, t = rnd.randrange(len(cg)), rnd.randrange(len(cg))
+            d, path = cg.dijkstra(s, t)
+            latencies.append(time.perf_counter() - t0)
+            if cg.version < last:
+                errors += 1
+            last = cg.version
+            if path and abs(sum(edge_weight(cg, a, b) for a, b in zip(path, path[1:])) - d) > 1e-6:
+                errors += 1
+        out[seed] = (latencies, errors)
+
+    def writer(g: Graph, stop: threading.Event, counts: list):
+        rnd = random.Random(99)
+        nodes = g.nodes()
+        while not stop.is_set():
+            with g.edit():
+                for _ in range(5):
+                    u = rnd.choice(nodes)
+                    op = rnd.random()
+                    if op < 0.6 and g.adj[u]:
+                        g.update_edge(u, rnd.choice(g.adj[u])[0], float(rnd.randint(1, 9)))
+                    elif op < 0.8 and g.adj[u]:
+                        g.remove_edge(u, rnd.choice(g.adj[u])[0])
+                    else:
+                        g.add_edge(u, rnd.choice(nodes), float(rnd.randint(1, 9)))
+                    counts[0] += 1
+            time.sleep(0.001)
+
+    def run(with_writer: bool) -> dict:
+        g = generate_grid_graph(n_nodes)
+        g.compile()
+        stop = threading.Event()
+        out, counts = {}, [0]
+        threads = [threading.Thread(target=reader, args=(g, i, stop, out)) for i in range(readers)]
+        if with_writer:
+            threads.append(threading.Thread(target=writer, args=(g, stop, counts)))
+        for t in threads:
+            t.start()
+        time.sleep(duration)
+        stop.set()
+        for t in threads:
+            t.join()
+        latencies = sorted(x for lat, _ in out.values() for x in lat)
+        return {
+            "queries": len(latencies),
+            "queries_per_s": len(latencies) / duration,
+            "edits": counts[0],
+            "errors": sum(e for _, e in out.values()),
+            "p50_ms": latencies[len(latencies) // 2] * 1000,
+            "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+            "max_ms": latencies[-1] * 1000,
+        }
+
+    return {"nodes": n_nodes, "readers": readers, "read_only": run(False), "with_edits": run(True)}
+
+
+def bench_dynamic_repair(n_nodes: int, edits: int = 50, trees: int = 16) -> dict:
+
+    # Cached shortest-path trees kept current across single edge edits:
+    # repaired from the change log versus rebuilt from scratch.
+    def run(repair: bool) -> float:
+        g = generate_grid_graph(n_nodes)
+        rnd = random.Random(6)
+        nodes = g.nodes()
+        sources = rnd.sample(nodes, trees)
+        for src in sources:
+            g.shortest_path_tree(src)
+        elapsed = 0.0
+        for _ in range(edits):
+            u = rnd.choice(nodes)
+            if rnd.random() < 0.5:
+                g.update_edge(u, rnd.choice(g.adj[u])[0], float(rnd.randint(1, 9)))
+            elif rnd.random() < 0.5:
+                g.disable_edge(u, rnd.choice(g.adj[u])[0])
+            elif g.disabled:
+                g.enable_edge(*rnd.choice(sorted(g.disabled)))
+            g.compile()
+            t0 = time.perf_counter()
+            if not repair:
+                g._trees.clear()
+            for src in sources:
+                g.shortest_path_tree(src)
+            elapsed += time.perf_counter() - t0
+        return elapsed / edits
+
+    return {
+        "nodes": n_nodes,
+        "trees": trees,
+        "edits": edits,
+        "recompute_s": run(False),
+        "repair_s": run(True),
+    }
+
+
+def bench_parallel(n_nodes: int, sources: int = 64, table_nodes: int = 1600) -> dict:
+
+    # Corridor-closure analysis over a sample of sources and an all-pairs
+    # table build, in process and then on the pool at 1, 2, 4, ... workers
+    # up to the core count. Every parallel result must equal the in-process one.
+    from parallel import ParallelAnalytics, closure_impact_from
+    cg = generate_grid_graph(n_nodes).compile()
+    picked = sorted(random.Random(7).sample(range(len(cg)), min(sources, len(cg))))
+    t0 = time.perf_counter()
+    impact: Dict[Tuple[int, int], List[float]] = {}
+    for s in picked:
+        closure_impact_from(cg, s, impact)
+    expected = {(cg.names[a], cg.names[b]): entry for (a, b), entry in impact.items()}
+    serial_s = time.perf_counter() - t0
+    small = generate_grid_graph(table_nodes).compile()
+    t0 = time.perf_counter()
+    table = RouteTable.build(small)
+    table_serial_s = time.perf_counter() - t0
+
+    cpus = os.cpu_count() or 1
+    runs = []
+    for workers in sorted({1, 2, 4, 8, 16, 32, cpus} & set(range(1, cpus + 1))):
+        t0 = time.perf_counter()
+        with ParallelAnalytics(cg, workers) as pa:
+            startup_s = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            rows = pa.closure_impact(picked)
+            closure_s = time.perf_counter() - t0
+        got = {(r["from"], r["to"]): r for r in rows if r["sources_affected"]}
+        matches = got.keys() == expected.keys() and all(
+            (r["sources_affected"], r["pairs_disconnected"]) == tuple(expected[k][:2])
+            and math.isclose(r["extra_distance"], expected[k][2]) and r["max_detour"] == expected[k][3]
+            for k, r in got.items())
+        with ParallelAnalytics(small, workers) as pa:
+            t0 = time.perf_counter()
+            parallel_table = pa.route_table()
+            table_s = time.perf_counter() - t0
+        matches = matches and parallel_table.dist == table.dist and parallel_table.pred == table.pred
+        runs.append({
+            "workers": workers,
+            "startup_s": startup_s,
+            "closure_s": closure_s,
+            "closure_speedup": serial_s / closure_s,
+            "table_s": table_s,
+            "table_speedup": table_serial_s / table_s,
+            "matches": matches,
+        })
+    return {
+        "nodes": len(cg),
+        "sources": len(picked),
+        "table_nodes": len(small),
+        "cpus": cpus,
+        "closure_serial_s": serial_s,
+        "table_serial_s": table_serial_s,
+        "parallel": runs,
+    }
+
+
+def bench_vectorized(n_nodes: int, sources: int = 64) -> dict:
+
+    # Array backend against the pure-Python loops on the same compiled grid;
+    # each pair must agree exactly (lists versus .tolist()).
+    import vectorized
+    if vectorized.np is None:
+        return {"nodes": n_nodes, "skipped": "NumPy is not installed"}
+    g = generate_grid_graph(n_nodes)
+    cg = g.compile()
+    rnd = random.Random(8)
+    picked = rnd.sample(range(len(cg)), min(sources, len(cg)))
+    edges = [(cg.index[u], cg.index[v]) for u, v, _ in g.edges()]
+    closed = rnd.sample(edges, len(edges) // 50)
+    jobs = {
+        "bfs": lambda fast: vectorized.bfs(cg, picked[0], fast),
+        "levels": lambda fast: vectorized.levels(cg, picked[:8], fast),
+        "hop_matrix": lambda fast: vectorized.hop_matrix(cg, picked, fast),
+        "components": lambda fast: vectorized.components(cg, closed, fast),
+        "distance_matrix": lambda fast: vectorized.distance_matrix(cg, picked[:16], fast),
+    }
+    result = {"nodes": len(cg), "sources": len(picked), "scipy": vectorized.csgraph is not None}
+    vectorized.vector_graph(cg)
+    for name, job in jobs.items():
+        t0 = time.perf_counter()
+        slow = job(False)
+        result[f"{name}_python_s"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        fast = job(True)
+        result[f"{name}_numpy_s"] = time.perf_counter() - t0
+        fast = [a.tolist() for a in fast] if isinstance(fast, tuple) else fast.tolist()
+        result[f"{name}_matches"] = fast == (list(slow) if isinstance(slow, tuple) else slow)
+        result[f"{name}_speedup"] = result[f"{name}_python_s"] / result[f"{name}_numpy_s"]
+    return result
+
+
+def bench_query_latency(n_nodes: int, queries: int = 50,
+                        hops: Tuple[int, ...] = (1, 2, 4, 8, 16, 32, 64, 128, 256)) -> dict:
+
+    # Point-to-point latency against path length on a grid, where a pair
+    # h steps apart is found by walking h grid edges. Compares the default
+    # engine (reused search space + bucket queue), the same search on the
+    # heap, and the original dict-initialising implementation; setup_us is
+    # what allocating fresh dist/prev arrays alone would cost per query.
+    g = generate_grid_graph(n_nodes)
+    cg = g.compile()
+    side = max(2, int(math.sqrt(n_nodes)))
+    adj = {u: list(vs) for u, vs in g.adj.items()}
+    rnd = random.Random(9)
+    n = len(cg)
+    t0 = time.perf_counter()
+    for _ in range(queries):
+        [float("inf")] * n, [-1] * n
+    width = cg.bucket_width()
+    result = {"nodes": n, "bucket_width": width,
+              "setup_us": (time.perf_counter() - t0) / queries * 1e6, "by_hops": []}
+    for h in hops:
+        if h > 2 * (side - 1):
+            break
+        pairs = []
+        while len(pairs) < queries:
+            dr = rnd.randint(max(0, h - side + 1), min(h, side - 1))
+            r, c = rnd.randrange(side - dr), rnd.randrange(side - (h - dr))
+            pairs.append((f"G_{r}_{c}", f"G_{r + dr}_{c + h - dr}"))
+        ids = [(cg.index[a], cg.index[b]) for a, b in pairs]
+        row = {"hops": h, "bucket_us": time_calls(cg.dijkstra, ids) * 1e6}
+        cg._bucket_width = 0
+        row["heap_us"] = time_calls(cg.dijkstra, ids) * 1e6
+        cg._bucket_width = width
+        row["dict_baseline_us"] = time_calls(lambda a, b: dict_dijkstra(adj, a, b), pairs) * 1e6
+        result["by_hops"].append(row)
+    return result
+
+
+def bench_profiles(n_nodes: int, queries: int = 20, tagged: float = 0.1) -> dict:
+
+    # Constrained routing on a multi-building graph where a fraction of the
+    # edges are tagged stairs/outdoor: the one-off cost of building each
+    # profile's view, then per-query time against the plain graph. The view
+    # is a filtered CSR, so a query on it should cost about the same.
+    g = generate_multi_building_graph(n_nodes)
+    rnd = random.Random(5)
+    with g.edit():
+        for u, v, _ in g.edges():
+            if rnd.random() < tagged:
+                g.set_edge_tags(u, v, [rnd.choice(["stairs", "outdoor"])])
+    cg = g.compile()
+    pairs = random_pairs(g, queries)
+    result = {"nodes": len(cg), "edges": len(cg.targets),
+              "plain_query_s": time_calls(g.dijkstra, pairs), "profiles": {}}
+    for name in ("step_free", "sheltered"):
+        profile = ROUTING_PROFILES[name]
+        t0 = time.perf_counter()
+        view = cg.restricted(profile)
+        build = time.perf_counter() - t0
+        result["profiles"][name] = {
+            "view_edges": len(view.targets),
+            "view_build_s": build,
+            "query_s": time_calls(lambda a, b: g.dijkstra(a, b, profile), pairs),
+        }
+    return result
+
+
+def bench_alternatives(n_nodes: int, queries: int = 20, k: int = 3) -> dict:
+
+    # k shortest routes against one point-to-point query, per generated
+    # graph kind, seeded with that query's path as the navigator does. The
+    # ratio is what the extra k - 1 routes cost on top of the first.
+    result = {"k": k, "graphs": {}}
+    for kind in ("grid", "multi-building"):
+        g = GENERATORS[kind](n_nodes)
+        cg = g.compile()
+        ids = [(cg.index[a], cg.index[b]) for a, b in random_pairs(g, queries)]
+        firsts = [cg.dijkstra(s, t)[1] for s, t in ids]
+        single = time_calls(cg.dijkstra, ids)
+        row = {"nodes": len(cg), "single_query_s": single}
+        for label, overlap in (("k_shortest", None), ("overlap_0.8", 0.8)):
+            spent = time_calls(lambda s, t, p: cg.k_shortest(s, t, k, p, overlap),
+                               [(s, t, p) for (s, t), p in zip(ids, firsts)])
+            row[label + "_s"] = spent
+            row[label + "_ratio"] = spent / single if single else 0.0
+        result["graphs"][kind] = row
+    return result
+
+
+def write_graph_files(g: Graph, directory: str) -> Dict[str, str]:
+
+    # The same graph as an edges + nodes CSV pair, JSON Lines, GeoJSON and a
+    # binary snapshot, for the loader benchmarks.
+    paths = {name: os.path.join(directory, name) for name in
+             ("edges.csv", "nodes.csv", "graph.jsonl", "graph.geojson", "graph.cngs")}
+    edges = g.edges()
+    with open(paths["edges.csv"], "w") as f:
+        f.write("from,to,weight\n")
+        for u, v, w in edges:
+            f.write(f"{u},{v},{w}\n")
+    with open(paths["nodes.csv"], "w") as f:
+        f.write("name,x,y,floor\n")
+        for u in g.nodes():
+            x, y = g.pos[u]
+            f.write(f"{u},{x},{y},{g.floor[u]}\n")
+    with open(paths["graph.jsonl"], "w") as f:
+        for u in g.nodes():
+            x, y = g.pos[u]
+            f.write(json.dumps({"name": u, "x": x, "y": y, "floor": g.floor[u]}) + "\n")
+        for u, v, w in edges:
+            f.write(json.dumps({"from": u, "to": v, "weight": w}) + "\n")
+    with open(paths["graph.geojson"], "w") as f:
+        f.write('{"type": "FeatureCollection", "features": [')
+        sep = ""
+        for u in g.nodes():
+            point = {"type": "Feature", "geometry": {"type": "Point", "coordinates": list(g.pos[u])},
+                     "properties": {"name": u, "floor": g.floor[u]}}
+            f.write(sep + json.dumps(point))
+            sep = ","
+        for u, v, w in edges:
+            line = {"type": "Feature", "geometry": {"type": "LineString", "coordinates": [list(g.pos[u]), list(g.pos[v])]},
+                    "properties": {"from": u, "to": v, "weight": w}}
+            f.write(sep + json.dumps(line))
+        f.write("]}")
+    g.save_snapshot(paths["graph.cngs"])
+    return paths
+
+
+def measure_in_subprocess(body: str) -> dict:
+
+    # Runs body in a fresh interpreter so peak RSS belongs to that load only.
+    code = (
+        "import json, resource, sys, time\n"
+        f"sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})\n"
+        "import graph_io\n"
+        "from campus_navigator_backend import Graph\n"
+        "t0 = time.perf_counter()\n"
+        f"{body}\n"
+        "elapsed = time.perf_counter() - t0\n"
+        # ru_maxrss survives exec on Linux (it would report this parent's
+        # peak), so prefer the kernel's per-image high-water mark.
+        "try:\n"
+        "    peak = next(int(l.split()[1]) for l in open('/proc/self/status') if l.startswith('VmHWM'))\n"
+        "except OSError:\n"
+        "    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+        "print(json.dumps({'load_s': elapsed, 'peak_rss_kb': peak}))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def bench_loading(n_nodes: int) -> dict:
+
+    g = generate_multi_building_graph(n_nodes)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_graph_files(g, tmp)
+        sizes = {name: os.path.getsize(path) for name, path in paths.items()}
+        # The current construction path: the whole edge list in memory (as
+        # create_campus_graph's literal list is), then add_edge per tuple.
+        in_memory = (
+            "import csv\n"
+            f"rows = list(csv.reader(open({paths['nodes.csv']!r})))[1:]\n"
+            f"edges = [(u, v, float(w)) for u, v, w in list(csv.reader(open({paths['edges.csv']!r})))[1:]]\n"
+            "g = Graph()\n"
+            "for name, x, y, floor in rows:\n"
+            "    g.add_node(name, (float(x), float(y)), int(floor))\n"
+            "for u, v, w in edges:\n"
+            "    g.add_edge(u, v, w)\n"
+            "g.compile()"
+        )
+        result = {
+            "nodes": len(g.nodes()),
+            "edges": len(g.edges()),
+            "file_bytes": sizes,
+            "interpreter": measure_in_subprocess("pass"),
+            "edge_list": measure_in_subprocess(in_memory),
+            "csv": measure_in_subprocess(
+                f"graph_io.load_csv({paths['edges.csv']!r}, {paths['nodes.csv']!r})"),
+            "jsonl": measure_in_subprocess(f"graph_io.load_jsonl({paths['graph.jsonl']!r})"),
+            "geojson": measure_in_subprocess(f"graph_io.load_geojson({paths['graph.geojson']!r})"),
+            # Startup with a snapshot is the mmap plus the first query.
+            "snapshot": measure_in_subprocess(
+                f"g = Graph.from_snapshot({paths['graph.cngs']!r})\n"
+                "names = g.nodes()\n"
+                "g.dijkstra(names[0], names[-1])"),
+        }
+    return result
+
+
+def bench_graph(g: Graph, queries: int = 20) -> dict:
+
+    # Every public Graph algorithm on one graph. compile_s is the one-off CSR
+    # build that the first query would otherwise absorb.
+    t0 = time.perf_counter()
+    g.compile()
+    compile_s = time.perf_counter() - t0
+    pairs = random_pairs(g, queries)
+    starts = [(a,) for a, _ in pairs[: max(1, queries // 4)]]
+    result = {
+        "nodes": len(g.nodes()),
+        "compile_s": compile_s,
+        "dijkstra_s": time_calls(g.dijkstra, pairs),
+        "bidirectional_s": time_calls(g.bidirectional_dijkstra, pairs),
+        "bfs_s": time_calls(g.bfs, starts),
+        "dfs_s": time_calls(g.dfs, starts),
+        "shortest_path_tree_s": time_calls(g.shortest_path_tree, starts),
+    }
+    if g.has_coordinates():
+        result["astar_s"] = time_calls(g.astar, pairs)
+    t0 = time.perf_counter()
+    result["edge_count"] = len(g.edges())
+    result["edges_s"] = time.perf_counter() - t0
+    g._mst = None
+    g._published.pop("mst", None)
+    t0 = time.perf_counter()
+    g.kruskal_mst()
+    result["kruskal_mst_s"] = time.perf_counter() - t0
+    return result
+
+
+def bench_campus(queries: int = 200) -> dict:
+
+    # The real campus graph: construction, the algorithms, the location index.
+    t0 = time.perf_counter()
+    for _ in range(queries):
+        g, locations = create_campus_graph()
+    result = {"create_campus_graph_s": (time.perf_counter() - t0) / queries}
+    result.update(bench_graph(g, queries))
+    names = g.nodes()
+    probes = [(name,) for name in names] + [("Nowhere",)]
+    index = LocationIndex()
+    t0 = time.perf_counter()
+    for name in names:
+        index.insert(name)
+    index.inorder()
+    result["index_insert_s"] = (time.perf_counter() - t0) / len(names)
+    result["index_search_s"] = time_calls(locations.search, probes)
+    result["index_inorder_s"] = time_calls(locations.inorder, [()] * queries)
+    return result
+
+
+def bench_api(queries: int = 200) -> dict:
+
+    # Mean latency per request for every route, through Flask's test client
+    # (routing, JSON encoding and the navigator, without a socket).
+    from web_server import app, navigator
+    client = app.test_client()
+    names = navigator.get_locations()
+    rnd = random.Random(7)
+    pick = lambda: rnd.choice(names)
+    edges = navigator.graph.edges()
+
+    def toggle_edge():
+        # Closes and reopens one edge in a single batch: the graph ends up
+        # unchanged, but every cached route is invalidated.
+        u, v, _ = rnd.choice(edges)
+        return client.post("/api/edges", json={"edits": [
+            {"from": u, "to": v, "action": "disable"},
+            {"from": u, "to": v, "action": "enable"},
+        ]})
+
+    # Label -> (route rule, request). The edit runs last so its cache
+    # invalidation does not slow the routes timed before it.
+    requests = {
+        "shortest-path": ("/api/shortest-path", lambda: client.post("/api/shortest-path", json={"start": pick(), "end": pick()})),
+        "distance-matrix": ("/api/distance-matrix", lambda: client.post("/api/distance-matrix", json={"sources": rnd.sample(names, 5)}).get_data()),
+        "traverse": ("/api/traverse", lambda: client.post("/api/traverse", json={"algorithm": "dijkstra", "start": pick(), "max_hops": 4}).get_data()),
+        "routes-from": ("/api/routes-from/<start>", lambda: client.get(f"/api/routes-from/{pick()}")),
+        "profiles": ("/api/profiles", lambda: client.get("/api/profiles")),
+        "locations": ("/api/locations", lambda: client.get("/api/locations")),
+        "search": ("/api/search/<location>", lambda: client.get(f"/api/search/{pick()}")),
+        "autocomplete": ("/api/autocomplete", lambda: client.get(f"/api/autocomplete?q={pick()[:3]}")),
+        "cache-stats": ("/api/cache-stats", lambda: client.get("/api/cache-stats")),
+        "bfs": ("/api/algorithm", lambda: client.post("/api/algorithm", json={"algorithm": "bfs", "start": pick(), "destination": pick()})),
+        "dfs": ("/api/algorithm", lambda: client.post("/api/algorithm", json={"algorithm": "dfs", "start": pick()})),
+        "mst": ("/api/algorithm", lambda: client.post("/api/algorithm", json={"algorithm": "mst"})),
+        "edges-disabled": ("/api/edges/disabled", lambda: client.get("/api/edges/disabled")),
+        "metrics": ("/api/metrics", lambda: client.get("/api/metrics")),
+        "healthz": ("/healthz", lambda: client.get("/healthz")),
+        "edges-edit": ("/api/edges", toggle_edge),
+    }
+    # A route added to the server without a request here fails the run
+    # instead of silently going unmeasured.
+    missing = {rule.rule for rule in app.url_map.iter_rules() if rule.endpoint != "static"} - {
+        rule for rule, _ in requests.values()}
+    if missing:
+        raise ValueError("bench_api does not cover: " + ", ".join(sorted(missing)))
+    return {f"{name}_s": time_calls(fn, [()] * queries) for name, (_, fn) in requests.items()}
+
+
+def run_suite(sizes: List[int], queries: int = 20, kinds: Optional[List[str]] = None) -> dict:
+
+    # The full regression suite: campus graph, API routes and every generator
+    # at every size. Written as one JSON document so two runs can be diffed
+    # with compare_results.
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    result = {
+        "meta": {
+            "commit": commit,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "queries": queries,
+        },
+        "campus": bench_campus(max(queries, 100)),
+        "api": bench_api(max(queries, 100)),
+        "generated": {},
+    }
+    for kind in kinds or list(GENERATORS):
+        for n in sizes:
+            t0 = time.perf_counter()
+            g = GENERATORS[kind](n)
+            entry = {"generate_s": time.perf_counter() - t0}
+            entry.update(bench_graph(g, queries))
+            result["generated"][f"{kind}-{n}"] = entry
+            del g
+    return result
+
+
+def compare_results(old: dict, new: dict, prefix: str = "") -> List[Tuple[str, float, float, float]]:
+
+    # (metric, old, new, new / old) for every timing present in both runs.
+    rows = []
+    for key, value in new.items():
+        if key == "meta" or key not in old:
+            continue
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and isinstance(old[key], dict):
+            rows.extend(compare_results(old[key], value, name + "."))
+        elif key.endswith("_s") and isinstance(value, (int, float)) and old[key]:
+            rows.append((name, old[key], value, value / old[key]))
+    return rows
+
+
+def bench_instrumentation(n_nodes: int, queries: int = 20, repeats: int = 5) -> dict:
+
+    # Search cost with SEARCH_STATS off and on (best of several rounds, to
+    # keep scheduler noise out of a few-percent difference), plus the cost
+    # of one latency histogram observation.
+    from metrics import LatencyHistograms
+    g = generate_grid_graph(n_nodes)
+    g.compile()
+    pairs = random_pairs(g, queries)
+    starts = [(a,) for a, _ in pairs[: max(1, queries // 4)]]
+    was_enabled = SEARCH_STATS.enabled
+    result = {"nodes": n_nodes}
+    for name, fn, args in (("dijkstra", g.dijkstra, pairs), ("bfs", g.bfs, starts), ("dfs", g.dfs, starts)):
+        for label, enabled in (("off", False), ("on", True)):
+            SEARCH_STATS.enabled = enabled
+            result[f"{name}_{label}_s"] = min(time_calls(fn, args) for _ in range(repeats))
+        result[f"{name}_overhead"] = result[f"{name}_on_s"] / result[f"{name}_off_s"] - 1
+    SEARCH_STATS.enabled = was_enabled
+    SEARCH_STATS.reset()
+    histograms = LatencyHistograms()
+    samples = [(random.random() * 0.1,) for _ in range(100_000)]
+    result["histogram_observe_s"] = time_calls(lambda x: histograms.observe("/api/shortest-path", "POST", 200, x), samples)
+    return result
+
+
+def bench_location_index(n: int = 100_000, queries: int = 10_000) -> dict:
+
+    rnd = random.Random(0)
+    names = [f"Building{i // 40:05d}_Room{i % 40:02d}" for i in range(n)]
+    shuffled = names[:]
+    rnd.shuffle(shuffled)
+    probes = [(rnd.choice(names),) for _ in range(queries)] + [(f"Missing{i}",) for i in range(queries)]
+    result = {"locations": n}
+    for label, order in (("sorted", names), ("random", shuffled)):
+        index = LocationIndex()
+        t0 = time.perf_counter()
+        for name in order:
+            index.insert(name)
+        index.inorder()
+        result[f"index_build_{label}_s"] = time.perf_counter() - t0
+        result[f"index_search_{label}_s"] = time_calls(index.search, probes)
+    t0 = time.perf_counter()
+    index.inorder()
+    result["index_inorder_s"] = time.perf_counter() - t0
+    # The recursive BST only survives random insertion order at this size;
+    # sorted input recurses once per key and overflows the stack.
+    bst = RecursiveBST()
+    t0 = time.perf_counter()
+    for name in shuffled:
+        bst.insert(name)
+    result["bst_build_random_s"] = time.perf_counter() - t0
+    result["bst_search_random_s"] = time_calls(bst.search, probes)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("suite", nargs="?", default="compiled", choices=["compiled", "route-table", "astar", "contraction", "locations", "mst", "distance-matrix", "concurrency", "repair", "loading", "metrics", "parallel", "vectorized", "latency", "profiles", "alternatives", "all"])
+    parser.add_argument("--edges", type=int, default=1_000_000, help="Edges in the synthetic graph")
+    parser.add_argument("--nodes", type=int, default=50_000, help="Nodes in the multi-building graph")
+    parser.add_argument("--locations", type=int, default=100_000, help="Locations in the search index")
+    parser.add_argument("--sizes", type=int, nargs="+", help="Node counts to sweep")
+    parser.add_argument("--queries", type=int, default=20, help="Queries per measurement")
+    parser.add_argument("--kinds", nargs="+", choices=sorted(GENERATORS), help="Generated graph kinds for the full suite")
+    parser.add_argument("--output", metavar="PATH", help="Also write the JSON result to PATH")
+    parser.add_argument("--compare", metavar="PATH", help="Print timing ratios against an earlier --output file")
+    args = parser.parse_args()
+
+    if args.suite == "all":
+        result = run_suite(args.sizes or SUITE_SIZES, args.queries, args.kinds)
+    elif args.suite == "compiled":
+        result = bench_compiled_graph(args.edges, args.queries)
+    elif args.suite == "route-table":
+        result = bench_route_table(args.sizes or [100, 400, 900, 1600], args.queries)
+    elif args.suite == "astar":
+        result = bench_astar(args.nodes, args.queries)
+    elif args.suite == "mst":
+        result = bench_incremental_mst(args.nodes, args.queries)
+    elif args.suite == "distance-matrix":
+        result = bench_distance_matrix(args.nodes, args.queries)
+    elif args.suite == "concurrency":
+        result = bench_concurrency(args.nodes)
+    elif args.suite == "repair":
+        result = bench_dynamic_repair(args.nodes, args.queries)
+    elif args.suite == "loading":
+        result = bench_loading(args.nodes)
+    elif args.suite == "metrics":
+        result = bench_instrumentation(args.nodes, args.queries)
+    elif args.suite == "latency":
+        result = bench_query_latency(args.sizes[0] if args.sizes else 100_000, args.queries)
+    elif args.suite == "alternatives":
+        result = bench_alternatives(args.nodes, args.queries)
+    elif args.suite == "profiles":
+        result = bench_profiles(args.nodes, args.queries)
+    elif args.suite == "vectorized":
+        result = bench_vectorized(args.nodes, args.queries)
+    elif args.suite == "parallel":
+        # Closure analysis re-routes every subtree of every sampled source,
+        # so it gets a smaller default graph than --nodes.
+        result = bench_parallel(args.sizes[0] if args.sizes else 2500, args.queries)
+    elif args.suite == "locations":
+        result = bench_location_index(args.locations)
+    else:
+        # Preprocessing is pure Python; the 1M-node run takes a long while.
+        result = bench_contraction(args.sizes or [10_000, 100_000, 1_000_000], args.queries)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            for name, before, after, ratio in compare_results(json.load(f), result):
+                print(f"{name:60s} {before:12.6f} {after:12.6f} {ratio:6.2f}x")
+    mismatched = [name for name, value in result.items() if name.endswith("_matches") and value is False]
+    if mismatched:
+        sys.exit("Backends disagree: " + ", ".join(mismatched))
\ No newline at end of file
@@ -1,8 +1,21 @@
 #!/usr/bin/env python3
+import bisect
+import hashlib
 import heapq
-from collections import deque
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Iterable, Iterator, List, Optional, Tuple
 import argparse
 
 class DisjointSet:
@@ -34,30 +47,399 @@ class DisjointSet:
             self.rank[rx] += 1
         return True
 
+class SearchStats:
+
+    # Process-wide counters for the graph searches, off by default. While
+    # disabled a search pays one attribute check; enabled, Graph passes a
+    # counter list down to the CSR search, which then swaps its heap
+    # functions for counting wrappers. Totals per algorithm are
+    # [calls, nodes settled, edges relaxed, heap pushes, seconds].
+
+    FIELDS = ("calls", "settled", "relaxed", "pushes", "seconds")
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._totals: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, algorithm: str, seconds: float, settled: int = 0, relaxed: int = 0, pushes: int = 0):
+        
+        with self._lock:
+            totals = self._totals.setdefault(algorithm, [0, 0, 0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += settled
+            totals[2] += relaxed
+            totals[3] += pushes
+            totals[4] += seconds
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        
+        with self._lock:
+            return {name: dict(zip(self.FIELDS, totals)) for name, totals in sorted(self._totals.items())}
+
+    def reset(self):
+        
+        with self._lock:
+            self._totals.clear()
+
+SEARCH_STATS = SearchStats(os.environ.get("CAMPUS_NAV_METRICS") == "1")
+
 class Graph:
+
+    # Concurrency: writers serialise on _lock and mutate adj in place; readers
+    # never touch adj and instead run on the immutable CompiledGraph snapshot,
+    # which is swapped in atomically once rebuilt. A reader that finds the
+    # snapshot stale while a writer holds the lock keeps using the previous
+    # snapshot rather than waiting, so queries never block on edits.
+    #
+    # Every edge change is also appended to a bounded change log so cached
+    # shortest-path trees (and the navigator's route table) can be repaired
+    # for the edges that changed instead of being recomputed from scratch.
+
+    TREE_CACHE_SIZE = 64
+    CHANGE_LOG_LIMIT = 10_000
    
     def __init__(self, undirected: bool = True):
-        self.adj: Dict[str, List[Tuple[str, float]]] = {}
+        self._adj: Optional[Dict[str, List[Tuple[str, float]]]] = {}
         self.undirected = undirected
+        # Bumped on every mutation so derived structures know when they are stale.
+        self.version = 0
+        # Bumped only when a node is added, for structures keyed on names.
+        self.node_version = 0
+        self._compiled: Optional["CompiledGraph"] = None
+        self._trees: "OrderedDict[str, ShortestPathTree]" = OrderedDict()
+        self._trees_lock = threading.Lock()
+        # (first version the log covers, [(version, u, v, old_w, new_w)]);
+        # v is None for a node addition, inf stands for an absent edge.
+        self._log: Tuple[int, List[Tuple]] = (0, [])
+        # Edges switched off with disable_edge, by (u, v), for enable_edge.
+        self.disabled: Dict[Tuple[str, str], List[float]] = {}
+        # Optional planar coordinates and floor numbers, used by astar.
+        self.pos: Dict[str, Tuple[float, float]] = {}
+        self.floor: Dict[str, int] = {}
+        # Edge attributes for routing profiles, by (u, v) and, for undirected
+        # graphs, (v, u) too; they cover every parallel u -> v edge and
+        # outlive disable_edge. Hours are (open, close) minutes of the day.
+        self.edge_tags: Dict[Tuple[str, str], FrozenSet[str]] = {}
+        self.edge_hours: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        self._mst: Optional["IncrementalMST"] = None
+        # Whole-graph results (edge list, MST) by name, as (version, result).
+        self._published: Dict[str, Tuple[int, Any]] = {}
+        self._lock = threading.RLock()
+        self._edit_depth = 0
 
-    def add_node(self, u: str):
+    @classmethod
+    def from_snapshot(cls, path: str) -> "Graph":
         
-        self.adj.setdefault(u, [])
+        # Memory-maps a snapshot written by save_snapshot. Queries run on the
+        # mapped CSR straight away; the adjacency dicts are only rebuilt the
+        # first time something reads adj or edits the graph.
+        cg = CompiledGraph.load(path)
+        graph = cls(undirected=cg.undirected)
+        graph._adj = None
+        graph._compiled = cg
+        return graph
+
+    def save_snapshot(self, path: str):
+        
+        self.compile().save(path)
+
+    @property
+    def adj(self) -> Dict[str, List[Tuple[str, float]]]:
+        adj = self._adj
+        if adj is None:
+            with self._lock:
+                if self._adj is None:
+                    self._materialise()
+                adj = self._adj
+        return adj
+
+    def _materialise(self):
+        # Rebuilds adj, pos, floor and the edge attributes from a
+        # snapshot-backed compiled graph.
+        cg = self._compiled
+        names, offsets, targets, weights = cg.names, cg.offsets, cg.targets, cg.weights
+        self._adj = {
+            name: [(names[targets[i]], weights[i]) for i in range(offsets[u], offsets[u + 1])]
+            for u, name in enumerate(names)
+        }
+        if cg.xs is not None:
+            self.pos = {name: (cg.xs[u], cg.ys[u]) for u, name in enumerate(names)}
+        if cg.floors is not None:
+            self.floor = {name: cg.floors[u] for u, name in enumerate(names)}
+        if cg.edge_tags is not None:
+            for u, name in enumerate(names):
+                for i in range(offsets[u], offsets[u + 1]):
+                    if cg.edge_tags[i]:
+                        self.edge_tags[(name, names[targets[i]])] = cg.tags_of(i)
+        for i, hours in cg.edge_hours.items():
+            u = bisect.bisect_right(offsets, i) - 1
+            self.edge_hours[(names[u], names[targets[i]])] = hours
+
+    def add_node(self, u: str, pos: Optional[Tuple[float, float]] = None, floor: Optional[int] = None):
+        
+        with self._lock:
+            if u not in self.adj:
+                self.adj[u] = []
+                self.version += 1
+                self.node_version += 1
+                self._record(u, None, 0.0, 0.0)
+                if self._mst is not None:
+                    self._mst.add_node(u)
+            if pos is not None and self.pos.get(u) != pos:
+                self.pos[u] = (float(pos[0]), float(pos[1]))
+                self.version += 1
+            if floor is not None and self.floor.get(u) != floor:
+                self.floor[u] = int(floor)
+                self.version += 1
+
+    def has_coordinates(self) -> bool:
+        
+        if self._adj is None:
+            return self._compiled.xs is not None
+        return bool(self._adj) and len(self.pos) == len(self._adj)
 
     def add_edge(self, u: str, v: str, w: float):
         
-        self.add_node(u)
-        self.add_node(v)
-        self.adj[u].append((v, w))
-        if self.undirected:
-            self.adj[v].append((u, w))
+        with self._lock:
+            self.add_node(u)
+            self.add_node(v)
+            self.adj[u].append((v, w))
+            if self.undirected:
+                self.adj[v].append((u, w))
+            self.version += 1
+            self._record(u, v, float("inf"), w)
+            if self._mst is not None:
+                self._mst.add_edge(u, v, w)
+
+    def _find_edge(self, u: str, v: str) -> Tuple[int, int]:
+        # Index of the first u -> v entry in adj[u] and, for undirected
+        # graphs, of its mirror in adj[v] (-1 when absent).
+        nbrs = self.adj.get(u, [])
+        i = next((k for k, (x, _) in enumerate(nbrs) if x == v), -1)
+        if i < 0 or not self.undirected:
+            return i, -1
+        w = nbrs[i][1]
+        skip = i if u == v else -1
+        j = next((k for k, (x, y) in enumerate(self.adj[v]) if x == u and y == w and k != skip), -1)
+        return i, j
+
+    def remove_edge(self, u: str, v: str) -> bool:
+        
+        with self._lock:
+            i, j = self._find_edge(u, v)
+            if i < 0:
+                return False
+            if self.undirected and u == v and j < i:
+                i, j = j, i
+            w = self.adj[u][i][1]
+            del self.adj[u][i]
+            if self.undirected:
+                del self.adj[v][j - (u == v)]
+            self.version += 1
+            self._record(u, v, w, float("inf"))
+            if self._mst is not None:
+                self._mst.remove_edge(u, i, v, j - (u == v))
+            return True
+
+    def update_edge(self, u: str, v: str, w: float) -> bool:
+        
+        with self._lock:
+            i, j = self._find_edge(u, v)
+            if i < 0:
+                return False
+            old = self.adj[u][i][1]
+            self.adj[u][i] = (v, w)
+            if self.undirected:
+                self.adj[v][j] = (u, w)
+            self.version += 1
+            self._record(u, v, old, w)
+            if self._mst is not None:
+                self._mst.update_edge(u, i, w)
+            return True
+
+    def disable_edge(self, u: str, v: str) -> bool:
+        
+        # Takes every u -> v edge out of service (closed corridor, broken
+        # lift) but remembers the weights so enable_edge can put them back.
+        with self._lock:
+            weights = []
+            while True:
+                i, _ = self._find_edge(u, v)
+                if i < 0:
+                    break
+                weights.append(self.adj[u][i][1])
+                self.remove_edge(u, v)
+            if not weights:
+                return False
+            self.disabled.setdefault((u, v), []).extend(weights)
+            return True
+
+    def enable_edge(self, u: str, v: str) -> bool:
+        
+        with self._lock:
+            key = (u, v)
+            if key not in self.disabled and self.undirected:
+                key = (v, u)
+            weights = self.disabled.pop(key, None)
+            if not weights:
+                return False
+            for w in weights:
+                self.add_edge(key[0], key[1], w)
+            return True
+
+    def set_edge_tags(self, u: str, v: str, tags: Iterable[str]) -> bool:
+        
+        # Replaces the tags on u -> v ("stairs", "outdoor", ...). Weights are
+        # unchanged, so nothing goes into the change log.
+        with self._lock:
+            if self._find_edge(u, v)[0] < 0:
+                return False
+            tags = frozenset(tags)
+            for key in ((u, v), (v, u)) if self.undirected else ((u, v),):
+                if tags:
+                    self.edge_tags[key] = tags
+                else:
+                    self.edge_tags.pop(key, None)
+            self.version += 1
+            return True
+
+    def set_edge_hours(self, u: str, v: str, hours: Optional[Tuple[int, int]]) -> bool:
+        
+        # Opens u -> v only from hours[0] until hours[1] (minutes of the day;
+        # a window may run past midnight), or always with hours=None.
+        with self._lock:
+            if self._find_edge(u, v)[0] < 0:
+                return False
+            for key in ((u, v), (v, u)) if self.undirected else ((u, v),):
+                if hours is None:
+                    self.edge_hours.pop(key, None)
+                else:
+                    self.edge_hours[key] = (int(hours[0]) % 1440, int(hours[1]) % 1440)
+            self.version += 1
+            return True
+
+    def _record(self, u: str, v: Optional[str], old: float, new: float):
+        # Called with the lock held, right after the version bump.
+        start, entries = self._log
+        entries.append((self.version, u, v, old, new))
+        if len(entries) > 2 * self.CHANGE_LOG_LIMIT:
+            dropped = entries[-self.CHANGE_LOG_LIMIT - 1][0]
+            self._log = (dropped, entries[-self.CHANGE_LOG_LIMIT:])
+
+    def edge_changes(self, since: int, cg: "CompiledGraph") -> Optional[List[Tuple[int, int, float, float]]]:
+        
+        # Directed (u, v, old_w, new_w) changes, as node indices of cg, made
+        # after version since up to cg's version. None when they cannot be
+        # replayed: the log no longer reaches back that far or nodes were added.
+        start, entries = self._log
+        if since < start:
+            return None
+        index = cg.index
+        changes = []
+        for version, u, v, old, new in entries[:]:
+            if version <= since or version > cg.version:
+                continue
+            if v is None:
+                return None
+            a, b = index[u], index[v]
+            changes.append((a, b, old, new))
+            if self.undirected:
+                changes.append((b, a, old, new))
+        return changes
+
+    def _cached_tree(self, cg: "CompiledGraph", src: str) -> Optional["ShortestPathTree"]:
+        # The cached tree for src at cg's version, repaired from an older
+        # version when only edge weights have changed since.
+        with self._trees_lock:
+            tree = self._trees.get(src)
+            if tree is not None:
+                self._trees.move_to_end(src)
+        if tree is None or tree.version == cg.version:
+            return tree
+        if tree.version > cg.version:
+            return None
+        changes = self.edge_changes(tree.version, cg)
+        if changes is None:
+            return None
+        tree = tree.repaired(cg, changes)
+        self._store_tree(tree)
+        return tree
+
+    def _store_tree(self, tree: "ShortestPathTree"):
+        with self._trees_lock:
+            current = self._trees.get(tree.source)
+            if current is None or current.version <= tree.version:
+                self._trees[tree.source] = tree
+                self._trees.move_to_end(tree.source)
+            while len(self._trees) > self.TREE_CACHE_SIZE:
+                self._trees.popitem(last=False)
+
+    @contextmanager
+    def edit(self):
+        
+        # Groups several mutations into one atomic change: readers keep the
+        # old snapshot until the block exits, then see all edits at once.
+        with self._lock:
+            self._edit_depth += 1
+            try:
+                yield self
+            finally:
+                self._edit_depth -= 1
+                if self._edit_depth == 0:
+                    self.compile()
+
+    def compile(self) -> "CompiledGraph":
+        
+        compiled = self._compiled
+        if compiled is not None and compiled.version == self.version:
+            return compiled
+        if compiled is None:
+            self._lock.acquire()
+        elif not self._lock.acquire(blocking=False):
+            # A writer is mid-edit; serve the last consistent snapshot.
+            return compiled
+        try:
+            compiled = self._compiled
+            if compiled is None or compiled.version != self.version:
+                compiled = CompiledGraph(self)
+                self._compiled = compiled
+            return compiled
+        finally:
+            self._lock.release()
 
     def nodes(self) -> List[str]:
         
-        return list(self.adj.keys())
+        if self._adj is None:
+            return list(self._compiled.names)
+        return list(self._adj.keys())
+
+    def _latest(self, name: str, build: Callable[[], Any]) -> Any:
+        # build() run under the lock and published for the current version.
+        # Like compile(), a reader that finds it stale while a writer holds
+        # the lock takes the last published result instead of waiting.
+        # Returns (version, result).
+        published = self._published.get(name)
+        if published is not None and published[0] == self.version:
+            return published
+        if published is None:
+            self._lock.acquire()
+        elif not self._lock.acquire(blocking=False):
+            return published
+        try:
+            result = (self.version, build())
+            if self._edit_depth == 0:
+                # Never publish the half-applied state of an edit batch.
+                self._published[name] = result
+            return result
+        finally:
+            self._lock.release()
 
     def edges(self) -> List[Tuple[str, str, float]]:
        
+        return list(self._latest("edges", self._edges)[1])
+
+    def _edges(self) -> List[Tuple[str, str, float]]:
         seen = set()
         es = []
         for u, nbrs in self.adj.items():
@@ -70,136 +452,1922 @@ class Graph:
                 es.append((u, v, w))
         return es
 
-    def bfs(self, start: str) -> Tuple[List[str], Dict[str, Optional[str]]]:
+    def bfs(self, start: str,
+            snapshot: Optional["CompiledGraph"] = None) -> Tuple[List[str], Dict[str, Optional[str]]]:
         
-        if start not in self.adj:
+        cg = snapshot if snapshot is not None else self.compile()
+        s = cg.index.get(start)
+        if s is None:
             return [], {}
-        q = deque([start])
-        visited = {start}
-        parent: Dict[str, Optional[str]] = {start: None}
+        if SEARCH_STATS.enabled:
+            t0 = time.perf_counter()
+            order, parent = cg.bfs(s)
+            # Every discovered node is queued once and settled once.
+            SEARCH_STATS.record("bfs", time.perf_counter() - t0, len(order), cg.degree_sum(order), len(order))
+        else:
+            order, parent = cg.bfs(s)
+        names = cg.names
+        return [names[u] for u in order], {
+            names[u]: (names[parent[u]] if parent[u] >= 0 else None) for u in order
+        }
+
+    def dfs(self, start: str) -> List[str]:
+        
+        cg = self.compile()
+        s = cg.index.get(start)
+        if s is None:
+            return []
+        if SEARCH_STATS.enabled:
+            t0 = time.perf_counter()
+            counts = [0, 0, 0]
+            order = cg.dfs(s, counts)
+            SEARCH_STATS.record("dfs", time.perf_counter() - t0, *counts)
+        else:
+            order = cg.dfs(s)
+        names = cg.names
+        return [names[u] for u in order]
+
+    def traverse(self, algorithm: str, start: str, target: Optional[str] = None,
+                 max_hops: Optional[int] = None,
+                 max_distance: Optional[float] = None) -> Iterator[Tuple[str, float, Optional[str]]]:
+        
+        # (node, depth, parent) as algorithm ("bfs", "dfs" or "dijkstra")
+        # reaches each node, stopping after target or at the budget: hops
+        # for bfs/dfs, distance for dijkstra. Runs over the snapshot current
+        # at the call, so edits made while iterating are not seen.
+        cg = self.compile()
+        s = cg.index.get(start)
+        if s is None:
+            return iter(())
+        t = cg.index.get(target, -1) if target is not None else -1
+        if algorithm == "bfs":
+            visits = cg.iter_bfs(s, t, max_hops)
+        elif algorithm == "dfs":
+            visits = cg.iter_dfs(s, t, max_hops)
+        elif algorithm == "dijkstra":
+            visits = cg.iter_dijkstra(s, t, max_distance)
+        else:
+            raise ValueError(f"Unknown traversal: {algorithm}")
+        names = cg.names
+        return ((names[u], depth, names[p] if p >= 0 else None) for u, depth, p in visits)
+
+    def shortest_path_tree(self, src: str) -> Optional["ShortestPathTree"]:
+        
+        cg = self.compile()
+        s = cg.index.get(src)
+        if s is None:
+            return None
+        tree = self._cached_tree(cg, src)
+        if tree is None:
+            tree = ShortestPathTree(cg, s)
+            self._store_tree(tree)
+        return tree
+
+    def dijkstra(self, src: str, dst: str, profile: Optional["RoutingProfile"] = None,
+                 at: Optional[int] = None, snapshot: Optional["CompiledGraph"] = None) -> Tuple[float, List[str]]:
+        
+        # profile/at route over that profile's view of the snapshot (see
+        # CompiledGraph.restricted); cached trees are for the plain graph.
+        # Like the other queries it runs on snapshot when given (so a caller
+        # can tie the result to that snapshot's version), else the latest.
+        base = snapshot if snapshot is not None else self.compile()
+        s, t = base.index.get(src), base.index.get(dst)
+        if s is None or t is None:
+            return float("inf"), []
+        cg = base.restricted(profile, at)
+        tree = self._cached_tree(cg, src) if cg is base else None
+        if tree is not None:
+            return tree.distance_to(dst), tree.path_to(dst)
+        if SEARCH_STATS.enabled:
+            t0 = time.perf_counter()
+            counts = [0, 0, 0]
+            d, path = cg.dijkstra(s, t, counts)
+            SEARCH_STATS.record("dijkstra", time.perf_counter() - t0, *counts)
+        else:
+            d, path = cg.dijkstra(s, t)
+        names = cg.names
+        return d, [names[u] for u in path]
+
+    def bidirectional_dijkstra(self, src: str, dst: str, profile: Optional["RoutingProfile"] = None,
+                               at: Optional[int] = None,
+                               snapshot: Optional["CompiledGraph"] = None) -> Tuple[float, List[str]]:
+        
+        cg = snapshot if snapshot is not None else self.compile()
+        s, t = cg.index.get(src), cg.index.get(dst)
+        if s is None or t is None:
+            return float("inf"), []
+        cg = cg.restricted(profile, at)
+        t0 = time.perf_counter()
+        d, path, expanded = cg.bidirectional_dijkstra(s, t)
+        if SEARCH_STATS.enabled:
+            SEARCH_STATS.record("bidirectional_dijkstra", time.perf_counter() - t0, expanded)
+        names = cg.names
+        return d, [names[u] for u in path]
+
+    def k_shortest_paths(self, src: str, dst: str, k: int, profile: Optional["RoutingProfile"] = None,
+                         at: Optional[int] = None, max_overlap: Optional[float] = None,
+                         first: Optional[List[str]] = None,
+                         snapshot: Optional["CompiledGraph"] = None) -> List[Tuple[float, List[str]]]:
+        
+        cg = snapshot if snapshot is not None else self.compile()
+        s, t = cg.index.get(src), cg.index.get(dst)
+        if s is None or t is None or k <= 0:
+            return []
+        cg = cg.restricted(profile, at)
+        t0 = time.perf_counter()
+        seed = [cg.index[x] for x in first] if first and all(x in cg.index for x in first) else None
+        routes, expanded = cg.k_shortest(s, t, k, seed, max_overlap)
+        if SEARCH_STATS.enabled:
+            SEARCH_STATS.record("k_shortest", time.perf_counter() - t0, expanded)
+        names = cg.names
+        return [(d, [names[u] for u in path]) for d, path in routes]
+
+    def iter_many_to_many(self, sources: List[str], targets: List[str]) -> Iterator[List[float]]:
+        
+        # One Dijkstra per source that stops once every target is settled
+        # (or reuses a cached shortest-path tree); yields one row at a time.
+        cg = self.compile()
+        inf = float("inf")
+        target_ids = [cg.index.get(t, -1) for t in targets]
+        for src in sources:
+            s = cg.index.get(src)
+            if s is None:
+                yield [inf] * len(targets)
+                continue
+            tree = self._cached_tree(cg, src)
+            if tree is not None:
+                dist = tree.dist
+                yield [dist[t] if t >= 0 else inf for t in target_ids]
+            else:
+                yield cg.distances(s, target_ids)
+
+    def many_to_many(self, sources: List[str], targets: List[str]) -> List[List[float]]:
+        
+        return list(self.iter_many_to_many(sources, targets))
+
+    def astar(self, src: str, dst: str, profile: Optional["RoutingProfile"] = None,
+              at: Optional[int] = None, snapshot: Optional["CompiledGraph"] = None) -> Tuple[float, List[str]]:
+        
+        cg = snapshot if snapshot is not None else self.compile()
+        s, t = cg.index.get(src), cg.index.get(dst)
+        if s is None or t is None:
+            return float("inf"), []
+        cg = cg.restricted(profile, at)
+        t0 = time.perf_counter()
+        d, path, expanded = cg.astar(s, t)
+        if SEARCH_STATS.enabled:
+            SEARCH_STATS.record("astar", time.perf_counter() - t0, expanded)
+        names = cg.names
+        return d, [names[u] for u in path]
+
+    def kruskal_mst(self) -> Tuple[float, List[Tuple[str, str, float]]]:
+        
+        return self.versioned_mst()[1]
+
+    def versioned_mst(self) -> Tuple[int, Tuple[float, List[Tuple[str, str, float]]]]:
+        
+        # (version, (total, edges)). Writers maintain the MST in place;
+        # readers get the result published for the latest version they can
+        # see without waiting for an edit, and the version it belongs to.
+        if not self.undirected:
+            raise ValueError("Kruskal requires an undirected graph.")
+        t0 = time.perf_counter()
+        version, (total, mst) = self._latest("mst", self._mst_result)
+        if SEARCH_STATS.enabled:
+            SEARCH_STATS.record("kruskal_mst", time.perf_counter() - t0)
+        return version, (total, list(mst))
+
+    def _mst_result(self) -> Tuple[float, List[Tuple[str, str, float]]]:
+        if self._mst is None:
+            self._mst = IncrementalMST(self)
+        return self._mst.result()
+
+class IncrementalMST:
+    
+    # Minimum spanning forest kept up to date under edge insert, delete and
+    # reweight. Edges are totally ordered by (weight, rank of the endpoint
+    # that comes first in Graph.adj, slot in that endpoint's list), which is
+    # the order a stable sort of Graph.edges() by weight produces. With a
+    # strict order the MST is unique, so the maintained tree is always the
+    # one a fresh Kruskal run would return, ties included.
+    #
+    # insert / weight decrease: swap out the heaviest edge on the tree path
+    # between the endpoints if the new edge is lighter (cycle replacement).
+    # delete / weight increase of a tree edge: reconnect the two halves with
+    # the first crossing edge in the presorted edge list.
+
+    def __init__(self, graph: Graph):
+        self.rank: Dict[str, int] = {}
+        self.slots: Dict[str, int] = {}
+        # entries[x][k] is the record [key, first, other, w] for adj[x][k].
+        self.entries: Dict[str, List[list]] = {}
+        self.records: Dict[Tuple, list] = {}
+        self.tree: Dict[str, Dict[str, Tuple]] = {}
+        self.in_tree: set = set()
+        self._result: Optional[Tuple[float, List[Tuple[str, str, float]]]] = None
+        for u in graph.adj:
+            self.add_node(u)
+        pending: Dict[Tuple[str, str, float], deque] = {}
+        for u, nbrs in graph.adj.items():
+            self.slots[u] = len(nbrs)
+            for i, (v, w) in enumerate(nbrs):
+                if self.rank[v] < self.rank[u] or (u == v and pending.get((u, u, w))):
+                    rec = pending[(v, u, w)].popleft()
+                else:
+                    rec = [(w, self.rank[u], i), u, v, w]
+                    self.records[rec[0]] = rec
+                    pending.setdefault((u, v, w), deque()).append(rec)
+                self.entries[u].append(rec)
+        self.order: List[Tuple] = sorted(self.records)
+        self.rebuild()
+
+    def add_node(self, u: str):
+        
+        if u not in self.rank:
+            self.rank[u] = len(self.rank)
+            self.slots[u] = 0
+            self.entries[u] = []
+            self.tree[u] = {}
+
+    def rebuild(self):
+        
+        dsu = DisjointSet()
+        for u in self.rank:
+            dsu.make_set(u)
+        self.tree = {u: {} for u in self.rank}
+        self.in_tree = set()
+        for key in self.order:
+            _, a, b, _ = self.records[key]
+            if dsu.union(a, b):
+                self._link(key)
+        self._result = None
+
+    def result(self) -> Tuple[float, List[Tuple[str, str, float]]]:
+        
+        if self._result is None:
+            mst = []
+            total = 0.0
+            for key in sorted(self.in_tree):
+                _, a, b, w = self.records[key]
+                mst.append((a, b, w))
+                total += w
+            self._result = (total, mst)
+        return self._result[0], list(self._result[1])
+
+    def _link(self, key: Tuple):
+        _, a, b, _ = self.records[key]
+        self.tree[a][b] = key
+        self.tree[b][a] = key
+        self.in_tree.add(key)
+
+    def _cut(self, key: Tuple):
+        _, a, b, _ = self.records[key]
+        del self.tree[a][b]
+        del self.tree[b][a]
+        self.in_tree.discard(key)
+
+    def _tree_path(self, a: str, b: str) -> Optional[List[Tuple]]:
+        parent = {a: None}
+        q = deque([a])
+        while q:
+            u = q.popleft()
+            if u == b:
+                keys = []
+                while parent[u] is not None:
+                    u, key = parent[u]
+                    keys.append(key)
+                return keys
+            for v, key in self.tree[u].items():
+                if v not in parent:
+                    parent[v] = (u, key)
+                    q.append(v)
+        return None
+
+    def _offer(self, key: Tuple):
+        # Cycle replacement for an edge that is not in the tree.
+        _, a, b, _ = self.records[key]
+        if a == b:
+            return
+        path = self._tree_path(a, b)
+        if path is None:
+            self._link(key)
+        else:
+            heaviest = max(path)
+            if key < heaviest:
+                self._cut(heaviest)
+                self._link(key)
+
+    def _reconnect(self, a: str):
+        # After a cut, join a's component to the rest with the lightest
+        # crossing edge, scanning the presorted edge list.
+        side = {a}
+        q = deque([a])
+        while q:
+            u = q.popleft()
+            for v in self.tree[u]:
+                if v not in side:
+                    side.add(v)
+                    q.append(v)
+        for key in self.order:
+            _, x, y, _ = self.records[key]
+            if (x in side) != (y in side):
+                self._link(key)
+                return
+
+    def _insort(self, key: Tuple):
+        bisect.insort(self.order, key)
+
+    def _discard(self, key: Tuple):
+        i = bisect.bisect_left(self.order, key)
+        del self.order[i]
+
+    def add_edge(self, u: str, v: str, w: float):
+        
+        first, other = (u, v) if self.rank[u] <= self.rank[v] else (v, u)
+        rec = [(w, self.rank[first], self.slots[first]), first, other, w]
+        self.slots[u] += 1
+        self.slots[v] += 1
+        self.records[rec[0]] = rec
+        self.entries[u].append(rec)
+        self.entries[v].append(rec)
+        self._insort(rec[0])
+        self._offer(rec[0])
+        self._result = None
+
+    def remove_edge(self, u: str, i: int, v: str, j: int):
+        
+        rec = self.entries[u].pop(i)
+        if j >= 0:
+            self.entries[v].pop(j)
+        key = rec[0]
+        self._discard(key)
+        if key in self.in_tree:
+            self._cut(key)
+            del self.records[key]
+            self._reconnect(rec[1])
+        else:
+            del self.records[key]
+        self._result = None
+
+    def update_edge(self, u: str, i: int, w: float):
+        
+        rec = self.entries[u][i]
+        old = rec[0]
+        new = (w,) + old[1:]
+        if new == old:
+            return
+        in_tree = old in self.in_tree
+        if in_tree:
+            self._cut(old)
+        self._discard(old)
+        del self.records[old]
+        rec[0], rec[3] = new, w
+        self.records[new] = rec
+        self._insort(new)
+        if in_tree and new < old:
+            self._link(new)
+        elif in_tree:
+            self._reconnect(rec[1])
+        elif new < old:
+            self._offer(new)
+        self._result = None
+
+class _SearchSpace:
+
+    # Scratch arrays for one thread's point-to-point searches, reused from
+    # query to query. An entry is only meaningful while stamp[u] == gen, so
+    # bumping gen clears every slot at once and a query pays for the nodes
+    # it touches instead of O(V) setup.
+
+    def __init__(self, n: int):
+        self.dist = [0.0] * n
+        self.prev = [-1] * n
+        self.stamp = [0] * n
+        self.gen = 0
+        self.buckets: List[List[int]] = []
+
+    def next(self) -> int:
+        self.gen += 1
+        return self.gen
+
+@dataclass(frozen=True)
+class RoutingProfile:
+    
+    # How one kind of user sees the shared graph: edges carrying any tag in
+    # avoid are unusable, each (tag, factor) in penalties multiplies the
+    # weight of edges with that tag, and cost, if given, maps (weight, tags)
+    # to the final weight (inf drops the edge). With respect_hours, edges
+    # are closed outside their opening hours when a query gives a time.
+    name: str
+    avoid: FrozenSet[str] = frozenset()
+    penalties: Tuple[Tuple[str, float], ...] = ()
+    cost: Optional[Callable[[float, FrozenSet[str]], float]] = None
+    respect_hours: bool = True
+
+    @property
+    def unrestricted(self) -> bool:
+        return not self.avoid and not self.penalties and self.cost is None
+
+ROUTING_PROFILES = {
+    "default": RoutingProfile("default"),
+    "step_free": RoutingProfile("step_free", avoid=frozenset({"stairs"})),
+    "sheltered": RoutingProfile("sheltered", avoid=frozenset({"outdoor"})),
+}
+
+def _is_open(hours: Tuple[int, int], minute: int) -> bool:
+    opens, closes = hours
+    if opens <= closes:
+        return opens <= minute < closes
+    return minute >= opens or minute < closes
+
+def _without_cycles(path: List[int]) -> List[int]:
+    out: List[int] = []
+    at: Dict[int, int] = {}
+    for u in path:
+        if u in at:
+            for v in out[at[u] + 1:]:
+                del at[v]
+            del out[at[u] + 1:]
+        else:
+            at[u] = len(out)
+            out.append(u)
+    return out
+
+class CompiledGraph:
+    
+    # Frozen CSR form of a Graph. Node names are interned to dense ints in
+    # sorted order, so int comparisons in the heap break ties exactly like the
+    # string comparisons did. Neighbours of node u are
+    # targets[offsets[u]:offsets[u + 1]] with matching weights, in the same
+    # order as Graph.adj[u].
+
+    def __init__(self, graph: Graph):
+        names = sorted(graph.adj)
+        index = {name: i for i, name in enumerate(names)}
+        offsets = array("q", [0])
+        targets = array("i")
+        weights = array("d")
+        for name in names:
+            for v, w in graph.adj[name]:
+                targets.append(index[v])
+                weights.append(w)
+            offsets.append(len(targets))
+        self.names = names
+        self.index = index
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.undirected = graph.undirected
+        self.version = graph.version
+        self.node_version = graph.node_version
+        self._compile_heuristic(graph)
+        self._compile_attributes(graph)
+        self._views: Dict[Tuple, "CompiledGraph"] = {}
+        self._views_lock = threading.Lock()
+
+    def _compile_heuristic(self, graph: Graph):
+        
+        self.xs = self.ys = self.floors = None
+        if graph.has_coordinates():
+            self.xs = array("d", (graph.pos[name][0] for name in self.names))
+            self.ys = array("d", (graph.pos[name][1] for name in self.names))
+        if self.names and len(graph.floor) == len(self.names):
+            self.floors = array("i", (graph.floor[name] for name in self.names))
+        self._fit_heuristic()
+
+    def _fit_heuristic(self):
+        # A* lower bounds. Each term is only enabled when every node carries
+        # the attribute, and its scale is the smallest cost per unit seen on
+        # any edge, which keeps the heuristic admissible and consistent.
+        names, offsets, targets, weights = self.names, self.offsets, self.targets, self.weights
+        self.dist_scale = self.floor_cost = 0.0
+        if self.xs is not None:
+            scale = float("inf")
+            for u in range(len(names)):
+                for i in range(offsets[u], offsets[u + 1]):
+                    v = targets[i]
+                    span = math.hypot(self.xs[u] - self.xs[v], self.ys[u] - self.ys[v])
+                    if span > 0:
+                        scale = min(scale, weights[i] / span)
+            self.dist_scale = scale if scale != float("inf") else 0.0
+        if self.floors is not None:
+            cost = float("inf")
+            for u in range(len(names)):
+                for i in range(offsets[u], offsets[u + 1]):
+                    rise = abs(self.floors[u] - self.floors[targets[i]])
+                    if rise:
+                        cost = min(cost, weights[i] / rise)
+            self.floor_cost = cost if cost != float("inf") else 0.0
+
+    def _compile_attributes(self, graph: Graph):
+        # Edge tags as one bitmask per CSR edge over the sorted tag names
+        # (None when nothing is tagged), opening hours by edge index, and
+        # the sorted minutes at which any edge opens or closes.
+        names, offsets = self.names, self.offsets
+        self.tag_names = sorted({tag for tags in graph.edge_tags.values() for tag in tags})
+        bits = {tag: 1 << i for i, tag in enumerate(self.tag_names)}
+        self.edge_tags = [0] * len(self.targets) if bits else None
+        self.edge_hours: Dict[int, Tuple[int, int]] = {}
+        if graph.edge_tags or graph.edge_hours:
+            for u, name in enumerate(names):
+                for k, (v, _) in enumerate(graph.adj[name]):
+                    tags = graph.edge_tags.get((name, v))
+                    if tags:
+                        self.edge_tags[offsets[u] + k] = sum(bits[tag] for tag in tags)
+                    hours = graph.edge_hours.get((name, v))
+                    if hours is not None:
+                        self.edge_hours[offsets[u] + k] = hours
+        self.hour_bounds = sorted({m for hours in self.edge_hours.values() for m in hours})
+
+    MAGIC = b"CNGS0002"
+    HEADER = struct.Struct("<8sQQQQddQ")
+    HAS_XY, HAS_FLOORS, UNDIRECTED, HAS_TAGS = 1, 2, 4, 8
+
+    def snapshot_chunks(self) -> List[bytes]:
+        
+        # Binary snapshot: header, names as JSON, tag names and opening hours
+        # as JSON, then the CSR, heuristic and edge tag arrays, each 8-byte
+        # aligned so from_buffer can cast them in place.
+        blob = json.dumps(self.names).encode("utf-8")
+        attrs = json.dumps({"tags": self.tag_names,
+                            "hours": [[i, o, c] for i, (o, c) in sorted(self.edge_hours.items())]}).encode("utf-8")
+        tags = None
+        if self.edge_tags is not None:
+            if len(self.tag_names) > 63:
+                raise ValueError("A snapshot holds at most 63 distinct edge tags")
+            tags = array("q", self.edge_tags)
+        flags = ((self.HAS_XY if self.xs is not None else 0)
+                 | (self.HAS_FLOORS if self.floors is not None else 0)
+                 | (self.UNDIRECTED if self.undirected else 0)
+                 | (self.HAS_TAGS if tags is not None else 0))
+        chunks = [self.HEADER.pack(self.MAGIC, len(self.names), len(self.targets), len(blob),
+                                   flags, self.dist_scale, self.floor_cost, len(attrs)),
+                  blob + b"\0" * (-len(blob) % 8),
+                  attrs + b"\0" * (-len(attrs) % 8)]
+        for a in (self.offsets, self.targets, self.weights, self.xs, self.ys, self.floors, tags):
+            if a is not None:
+                data = a.tobytes()
+                chunks.append(data + b"\0" * (-len(data) % 8))
+        return chunks
+
+    def save(self, path: str):
+        
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            for chunk in self.snapshot_chunks():
+                f.write(chunk)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledGraph":
+        
+        with open(path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls.from_buffer(buf)
+        except ValueError as e:
+            buf.close()
+            raise ValueError(f"{path}: {e}")
+
+    @classmethod
+    def from_buffer(cls, buf) -> "CompiledGraph":
+        
+        # Zero-copy view over a snapshot held in any buffer: an mmap'ed file
+        # or a shared memory block handed to worker processes.
+        magic = bytes(buf[:len(cls.MAGIC)])
+        if magic != cls.MAGIC:
+            if magic[:4] == cls.MAGIC[:4]:
+                raise ValueError("graph snapshot from an older version; convert the source file again")
+            raise ValueError("not a graph snapshot")
+        _, n, m, names_len, flags, dist_scale, floor_cost, attrs_len = cls.HEADER.unpack_from(buf, 0)
+        off = cls.HEADER.size
+        names = json.loads(bytes(buf[off:off + names_len]).decode("utf-8"))
+        off += names_len + (-names_len % 8)
+        attrs = json.loads(bytes(buf[off:off + attrs_len]).decode("utf-8"))
+        off += attrs_len + (-attrs_len % 8)
+        view = memoryview(buf)
+
+        def take(code: str, size: int, count: int):
+            nonlocal off
+            a = view[off:off + size * count].cast(code)
+            off += size * count + (-(size * count) % 8)
+            return a
+
+        cg = cls.__new__(cls)
+        cg.names = names
+        cg.index = {name: i for i, name in enumerate(names)}
+        cg.offsets = take("q", 8, n + 1)
+        cg.targets = take("i", 4, m)
+        cg.weights = take("d", 8, m)
+        cg.xs = cg.ys = cg.floors = None
+        if flags & cls.HAS_XY:
+            cg.xs = take("d", 8, n)
+            cg.ys = take("d", 8, n)
+        if flags & cls.HAS_FLOORS:
+            cg.floors = take("i", 4, n)
+        cg.dist_scale, cg.floor_cost = dist_scale, floor_cost
+        cg.undirected = bool(flags & cls.UNDIRECTED)
+        cg.version = cg.node_version = 0
+        cg.tag_names = attrs["tags"]
+        cg.edge_tags = take("q", 8, m) if flags & cls.HAS_TAGS else None
+        cg.edge_hours = {i: (o, c) for i, o, c in attrs["hours"]}
+        cg.hour_bounds = sorted({minute for hours in cg.edge_hours.values() for minute in hours})
+        cg._views, cg._views_lock = {}, threading.Lock()
+        cg._buffer = buf
+        return cg
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def reverse(self) -> Tuple[array, array, array]:
+        
+        # Reverse CSR (in-edges per node). An undirected graph is its own reverse.
+        if self.undirected:
+            return self.offsets, self.targets, self.weights
+        rev = getattr(self, "_reverse", None)
+        if rev is None:
+            n = len(self.names)
+            offsets, targets, weights = self.offsets, self.targets, self.weights
+            counts = [0] * (n + 1)
+            for v in targets:
+                counts[v + 1] += 1
+            for i in range(n):
+                counts[i + 1] += counts[i]
+            fill = counts[:-1]
+            r_targets = array("i", bytes(4 * len(targets)))
+            r_weights = array("d", bytes(8 * len(weights)))
+            for u in range(n):
+                for i in range(offsets[u], offsets[u + 1]):
+                    v = targets[i]
+                    j = fill[v]
+                    r_targets[j] = u
+                    r_weights[j] = weights[i]
+                    fill[v] = j + 1
+            rev = self._reverse = (array("q", counts), r_targets, r_weights)
+        return rev
+
+    def neighbors(self, u: int) -> List[Tuple[int, float]]:
+        
+        a, b = self.offsets[u], self.offsets[u + 1]
+        return list(zip(self.targets[a:b], self.weights[a:b]))
+
+    def nbytes(self) -> int:
+        
+        return sum(a.itemsize * len(a) for a in (self.offsets, self.targets, self.weights))
+
+    VIEW_CACHE_SIZE = 64
+
+    def time_slot(self, at: Optional[int]) -> Optional[int]:
+        
+        # Which stretch of the day minute at falls in; no edge opens or
+        # closes within a stretch. None when time does not matter.
+        if at is None or not self.edge_hours:
+            return None
+        return bisect.bisect_right(self.hour_bounds, at % 1440)
+
+    def tags_of(self, i: int) -> FrozenSet[str]:
+        
+        mask = self.edge_tags[i] if self.edge_tags is not None else 0
+        return frozenset(tag for k, tag in enumerate(self.tag_names) if mask >> k & 1)
+
+    def restricted(self, profile: Optional[RoutingProfile] = None, at: Optional[int] = None) -> "CompiledGraph":
+        
+        # The graph as profile sees it at minute at of the day: a CSR of its
+        # own with only the usable edges, at their profile cost, sharing
+        # names, coordinates and per-thread search space with this snapshot,
+        # so every search runs on it unchanged and at full speed. Views are
+        # built once per (profile, time slot) and live as long as the
+        # snapshot; self comes back when nothing would be filtered.
+        slot = self.time_slot(at) if profile is None or profile.respect_hours else None
+        if (profile is None or profile.unrestricted) and slot is None:
+            return self
+        key = (profile, slot)
+        view = self._views.get(key)
+        if view is None:
+            view = self._build_view(profile or ROUTING_PROFILES["default"], at if slot is not None else None)
+            with self._views_lock:
+                view = self._views.setdefault(key, view)
+                while len(self._views) > self.VIEW_CACHE_SIZE:
+                    del self._views[next(iter(self._views))]
+        return view
+
+    def _build_view(self, profile: RoutingProfile, at: Optional[int]) -> "CompiledGraph":
+        
+        inf = float("inf")
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        tags, hours = self.edge_tags, self.edge_hours
+        bits = {tag: 1 << k for k, tag in enumerate(self.tag_names)}
+        avoid = sum(bits.get(tag, 0) for tag in profile.avoid)
+        penalties = [(bits[tag], factor) for tag, factor in profile.penalties if tag in bits]
+        cost = profile.cost
+        view_offsets, view_targets, view_weights = array("q", [0]), array("i"), array("d")
+        for u in range(len(self.names)):
+            for i in range(offsets[u], offsets[u + 1]):
+                mask = tags[i] if tags is not None else 0
+                if mask & avoid or (at is not None and i in hours and not _is_open(hours[i], at % 1440)):
+                    continue
+                w = weights[i]
+                for bit, factor in penalties:
+                    if mask & bit:
+                        w *= factor
+                if cost is not None:
+                    w = cost(w, self.tags_of(i))
+                    if w == inf:
+                        continue
+                view_targets.append(targets[i])
+                view_weights.append(w)
+            view_offsets.append(len(view_targets))
+        view = CompiledGraph.__new__(CompiledGraph)
+        view.names, view.index = self.names, self.index
+        view.xs, view.ys, view.floors = self.xs, self.ys, self.floors
+        view.undirected, view.version, view.node_version = self.undirected, self.version, self.node_version
+        view.offsets, view.targets, view.weights = view_offsets, view_targets, view_weights
+        view.tag_names, view.edge_tags, view.edge_hours, view.hour_bounds = [], None, {}, []
+        view._views, view._views_lock = {}, threading.Lock()
+        view.profile = profile
+        view._fit_heuristic()
+        self.search_space()
+        view._local = self._local
+        return view
+
+    def bfs(self, s: int) -> Tuple[List[int], List[int]]:
+        
+        offsets, targets = self.offsets, self.targets
+        parent = [-2] * len(self.names)
+        parent[s] = -1
+        q = deque([s])
         order = []
         while q:
             u = q.popleft()
             order.append(u)
-            for v, _ in self.adj[u]:
-                if v not in visited:
-                    visited.add(v)
+            for v in targets[offsets[u]:offsets[u + 1]]:
+                if parent[v] == -2:
                     parent[v] = u
                     q.append(v)
         return order, parent
 
-    def dfs(self, start: str) -> List[str]:
+    def degree_sum(self, nodes: List[int]) -> int:
         
-        if start not in self.adj:
-            return []
-        stack = [start]
-        visited = set()
+        offsets = self.offsets
+        return sum(offsets[u + 1] - offsets[u] for u in nodes)
+
+    def dfs(self, s: int, counts: Optional[List[int]] = None) -> List[int]:
+        
+        # counts, when given, receives [settled, relaxed, pushes].
+        offsets, targets = self.offsets, self.targets
+        visited = [False] * len(self.names)
+        stack = [s] if counts is None else _CountingStack([s], counts)
         order = []
         while stack:
             u = stack.pop()
-            if u in visited:
+            if visited[u]:
                 continue
-            visited.add(u)
+            visited[u] = True
             order.append(u)
-            for v, _ in reversed(self.adj[u]):
-                if v not in visited:
+            a, b = offsets[u], offsets[u + 1]
+            for i in range(b - 1, a - 1, -1):
+                v = targets[i]
+                if not visited[v]:
                     stack.append(v)
+        if counts is not None:
+            counts[0] += len(order)
+            counts[1] += self.degree_sum(order)
         return order
 
-    def dijkstra(self, src: str, dst: str) -> Tuple[float, List[str]]:
+    # Lazy traversals: yield (node, depth, parent) as nodes are reached, in
+    # the same order as bfs/dfs/dijkstra, stopping after t (-1 = never) or
+    # at the budget. State lives in dicts sized by what was explored, not
+    # in the per-thread search space, since a suspended generator must not
+    # be clobbered by other queries on the same thread.
+
+    def iter_bfs(self, s: int, t: int = -1, max_hops: Optional[int] = None) -> Iterator[Tuple[int, int, int]]:
+
+        offsets, targets = self.offsets, self.targets
+        parent = {s: -1}
+        q = deque([(s, 0)])
+        while q:
+            u, depth = q.popleft()
+            yield u, depth, parent[u]
+            if u == t:
+                return
+            if max_hops is not None and depth >= max_hops:
+                continue
+            for v in targets[offsets[u]:offsets[u + 1]]:
+                if v not in parent:
+                    parent[v] = u
+                    q.append((v, depth + 1))
+
+    def iter_dfs(self, s: int, t: int = -1, max_hops: Optional[int] = None) -> Iterator[Tuple[int, int, int]]:
+
+        # depth is the length of the DFS tree path, not the hop distance.
+        offsets, targets = self.offsets, self.targets
+        visited = set()
+        stack = [(s, 0, -1)]
+        while stack:
+            u, depth, p = stack.pop()
+            if u in visited:
+                continue
+            visited.add(u)
+            yield u, depth, p
+            if u == t:
+                return
+            if max_hops is not None and depth >= max_hops:
+                continue
+            a, b = offsets[u], offsets[u + 1]
+            for i in range(b - 1, a - 1, -1):
+                v = targets[i]
+                if v not in visited:
+                    stack.append((v, depth + 1, u))
+
+    def iter_dijkstra(self, s: int, t: int = -1,
+                      max_distance: Optional[float] = None) -> Iterator[Tuple[int, float, int]]:
+
+        # Nodes in settle order, with their final distance as the depth;
+        # nothing beyond max_distance is ever queued.
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        inf = float("inf")
+        limit = inf if max_distance is None else max_distance
+        dist = {s: 0.0}
+        prev = {s: -1}
+        done = set()
+        pq = [(0.0, s)]
+        pop, push = heapq.heappop, heapq.heappush
+        while pq:
+            d, u = pop(pq)
+            if u in done:
+                continue
+            done.add(u)
+            yield u, d, prev[u]
+            if u == t:
+                return
+            a, b = offsets[u], offsets[u + 1]
+            for v, w in zip(targets[a:b], weights[a:b]):
+                nd = d + w
+                if nd <= limit and nd < dist.get(v, inf):
+                    dist[v] = nd
+                    prev[v] = u
+                    push(pq, (nd, v))
+
+    BUCKET_MAX_WEIGHT = 1024
+
+    def search_space(self) -> _SearchSpace:
+        
+        local = self.__dict__.get("_local")
+        if local is None:
+            local = self._local = threading.local()
+        space = getattr(local, "space", None)
+        if space is None:
+            space = local.space = _SearchSpace(len(self.names))
+        return space
+
+    def bucket_width(self) -> int:
+        
+        # The largest edge weight when every weight is a whole number in
+        # 1..BUCKET_MAX_WEIGHT (so dijkstra can use a bucket queue), else 0.
+        width = self.__dict__.get("_bucket_width")
+        if width is None:
+            weights = self.weights
+            width = 0
+            if len(weights) and min(weights) >= 1 and max(weights) <= self.BUCKET_MAX_WEIGHT \
+                    and all(w.is_integer() for w in weights):
+                width = int(max(weights))
+            self._bucket_width = width
+        return width
+
+    def dijkstra(self, s: int, t: int, counts: Optional[List[int]] = None) -> Tuple[float, List[int]]:
         
-        if src not in self.adj or dst not in self.adj:
+        # counts, when given, receives [settled, relaxed, pushes]; the heap
+        # functions are then wrapped, so the plain path carries no counting.
+        # Graphs with whole-number weights use Dial's bucket queue instead of
+        # the heap: one list per distance modulo (width + 1), each drained in
+        # node order once reached, which settles nodes in exactly the heap's
+        # (distance, node) order, so paths, ties and counts come out the same.
+        space = self.search_space()
+        gen = space.next()
+        dist, prev, stamp = space.dist, space.prev, space.stamp
+        dist[s] = 0.0
+        prev[s] = -1
+        stamp[s] = gen
+        width = self.bucket_width()
+        if width:
+            self._dial(s, t, width, space, counts)
+        else:
+            self._heap_search(s, t, space, counts)
+        if stamp[t] != gen:
             return float("inf"), []
-        dist = {node: float("inf") for node in self.adj}
-        prev = {node: None for node in self.adj}
-        dist[src] = 0.0
-        pq = [(0.0, src)]
+        path = []
+        cur = t
+        while cur != -1:
+            path.append(cur)
+            cur = prev[cur]
+        path.reverse()
+        return dist[t], path
+
+    def _heap_search(self, s: int, t: int, space: _SearchSpace, counts: Optional[List[int]] = None):
+        
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        gen, dist, prev, stamp = space.gen, space.dist, space.prev, space.stamp
+        pq = [(0.0, s)]
+        pop, push = heapq.heappop, heapq.heappush
+        if counts is not None:
+            pop, push = _counting_heap(dist, offsets, counts, t)
+            counts[2] += 1
+        while pq:
+            d, u = pop(pq)
+            if d > dist[u]:
+                continue
+            if u == t:
+                break
+            a, b = offsets[u], offsets[u + 1]
+            for v, w in zip(targets[a:b], weights[a:b]):
+                nd = d + w
+                if stamp[v] != gen:
+                    stamp[v] = gen
+                elif nd >= dist[v]:
+                    continue
+                dist[v] = nd
+                prev[v] = u
+                push(pq, (nd, v))
+
+    def _dial(self, s: int, t: int, width: int, space: _SearchSpace, counts: Optional[List[int]] = None):
+        
+        # Every queued distance lies in [d, d + width], so a ring of
+        # width + 1 buckets never mixes two distances in one bucket. The
+        # tallies are a couple of integer adds per settled node, cheap
+        # enough to keep in the plain path; counts only receives them.
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        gen, dist, prev, stamp = space.gen, space.dist, space.prev, space.stamp
+        size = width + 1
+        buckets = space.buckets
+        if len(buckets) != size:
+            buckets = space.buckets = [[] for _ in range(size)]
+        else:
+            for bucket in buckets:
+                bucket.clear()
+        buckets[0].append(s)
+        pushed, popped, settled, relaxed = 1, 0, 0, 0
+        d = 0
+        try:
+            while pushed != popped:
+                bucket = buckets[d % size]
+                if bucket:
+                    popped += len(bucket)
+                    nodes = sorted(bucket)
+                    bucket.clear()
+                    fd = float(d)
+                    for u in nodes:
+                        if dist[u] != fd:
+                            continue
+                        settled += 1
+                        if u == t:
+                            return
+                        a, b = offsets[u], offsets[u + 1]
+                        relaxed += b - a
+                        for v, w in zip(targets[a:b], weights[a:b]):
+                            nd = fd + w
+                            if stamp[v] != gen:
+                                stamp[v] = gen
+                            elif nd >= dist[v]:
+                                continue
+                            dist[v] = nd
+                            prev[v] = u
+                            buckets[int(nd) % size].append(v)
+                            pushed += 1
+                d += 1
+        finally:
+            if counts is not None:
+                counts[0] += settled
+                counts[1] += relaxed
+                counts[2] += pushed
+
+    def heuristic(self, t: int) -> Callable[[int], float]:
+        
+        xs, ys, floors = self.xs, self.ys, self.floors
+        scale, floor_cost = self.dist_scale, self.floor_cost
+        if xs is not None and scale > 0:
+            tx, ty = xs[t], ys[t]
+            if floors is not None and floor_cost > 0:
+                tf = floors[t]
+                return lambda u: max(scale * math.hypot(xs[u] - tx, ys[u] - ty),
+                                     floor_cost * abs(floors[u] - tf))
+            return lambda u: scale * math.hypot(xs[u] - tx, ys[u] - ty)
+        if floors is not None and floor_cost > 0:
+            tf = floors[t]
+            return lambda u: floor_cost * abs(floors[u] - tf)
+        return lambda u: 0.0
+
+    def astar(self, s: int, t: int, use_heuristic: bool = True) -> Tuple[float, List[int], int]:
+        
+        # Returns (distance, path, nodes expanded). With use_heuristic=False
+        # this is plain Dijkstra, which is handy for comparing the two.
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        h = self.heuristic(t) if use_heuristic else (lambda u: 0.0)
+        space = self.search_space()
+        gen = space.next()
+        dist, prev, stamp = space.dist, space.prev, space.stamp
+        dist[s] = 0.0
+        prev[s] = -1
+        stamp[s] = gen
+        pq = [(h(s), 0.0, s)]
+        pop, push = heapq.heappop, heapq.heappush
+        expanded = 0
         while pq:
-            d, u = heapq.heappop(pq)
+            _, d, u = pop(pq)
             if d > dist[u]:
                 continue
-            if u == dst:
+            expanded += 1
+            if u == t:
                 break
-            for v, w in self.adj[u]:
+            a, b = offsets[u], offsets[u + 1]
+            for v, w in zip(targets[a:b], weights[a:b]):
+                nd = d + w
+                if stamp[v] != gen:
+                    stamp[v] = gen
+                elif nd >= dist[v]:
+                    continue
+                dist[v] = nd
+                prev[v] = u
+                push(pq, (nd + h(v), nd, v))
+        if stamp[t] != gen:
+            return float("inf"), [], expanded
+        path = []
+        cur = t
+        while cur != -1:
+            path.append(cur)
+            cur = prev[cur]
+        path.reverse()
+        return dist[t], path, expanded
+
+    def bidirectional_dijkstra(self, s: int, t: int) -> Tuple[float, List[int], int]:
+        
+        # Returns (distance, path, nodes expanded). Phase one alternates a
+        # forward search (identical to dijkstra's, just stopped early) with a
+        # backward search over the reverse graph until top_f + top_b >= mu.
+        # Phase two resumes the forward search but only expands nodes that
+        # can still lie on a shortest path (df + lower bound on db <= mu).
+        # Dropping only those expansions leaves prev unchanged along every
+        # shortest path, so the result matches dijkstra(s, t) exactly,
+        # including which of several equal-length paths is returned.
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        r_offsets, r_targets, r_weights = self.reverse()
+        n = len(self.names)
+        inf = float("inf")
+        pop, push = heapq.heappop, heapq.heappush
+        df = [inf] * n
+        prev = [-1] * n
+        db = [inf] * n
+        done_b = [False] * n
+        df[s] = 0.0
+        db[t] = 0.0
+        pq_f = [(0.0, s)]
+        pq_b = [(0.0, t)]
+        mu = inf
+        expanded = 0
+        found = False
+        while pq_f and pq_b and pq_f[0][0] + pq_b[0][0] < mu:
+            if pq_f[0][0] <= pq_b[0][0]:
+                d, u = pop(pq_f)
+                if d > df[u]:
+                    continue
+                expanded += 1
+                if u == t:
+                    found = True
+                    break
+                a, b = offsets[u], offsets[u + 1]
+                for v, w in zip(targets[a:b], weights[a:b]):
+                    nd = d + w
+                    if nd < df[v]:
+                        df[v] = nd
+                        prev[v] = u
+                        push(pq_f, (nd, v))
+                    if db[v] != inf and nd + db[v] < mu:
+                        mu = nd + db[v]
+            else:
+                d, u = pop(pq_b)
+                if d > db[u]:
+                    continue
+                expanded += 1
+                done_b[u] = True
+                a, b = r_offsets[u], r_offsets[u + 1]
+                for v, w in zip(r_targets[a:b], r_weights[a:b]):
+                    nd = d + w
+                    if nd < db[v]:
+                        db[v] = nd
+                        push(pq_b, (nd, v))
+                    if df[v] != inf and nd + df[v] < mu:
+                        mu = nd + df[v]
+        if not found:
+            if mu == inf:
+                return inf, [], expanded
+            radius_b = pq_b[0][0] if pq_b else inf
+            limit = mu + 1e-9 * max(1.0, mu)
+            while pq_f:
+                d, u = pop(pq_f)
+                if d > df[u]:
+                    continue
+                if u == t:
+                    break
+                if d + (db[u] if done_b[u] else radius_b) > limit:
+                    continue
+                expanded += 1
+                a, b = offsets[u], offsets[u + 1]
+                for v, w in zip(targets[a:b], weights[a:b]):
+                    nd = d + w
+                    if nd < df[v]:
+                        df[v] = nd
+                        prev[v] = u
+                        push(pq_f, (nd, v))
+        if df[t] == inf:
+            return inf, [], expanded
+        path = []
+        cur = t
+        while cur != -1:
+            path.append(cur)
+            cur = prev[cur]
+        path.reverse()
+        return df[t], path, expanded
+
+    K_SHORTEST_SCAN = 10
+    SPUR_CHECK_AFTER = 64
+
+    def edge_cost(self, u: int, v: int) -> float:
+        
+        # Cheapest of the u -> v edges, inf when there is none.
+        a, b = self.offsets[u], self.offsets[u + 1]
+        return min((w for x, w in zip(self.targets[a:b], self.weights[a:b]) if x == v), default=float("inf"))
+
+    def k_shortest(self, s: int, t: int, k: int, first: Optional[List[int]] = None,
+                   max_overlap: Optional[float] = None) -> Tuple[List[Tuple[float, List[int]]], int]:
+        
+        # Yen's k shortest loopless paths, cheapest first, with the nodes
+        # expanded. first, when given, is used as the shortest path so the
+        # answer agrees with whichever engine produced it. With max_overlap,
+        # a path is only kept if at most that fraction of its length runs
+        # along any kept path; up to K_SHORTEST_SCAN * k candidates are tried.
+        #
+        # Every spur search reuses one reverse shortest-path tree towards t,
+        # grown only until s is settled. Its distances (and, beyond it, its
+        # radius or the geometric bound) are a consistent A* heuristic in
+        # any subgraph, and a spur search ends as soon as it reaches a node
+        # whose tree path avoids everything Yen has blocked, usually within
+        # a step or two of the spur.
+        inf = float("inf")
+        r_offsets, r_targets, r_weights = self.reverse()
+        to_t: Dict[int, float] = {}
+        succ: Dict[int, int] = {t: -1}
+        labels = {t: 0.0}
+        pq = [(0.0, t)]
+        pop, push = heapq.heappop, heapq.heappush
+        expanded = 0
+        while pq:
+            d, u = pop(pq)
+            if u in to_t:
+                continue
+            to_t[u] = d
+            expanded += 1
+            if u == s:
+                break
+            for i in range(r_offsets[u], r_offsets[u + 1]):
+                v, nd = r_targets[i], d + r_weights[i]
+                if nd < labels.get(v, inf):
+                    labels[v] = nd
+                    succ[v] = u
+                    push(pq, (nd, v))
+        if s not in to_t:
+            return [], expanded
+        radius = to_t[s]
+
+        def cost_of(path: List[int]) -> List[float]:
+            cum = [0.0]
+            for u, v in zip(path, path[1:]):
+                cum.append(cum[-1] + self.edge_cost(u, v))
+            return cum
+
+        def tree_path(u: int) -> List[int]:
+            path = [u]
+            while path[-1] != t:
+                path.append(succ[path[-1]])
+            return path
+
+        if not first or first[0] != s or first[-1] != t or cost_of(first)[-1] == inf:
+            first = tree_path(s)
+        found = [(first, cost_of(first))]
+        kept = [found[0]]
+        # Candidates are (cost, path up to a tree node, that node) and are
+        # only spelled out when popped.
+        candidates: List[Tuple[float, List[int], int]] = []
+        seen = {tuple(first)}
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        geometric = self.heuristic(t)
+
+        def bound(v: int) -> float:
+            d = to_t.get(v)
+            return d if d is not None else max(radius, geometric(v))
+
+        while len(kept) < k and len(found) < self.K_SHORTEST_SCAN * k:
+            path, cum = found[-1]
+            sharing = [p for p, _ in found]
+            banned = set()
+            # Smallest tree distance among banned nodes and the spur: tree
+            # paths only get closer to t, so past it none can be hit.
+            floor = inf
+            for i in range(len(path) - 1):
+                spur = path[i]
+                sharing = [p for p in sharing if len(p) > i + 1 and p[i] == spur]
+                banned_heads = {p[i + 1] for p in sharing}
+                floor = min(floor, to_t.get(spur, inf))
+                hit, searched = self._spur_search(spur, t, banned, banned_heads, succ, to_t, bound, floor)
+                expanded += searched
+                if hit is not None:
+                    prefix, x, cost = hit
+                    push(candidates, (cum[i] + cost, path[:i] + prefix, x))
+                banned.add(spur)
+            path = None
+            while candidates and path is None:
+                _, prefix, x = pop(candidates)
+                full = prefix + tree_path(x)[1:]
+                if len(set(full)) != len(full):
+                    # Only a zero-cost cycle can close between the search
+                    # and the tree path; cutting it out keeps the cost.
+                    full = _without_cycles(full)
+                if tuple(full) not in seen:
+                    seen.add(tuple(full))
+                    path = full
+            if path is None:
+                break
+            cum = cost_of(path)
+            found.append((path, cum))
+            if max_overlap is None or all(self._overlap(path, cum, other) <= max_overlap for other, _ in kept):
+                kept.append((path, cum))
+        return [(cum[-1], path) for path, cum in kept], expanded
+
+    def _tree_clear(self, v: int, spur: int, succ: Dict[int, int], to_t: Dict[int, float],
+                    banned: set, floor: float) -> bool:
+        
+        # Whether v's tree path to t avoids spur and every banned node. Those
+        # all sit at tree distance >= floor, so the walk stops below it.
+        while v != -1 and to_t[v] >= floor:
+            if v == spur or v in banned:
+                return False
+            v = succ[v]
+        return True
+
+    def _spur_search(self, s: int, t: int, banned: set, banned_heads: set, succ: Dict[int, int],
+                     to_t: Dict[int, float], bound: Callable[[int], float],
+                     floor: float) -> Tuple[Optional[Tuple[List[int], int, float]], int]:
+        
+        # A* from s avoiding banned nodes and the s -> banned_heads edges,
+        # finishing at the first node popped whose tree path is clear: its
+        # f is then exact and no open node can do better. Returns (path to
+        # that node, the node, total cost) and the nodes expanded.
+        #
+        # A spur cut off from t (a banned stairwell that is the only way up)
+        # would otherwise exhaust all of s's side of the graph, so each time
+        # the expansions double, a reachability search from t is given as
+        # many steps; if t's side runs dry first there is no path.
+        back, reached = [t], {t}
+        limit = self.SPUR_CHECK_AFTER
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        space = self.search_space()
+        gen = space.next()
+        dist, prev, stamp = space.dist, space.prev, space.stamp
+        dist[s] = 0.0
+        prev[s] = -1
+        stamp[s] = gen
+        pq = [(bound(s), -0.0, s)]
+        pop, push = heapq.heappop, heapq.heappush
+        expanded = 0
+        while pq:
+            _, d, u = pop(pq)
+            d = -d
+            if d > dist[u]:
+                continue
+            expanded += 1
+            if u in to_t and self._tree_clear(u, s, succ, to_t, banned, floor):
+                path = []
+                cur = u
+                while cur != -1:
+                    path.append(cur)
+                    cur = prev[cur]
+                path.reverse()
+                return (path, u, d + to_t[u]), expanded
+            a, b = offsets[u], offsets[u + 1]
+            for v, w in zip(targets[a:b], weights[a:b]):
+                if v in banned or (u == s and v in banned_heads):
+                    continue
+                nd = d + w
+                if stamp[v] != gen:
+                    stamp[v] = gen
+                elif nd >= dist[v]:
+                    continue
+                dist[v] = nd
+                prev[v] = u
+                # Ties go to the deeper node, which runs straight down a
+                # plateau of equal-cost paths instead of widening across it.
+                push(pq, (nd + bound(v), -nd, v))
+            if expanded >= limit and back:
+                connected, steps = self._grow_back(s, back, reached, banned, banned_heads, limit)
+                expanded += steps
+                if connected is None:
+                    return None, expanded
+                if connected:
+                    back.clear()
+                limit = 2 * expanded
+        return None, expanded
+
+    def _grow_back(self, s: int, stack: List[int], reached: set, banned: set, banned_heads: set,
+                   budget: int) -> Tuple[Optional[bool], int]:
+        
+        # Continues a reverse DFS over allowed edges for up to budget nodes:
+        # True once it reaches s, None if it runs out of nodes, else False.
+        r_offsets, r_targets, _ = self.reverse()
+        steps = 0
+        while stack and steps < budget:
+            x = stack.pop()
+            steps += 1
+            for y in r_targets[r_offsets[x]:r_offsets[x + 1]]:
+                if y == s:
+                    if x not in banned_heads:
+                        return True, steps
+                elif y not in reached and y not in banned:
+                    reached.add(y)
+                    stack.append(y)
+        return (None if not stack else False), steps
+
+    def _overlap(self, path: List[int], cum: List[float], other: List[int]) -> float:
+        
+        # Share of path's length on corridors other also uses.
+        shared = {frozenset(e) for e in zip(other, other[1:])}
+        length = sum(cum[j + 1] - cum[j] for j, e in enumerate(zip(path, path[1:])) if frozenset(e) in shared)
+        return length / cum[-1] if cum[-1] > 0 else 1.0
+
+    def distances(self, s: int, targets: List[int]) -> List[float]:
+        
+        # Dijkstra from s that stops as soon as every target (-1 = unknown)
+        # has been settled.
+        offsets, targets_, weights = self.offsets, self.targets, self.weights
+        inf = float("inf")
+        space = self.search_space()
+        gen = space.next()
+        dist, stamp = space.dist, space.stamp
+        dist[s] = 0.0
+        stamp[s] = gen
+        remaining = {t for t in targets if t >= 0}
+        pq = [(0.0, s)]
+        pop, push = heapq.heappop, heapq.heappush
+        while pq and remaining:
+            d, u = pop(pq)
+            if d > dist[u]:
+                continue
+            remaining.discard(u)
+            a, b = offsets[u], offsets[u + 1]
+            for v, w in zip(targets_[a:b], weights[a:b]):
+                nd = d + w
+                if stamp[v] != gen:
+                    stamp[v] = gen
+                elif nd >= dist[v]:
+                    continue
+                dist[v] = nd
+                push(pq, (nd, v))
+        return [dist[t] if t >= 0 and stamp[t] == gen else inf for t in targets]
+
+    def sssp(self, s: int) -> Tuple[List[float], List[int]]:
+        
+        # Full single-source run. The prev entries for any target match what
+        # dijkstra(s, t) would have produced, since early exit at t never
+        # changes the predecessors of nodes settled before it.
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        inf = float("inf")
+        dist = [inf] * len(self.names)
+        prev = [-1] * len(self.names)
+        dist[s] = 0.0
+        pq = [(0.0, s)]
+        pop, push = heapq.heappop, heapq.heappush
+        while pq:
+            d, u = pop(pq)
+            if d > dist[u]:
+                continue
+            a, b = offsets[u], offsets[u + 1]
+            for v, w in zip(targets[a:b], weights[a:b]):
                 nd = d + w
                 if nd < dist[v]:
                     dist[v] = nd
                     prev[v] = u
-                    heapq.heappush(pq, (nd, v))
-        if dist[dst] == float("inf"):
-            return float("inf"), []
+                    push(pq, (nd, v))
+        return dist, prev
+
+    def fingerprint(self) -> bytes:
+        
+        h = hashlib.sha1()
+        h.update("\0".join(self.names).encode("utf-8"))
+        for a in (self.offsets, self.targets, self.weights):
+            h.update(a.tobytes())
+        return h.digest()
+
+def repair_sssp(cg: CompiledGraph, dist: List[float], prev: List[int],
+                changes: List[Tuple[int, int, float, float]]):
+    
+    # Ramalingam-Reps style update of one single-source solution, in place,
+    # after the given edge changes (inf = edge absent) have been applied to
+    # cg. Subtrees hanging off a tree edge that got more expensive are
+    # detached and re-seeded from their in-neighbours; every changed edge is
+    # relaxed once; a Dijkstra pass from those seeds then settles only the
+    # nodes whose distance actually changed.
+    inf = float("inf")
+    offsets, targets, weights = cg.offsets, cg.targets, cg.weights
+    push, pop = heapq.heappush, heapq.heappop
+    pq = []
+    roots = {v for u, v, old, new in changes if new > old and prev[v] == u}
+    if roots:
+        children: Dict[int, List[int]] = {}
+        for x, p in enumerate(prev):
+            if p >= 0:
+                children.setdefault(p, []).append(x)
+        affected = []
+        stack = list(roots)
+        while stack:
+            x = stack.pop()
+            affected.append(x)
+            dist[x] = inf
+            prev[x] = -1
+            stack.extend(children.get(x, ()))
+        r_offsets, r_targets, r_weights = cg.reverse()
+        for x in affected:
+            for i in range(r_offsets[x], r_offsets[x + 1]):
+                y = r_targets[i]
+                nd = dist[y] + r_weights[i]
+                if nd < dist[x]:
+                    dist[x] = nd
+                    prev[x] = y
+            if dist[x] < inf:
+                push(pq, (dist[x], x))
+    for u, v, _, _ in changes:
+        du = dist[u]
+        if du == inf:
+            continue
+        for i in range(offsets[u], offsets[u + 1]):
+            if targets[i] == v and du + weights[i] < dist[v]:
+                dist[v] = du + weights[i]
+                prev[v] = u
+                push(pq, (dist[v], v))
+    while pq:
+        d, u = pop(pq)
+        if d > dist[u]:
+            continue
+        a, b = offsets[u], offsets[u + 1]
+        for v, w in zip(targets[a:b], weights[a:b]):
+            nd = d + w
+            if nd < dist[v]:
+                dist[v] = nd
+                prev[v] = u
+                push(pq, (nd, v))
+
+class ShortestPathTree:
+    
+    # Result of one full Dijkstra run from source. Paths are read back along
+    # prev, so each path_to costs O(path length) and matches dijkstra(source, x).
+    # A repaired tree gives the same distances, though on ties it may pick a
+    # different (equally short) path than a fresh run.
+
+    def __init__(self, cg: CompiledGraph, s: int, dist: Optional[List[float]] = None,
+                 prev: Optional[List[int]] = None):
+        self.graph = cg
+        self.version = cg.version
+        self.source = cg.names[s]
+        self._s = s
+        if dist is None:
+            dist, prev = cg.sssp(s)
+        self.dist, self.prev = dist, prev
+
+    def repaired(self, cg: CompiledGraph, changes: List[Tuple[int, int, float, float]]) -> "ShortestPathTree":
+        
+        dist, prev = list(self.dist), list(self.prev)
+        repair_sssp(cg, dist, prev, changes)
+        return ShortestPathTree(cg, self._s, dist, prev)
+
+    def distance_to(self, x: str) -> float:
+        
+        t = self.graph.index.get(x)
+        return self.dist[t] if t is not None else float("inf")
+
+    def path_to(self, x: str) -> List[str]:
+        
+        t = self.graph.index.get(x)
+        if t is None or self.dist[t] == float("inf"):
+            return []
+        names, prev = self.graph.names, self.prev
         path = []
-        cur = dst
-        while cur is not None:
-            path.append(cur)
-            cur = prev[cur]
+        while t != -1:
+            path.append(names[t])
+            t = prev[t]
         path.reverse()
-        return dist[dst], path
+        return path
 
-    def kruskal_mst(self) -> Tuple[float, List[Tuple[str, str, float]]]:
+    def reachable(self) -> List[str]:
         
-        if not self.undirected:
-            raise ValueError("Kruskal requires an undirected graph.")
-        dsu = DisjointSet()
-        for u in self.adj:
-            dsu.make_set(u)
-        edges = sorted(self.edges(), key=lambda e: e[2])
-        mst = []
-        total = 0.0
-        for u, v, w in edges:
-            if dsu.find(u) != dsu.find(v):
-                dsu.union(u, v)
-                mst.append((u, v, w))
-                total += w
-        return total, mst
+        # Reachable nodes ordered by distance, then by name.
+        inf = float("inf")
+        names, dist = self.graph.names, self.dist
+        order = sorted((d, u) for u, d in enumerate(dist) if d != inf)
+        return [names[u] for _, u in order]
 
-@dataclass
-class BSTNode:
-   
-    key: str
-    left: Optional["BSTNode"] = None
-    right: Optional["BSTNode"] = None
+class RouteTable:
+    
+    # All-pairs distance and predecessor matrices, row-major by source. A
+    # route is one distance lookup plus a walk back along pred[src] from the
+    # destination. Predecessors (rather than next hops) are stored so every
+    # route is exactly the path Graph.dijkstra would return, ties included
+    # (a table repaired after edge edits may break ties differently).
+
+    MAGIC = b"CNRT0001"
+    HEADER = struct.Struct("<8sQQ20s4x")
+
+    def __init__(self, names: List[str], dist, pred, fingerprint: bytes, buffer=None):
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+        self.dist = dist
+        self.pred = pred
+        self.fingerprint = fingerprint
+        self._buffer = buffer
+
+    @classmethod
+    def build(cls, cg: CompiledGraph) -> "RouteTable":
+        
+        n = len(cg)
+        dist = array("d")
+        pred = array("i")
+        for s in range(n):
+            d, p = cg.sssp(s)
+            dist.extend(d)
+            pred.extend(p)
+        return cls(list(cg.names), dist, pred, cg.fingerprint())
+
+    @classmethod
+    def load(cls, path: str) -> "RouteTable":
+        
+        with open(path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, names_len, fingerprint = cls.HEADER.unpack_from(buf, 0)
+        if magic != cls.MAGIC:
+            buf.close()
+            raise ValueError(f"{path} is not a route table")
+        off = cls.HEADER.size
+        names = json.loads(bytes(buf[off:off + names_len]).decode("utf-8"))
+        off += names_len + (-names_len % 8)
+        view = memoryview(buf)
+        dist = view[off:off + 8 * n * n].cast("d")
+        off += 8 * n * n
+        pred = view[off:off + 4 * n * n].cast("i")
+        return cls(names, dist, pred, fingerprint, buffer=buf)
+
+    def save(self, path: str):
+        
+        n = len(self.names)
+        blob = json.dumps(self.names).encode("utf-8")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, n, len(blob), self.fingerprint))
+            f.write(blob + b"\0" * (-len(blob) % 8))
+            f.write(bytes(self.dist))
+            f.write(bytes(self.pred))
+        os.replace(tmp, path)
 
-class BST:
+    def nbytes(self) -> int:
+        
+        return self.dist.itemsize * len(self.dist) + self.pred.itemsize * len(self.pred)
+
+    def repaired(self, cg: CompiledGraph, changes: List[Tuple[int, int, float, float]]) -> "RouteTable":
+        
+        # Repairs every row for the given edge changes into a fresh in-memory
+        # table (a loaded table is a read-only mapping). Rows no changed edge
+        # can reach are copied untouched.
+        n = len(self.names)
+        dist = array("d", self.dist)
+        pred = array("i", self.pred)
+        tails = {u for u, _, _, _ in changes}
+        for s in range(n):
+            base = s * n
+            if all(dist[base + u] == float("inf") for u in tails):
+                continue
+            row_dist = dist[base:base + n].tolist()
+            row_pred = pred[base:base + n].tolist()
+            repair_sssp(cg, row_dist, row_pred, changes)
+            dist[base:base + n] = array("d", row_dist)
+            pred[base:base + n] = array("i", row_pred)
+        return RouteTable(list(cg.names), dist, pred, cg.fingerprint())
+
+    def route(self, src: str, dst: str) -> Tuple[float, List[str]]:
+        
+        s, t = self.index.get(src), self.index.get(dst)
+        if s is None or t is None:
+            return float("inf"), []
+        base = s * len(self.names)
+        d = self.dist[base + t]
+        if d == float("inf"):
+            return float("inf"), []
+        pred, names = self.pred, self.names
+        path = [names[t]]
+        cur = t
+        while cur != s:
+            cur = pred[base + cur]
+            path.append(names[cur])
+        path.reverse()
+        return d, path
+
+class RouteCache:
     
-    def __init__(self):
-        self.root: Optional[BSTNode] = None
+    # Bounded LRU cache with an optional TTL. Keys end with the graph version
+    # they were computed against; the first lookup against a newer version
+    # drops every entry, so Graph mutations invalidate it automatically.
 
-    def insert(self, key: str):
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_version(self, version) -> bool:
+        # Returns False for keys from an older graph version (a reader that
+        # raced a mutation); those are neither served nor stored.
+        if self._version is None or version > self._version:
+            if self._data:
+                self.invalidations += 1
+                self._data.clear()
+            self._version = version
+        return version == self._version
+
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        
+        with self._lock:
+            entry = self._data.get(key) if self._check_version(key[-1]) else None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            expires, value = entry
+            if expires and expires < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def put(self, key: Tuple, value: Any):
+        
+        if self.maxsize <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl else 0.0
+        with self._lock:
+            if not self._check_version(key[-1]):
+                return
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Tuple, compute: Callable[[], Any]) -> Any:
+        
+        found, value = self.get(key)
+        if not found:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
         
-        self.root = self._insert(self.root, key)
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+class LocationIndex:
+    
+    # Sorted-array location index. Inserts are buffered and merged in one
+    # sort on the next read, so bulk loads cost O(n log n) whatever the input
+    # order, lookups are a bisect, and nothing recurses.
+
+    def __init__(self, keys: Optional[List[str]] = None):
+        self._keys: List[str] = sorted(set(keys)) if keys else []
+        self._pending: List[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sorted())
 
-    def _insert(self, node: Optional[BSTNode], key: str) -> BSTNode:
-        if node is None:
-            return BSTNode(key)
-        if key < node.key:
-            node.left = self._insert(node.left, key)
-        elif key > node.key:
-            node.right = self._insert(node.right, key)
-        return node
+    def _sorted(self) -> List[str]:
+        if self._pending:
+            with self._lock:
+                if self._pending:
+                    merged = set(self._pending)
+                    merged.update(self._keys)
+                    self._keys = sorted(merged)
+                    self._pending = []
+        return self._keys
+
+    def insert(self, key: str):
+        
+        with self._lock:
+            self._pending.append(key)
 
     def search(self, key: str) -> bool:
         
-        cur = self.root
-        while cur:
-            if key == cur.key:
-                return True
-            cur = cur.left if key < cur.key else cur.right
-        return False
+        keys = self._sorted()
+        i = bisect.bisect_left(keys, key)
+        return i < len(keys) and keys[i] == key
 
     def inorder(self) -> List[str]:
         
-        out: List[str] = []
-        def _in(node: Optional[BSTNode]):
-            if not node:
-                return
-            _in(node.left)
-            out.append(node.key)
-            _in(node.right)
-        _in(self.root)
+        return list(self._sorted())
+
+_TOKEN_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+_QUERY_TOKEN_RE = re.compile(r"[a-z]+|\d+")
+
+def _counting_heap(dist: List[float], offsets, counts: List[int], t: int = -1) -> Tuple[Callable, Callable]:
+    # heappop/heappush stand-ins that tally [settled, relaxed, pushes]. A
+    # pop is a settle unless the entry is stale; the target is settled but
+    # its edges are never scanned.
+    heappop, heappush = heapq.heappop, heapq.heappush
+
+    def pop(heap):
+        item = heappop(heap)
+        u = item[1]
+        if item[0] <= dist[u]:
+            counts[0] += 1
+            if u != t:
+                counts[1] += offsets[u + 1] - offsets[u]
+        return item
+
+    def push(heap, item):
+        counts[2] += 1
+        heappush(heap, item)
+
+    return pop, push
+
+class _CountingStack(list):
+    # A list whose append tallies counts[2]; stands in for the DFS stack
+    # while instrumentation is on.
+
+    def __init__(self, items: List[int], counts: List[int]):
+        super().__init__(items)
+        self.counts = counts
+        counts[2] += len(items)
+
+    def append(self, item: int):
+        self.counts[2] += 1
+        super().append(item)
+
+def _edit_distance(a: str, b: str) -> int:
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return prev[-1]
+
+class AutocompleteIndex:
+    
+    # Ranked search over location names. Names are normalised to lowercase
+    # alphanumerics and split into words ("LectureHall4" -> lecture|hall|4).
+    # Prefix lookups bisect a sorted array of word-start suffixes (a flat
+    # trie); typos fall back to a trigram index re-ranked by edit distance.
+    # Every stage scans a capped number of entries, so query time stays
+    # bounded as the location count grows.
+
+    SCAN_LIMIT = 200
+    POSTING_LIMIT = 2000
+    FUZZY_CANDIDATES = 50
+
+    def __init__(self, names: List[str]):
+        self.names = sorted(set(names))
+        self.norm: List[str] = []
+        self.starts: List[Tuple[int, ...]] = []
+        suffixes = []
+        trigrams: Dict[str, List[int]] = {}
+        for i, name in enumerate(self.names):
+            words = [w.lower() for w in _TOKEN_RE.findall(name)]
+            key = "".join(words)
+            starts = []
+            pos = 0
+            for w in words:
+                starts.append(pos)
+                suffixes.append((key[pos:], i))
+                pos += len(w)
+            self.norm.append(key)
+            self.starts.append(tuple(starts))
+            padded = f"${key}$"
+            for gram in {padded[j:j + 3] for j in range(len(padded) - 2)}:
+                trigrams.setdefault(gram, []).append(i)
+        suffixes.sort()
+        self._suffix_keys = [k for k, _ in suffixes]
+        self._suffix_ids = [i for _, i in suffixes]
+        self._trigrams = trigrams
+
+    def _prefixed(self, prefix: str) -> List[int]:
+        keys, ids = self._suffix_keys, self._suffix_ids
+        out = []
+        i = bisect.bisect_left(keys, prefix)
+        while i < len(keys) and len(out) < self.SCAN_LIMIT and keys[i].startswith(prefix):
+            out.append(ids[i])
+            i += 1
         return out
 
-def create_campus_graph() -> Tuple[Graph, BST]:
+    def _matches_words(self, i: int, words: List[str]) -> bool:
+        key = self.norm[i]
+        return all(any(key.startswith(w, p) for p in self.starts[i]) for w in words)
+
+    def search(self, query: str, k: int = 10) -> List[str]:
+        
+        words = _QUERY_TOKEN_RE.findall(query.lower())
+        if not words or k <= 0:
+            return []
+        q = "".join(words)
+        ranked: Dict[int, Tuple] = {}
+
+        def offer(i: int, score: Tuple):
+            if i not in ranked or score < ranked[i]:
+                ranked[i] = score
+
+        for i in self._prefixed(q):
+            offer(i, (0 if self.norm[i] == q else 1 if self.norm[i].startswith(q) else 2, 0, len(self.norm[i])))
+        longest = max(words, key=len)
+        for i in self._prefixed(longest):
+            if self._matches_words(i, words):
+                offer(i, (3, 0, len(self.norm[i])))
+
+        if len(ranked) < k:
+            padded = f"${q}$"
+            counts: Dict[int, int] = {}
+            for gram in {padded[j:j + 3] for j in range(len(padded) - 2)}:
+                for i in self._trigrams.get(gram, ())[:self.POSTING_LIMIT]:
+                    counts[i] = counts.get(i, 0) + 1
+            best = heapq.nlargest(self.FUZZY_CANDIDATES, counts.items(), key=lambda kv: kv[1])
+            budget = max(1, len(q) // 3)
+            for i, _ in best:
+                key = self.norm[i]
+                dist = min(_edit_distance(q, key), _edit_distance(q, key[:len(q)]))
+                if dist <= budget:
+                    offer(i, (4, dist, len(key)))
+
+        order = sorted(ranked, key=lambda i: ranked[i] + (self.names[i],))
+        return [self.names[i] for i in order[:k]]
+
+_FLOOR_RE = re.compile(r"(?:^|_)(?:GF|F(\d+))(?:_|$)")
+
+def floor_from_name(name: str) -> Optional[int]:
+    
+    # "Stairs_B1_GF" -> 0, "B2_F1" -> 1; None when the name has no floor tag.
+    m = _FLOOR_RE.search(name)
+    if not m:
+        return None
+    return int(m.group(1)) if m.group(1) else 0
+
+_CLOCK_RE = re.compile(r"(\d{1,2}):(\d{2})")
+
+def parse_clock(value) -> int:
+    
+    # "08:30" (or whole minutes as a number) -> minutes since midnight.
+    # "24:00" (and 1440) is kept on purpose and wraps to 0, so a corridor
+    # can close "at midnight" at the end of the day it opened.
+    if isinstance(value, str) and ":" in value:
+        m = _CLOCK_RE.fullmatch(value.strip())
+        if not m:
+            raise ValueError(f"Not a time of day: {value}")
+        hours, minutes = int(m.group(1)), int(m.group(2))
+        if not (0 <= hours < 24 and 0 <= minutes < 60) and (hours, minutes) != (24, 0):
+            raise ValueError(f"Not a time of day: {value}")
+        minute = hours * 60 + minutes
+    else:
+        if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+            raise ValueError(f"Not a time of day: {value}")
+        minute = int(value)
+        if not 0 <= minute <= 1440:
+            raise ValueError(f"Not a time of day: {value}")
+    return minute % 1440
+
+def create_campus_graph() -> Tuple[Graph, LocationIndex]:
     
     g = Graph(undirected=True)
     edges = [
@@ -252,84 +2420,366 @@ def create_campus_graph() -> Tuple[Graph, BST]:
     for u, v, w in edges:
         g.add_edge(u, v, float(w))
 
-    
-    bst = BST()
+    # Tags for the routing profiles: stairwells are not step-free and
+    # OutsideArea is open to the weather.
+    for u, v, _ in edges:
+        tags = set()
+        if u.startswith("Stairs_") or v.startswith("Stairs_"):
+            tags.add("stairs")
+        if "OutsideArea" in (u, v):
+            tags.add("outdoor")
+        if tags:
+            g.set_edge_tags(u, v, tags)
+
+    # Floors for Building 1 follow the sections above; Building 2 names
+    # encode their own floor (B2_GF, B2_F1, ...).
+    floors = {
+        0: ["Cafeteria", "LectureHall2", "LectureHall1", "AssistantsOffice",
+            "LectureHall3", "PaymentOffice"],
+        1: ["LectureHall4", "LectureHall5", "LectureHall6"],
+        2: ["BusinessOffice", "LectureHallA", "LectureHallB", "StudyArea",
+            "LectureHall7_10", "OutsideArea", "Auditorium"],
+        3: ["Library", "EngineeringSection"],
+        4: ["ComputingOffice", "ComputingLab", "TeachersOffices", "HarrisonHall",
+            "NetEngLab", "Lab01"],
+    }
+    for level, names in floors.items():
+        for name in names:
+            g.add_node(name, floor=level)
     for name in g.nodes():
-        bst.insert(name)
+        level = floor_from_name(name)
+        if level is not None:
+            g.add_node(name, floor=level)
+
+    
+    index = LocationIndex(g.nodes())
+    
+    return g, index
+
+@dataclass(frozen=True)
+class Route:
+    
+    # A shortest-path answer. Text is only built when format() is called.
+    start: str
+    destination: str
+    path: Tuple[str, ...] = ()
+    distance: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+    @property
+    def hops(self) -> int:
+        return max(0, len(self.path) - 1)
+
+    def format(self) -> str:
+        
+        if self.error:
+            return self.error
+        return f"Shortest path {self.start} -> {self.destination}: {' -> '.join(self.path)} (distance={self.distance})"
+
+    __str__ = format
+
+@dataclass(frozen=True)
+class Traversal:
+    
+    # BFS/DFS visit order plus, for BFS with a destination, the hop path.
+    algorithm: str
+    start: str
+    order: Tuple[str, ...] = ()
+    destination: Optional[str] = None
+    path: Tuple[str, ...] = ()
+    error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+    @property
+    def hops(self) -> int:
+        return max(0, len(self.path) - 1)
+
+    def format(self) -> str:
+        
+        if self.error:
+            return self.error
+        text = f"{self.algorithm} order: {' -> '.join(self.order)}"
+        if self.path:
+            text += f"\n{self.algorithm} path {self.start} -> {self.destination}: {' -> '.join(self.path)} (unweighted hops)"
+        elif self.destination:
+            text += f"\nDestination '{self.destination}' not reachable from '{self.start}'"
+        return text
+
+    __str__ = format
+
+@dataclass(frozen=True)
+class SpanningTree:
     
-    return g, bst
+    total: float = 0.0
+    edges: Tuple[Tuple[str, str, float], ...] = ()
+    error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+    def format(self) -> str:
+        
+        if self.error:
+            return self.error
+        lines = [f"MST total weight: {self.total}"]
+        lines.extend(f"{u} -- {v} (w={w})" for u, v, w in self.edges)
+        return "\n".join(lines)
+
+    __str__ = format
 
 class CampusNavigator:
     
-    def __init__(self):
-        self.graph, self.bst = create_campus_graph()
+    def __init__(self, precompute: bool = False, route_table_path: Optional[str] = None,
+                 cache_size: int = 1024, cache_ttl: Optional[float] = None,
+                 bidirectional: bool = False, hierarchy: bool = False,
+                 hierarchy_path: Optional[str] = None, graph_path: Optional[str] = None):
+        if graph_path:
+            # A campus model exported to CSV/JSON Lines/GeoJSON or a snapshot.
+            from graph_io import load_graph
+            self.graph = load_graph(graph_path)
+            self.locations = LocationIndex(self.graph.nodes())
+        else:
+            self.graph, self.locations = create_campus_graph()
+        self.bidirectional = bidirectional
+        self.profiles: Dict[str, RoutingProfile] = dict(ROUTING_PROFILES)
+        self.route_cache = RouteCache(cache_size, cache_ttl)
+        self.route_table: Optional[RouteTable] = None
+        self._repair_lock = threading.Lock()
+        self.hierarchy = None
+        if precompute or route_table_path:
+            self.precompute_routes(route_table_path)
+        if hierarchy or hierarchy_path:
+            self.build_hierarchy(hierarchy_path)
+
+    def _load_or_build(self, index_cls, path: Optional[str]):
+        # Reuse an index saved by an earlier run when it was built from this
+        # exact graph; otherwise rebuild it (and save it if a path was given).
+        # Returns the index with the snapshot version it matches.
+        cg = self.graph.compile()
+        index = None
+        if path and os.path.exists(path):
+            try:
+                index = index_cls.load(path)
+            except (ValueError, struct.error):
+                index = None
+            if index is not None and index.fingerprint != cg.fingerprint():
+                index = None
+        if index is None:
+            index = index_cls.build(cg)
+            if path:
+                index.save(path)
+        return index, cg.version
+
+    def precompute_routes(self, path: Optional[str] = None) -> RouteTable:
+        
+        self.route_table, self._route_table_version = self._load_or_build(RouteTable, path)
+        return self.route_table
+
+    def build_hierarchy(self, path: Optional[str] = None):
+        
+        from contraction import ContractionHierarchy
+        self.hierarchy, self._hierarchy_version = self._load_or_build(ContractionHierarchy, path)
+        return self.hierarchy
     
     def get_locations(self) -> List[str]:
         
         return sorted(self.graph.nodes())
     
-    def find_shortest_path(self, start: str, destination: str) -> Tuple[bool, str, float]:
+    def find_shortest_path(self, start: str, destination: str, profile: Optional[str] = None,
+                           at: Optional[int] = None) -> Route:
        
-        if start not in self.graph.adj or destination not in self.graph.adj:
-            return False, "Invalid start or destination location", 0.0
+        # Cache keys use the version of the snapshot the query runs on, never
+        # graph.version, which a concurrent writer may already have bumped.
+        # profile names one of self.profiles; at is a minute of the day and
+        # only matters to edges with opening hours.
+        return self._cached_shortest_path(start, destination, profile, at, self.graph.compile())
+
+    def _cached_shortest_path(self, start: str, destination: str, profile: Optional[str], at: Optional[int],
+                              cg: CompiledGraph) -> Route:
+        if profile is not None and profile not in self.profiles:
+            return Route(start, destination, error=f"Unknown routing profile: {profile}")
+        rp = self.profiles[profile] if profile is not None else None
+        slot = cg.time_slot(at) if rp is None or rp.respect_hours else None
+        key = ("dijkstra", start, destination, profile, slot, cg.version)
+        return self.route_cache.get_or_compute(key, lambda: self._shortest_path(start, destination, cg, rp, at))
+
+    def _shortest_path(self, start: str, destination: str, cg: CompiledGraph,
+                       profile: Optional[RoutingProfile] = None, at: Optional[int] = None) -> Route:
+        if start not in cg.index or destination not in cg.index:
+            return Route(start, destination, error="Invalid start or destination location")
         
-        distance, path = self.graph.dijkstra(start, destination)
+        # The route table and hierarchy only know the unrestricted graph.
+        plain = cg.restricted(profile, at) is cg
+        table = self._current_route_table(cg) if plain else None
+        if table is not None:
+            distance, path = table.route(start, destination)
+        elif plain and self.hierarchy is not None and self._hierarchy_version == cg.version:
+            distance, path = self.hierarchy.route(start, destination)
+        elif cg.xs is not None:
+            distance, path = self.graph.astar(start, destination, profile, at, cg)
+        elif self.bidirectional:
+            distance, path = self.graph.bidirectional_dijkstra(start, destination, profile, at, cg)
+        else:
+            distance, path = self.graph.dijkstra(start, destination, profile, at, cg)
         
         if not path:
-            return False, "No path found between locations", 0.0
+            return Route(start, destination, error="No path found between locations")
         
-        path_str = " -> ".join(path)
-        result = f"Shortest path {start} -> {destination}: {path_str} (distance={distance})"
-        return True, result, distance
+        return Route(start, destination, tuple(path), distance)
     
-    def bfs_traversal(self, start: str, destination: str = None) -> Tuple[bool, str]:
+    ALTERNATIVE_MAX_OVERLAP = 0.8
+
+    def alternative_routes(self, start: str, destination: str, k: int = 3, profile: Optional[str] = None,
+                           at: Optional[int] = None,
+                           max_overlap: Optional[float] = ALTERNATIVE_MAX_OVERLAP) -> List[Route]:
+        
+        # Up to k routes, shortest first; the first is find_shortest_path's.
+        # By default a route sharing more than ALTERNATIVE_MAX_OVERLAP of its
+        # length with an earlier one is skipped; None gives plain k-shortest.
+        # A failed shortest path comes back alone with its error.
+        cg = self.graph.compile()
+        best = self._cached_shortest_path(start, destination, profile, at, cg)
+        if not best.success or k <= 1:
+            return [best]
+        rp = self.profiles[profile] if profile is not None else None
+        slot = cg.time_slot(at) if rp is None or rp.respect_hours else None
+        key = ("alternatives", start, destination, k, max_overlap, profile, slot, cg.version)
+        return self.route_cache.get_or_compute(key, lambda: [
+            Route(start, destination, tuple(path), distance)
+            for distance, path in self.graph.k_shortest_paths(start, destination, k, rp, at, max_overlap,
+                                                              list(best.path), cg)
+        ] or [best])
+
+    def _current_route_table(self, cg: CompiledGraph) -> Optional[RouteTable]:
+        # The route table brought up to cg's version by replaying edge edits,
+        # or None when that is not possible (or another thread is already
+        # repairing it; the caller then falls back to searching the graph).
+        table, version = self.route_table, getattr(self, "_route_table_version", None)
+        if table is None or version == cg.version:
+            return table
+        if version > cg.version or not self._repair_lock.acquire(blocking=False):
+            return None
+        try:
+            if self._route_table_version < cg.version:
+                changes = self.graph.edge_changes(self._route_table_version, cg)
+                if changes is None:
+                    return None
+                self.route_table = self.route_table.repaired(cg, changes)
+                self._route_table_version = cg.version
+            return self.route_table if self._route_table_version == cg.version else None
+        finally:
+            self._repair_lock.release()
+
+    def update_edge(self, start: str, end: str, weight: float) -> bool:
+        
+        return self.graph.update_edge(start, end, weight)
+
+    def disable_edge(self, start: str, end: str) -> bool:
+        
+        return self.graph.disable_edge(start, end)
+
+    def enable_edge(self, start: str, end: str) -> bool:
+        
+        return self.graph.enable_edge(start, end)
+
+    def disabled_edges(self) -> List[Tuple[str, str, float]]:
+        
+        return [(u, v, w) for (u, v), ws in sorted(self.graph.disabled.items()) for w in ws]
+    
+    def distance_matrix(self, sources: List[str], targets: List[str]) -> Iterator[List[float]]:
+        
+        # Rows are yielded as they are computed so callers can stream them.
+        # With a contraction hierarchy this is the bucket-based many-to-many
+        # search; otherwise one early-stopping Dijkstra per source.
+        hierarchy = self.hierarchy
+        if hierarchy is not None and self._hierarchy_version == self.graph.compile().version:
+            return hierarchy.iter_many_to_many(sources, targets)
+        return self.graph.iter_many_to_many(sources, targets)
+    
+    def routes_from(self, start: str) -> Optional[List[Route]]:
+        
+        tree = self.graph.shortest_path_tree(start)
+        if tree is None:
+            return None
+        return [Route(start, x, tuple(tree.path_to(x)), tree.distance_to(x))
+                for x in tree.reachable() if x != start]
+    
+    def bfs_traversal(self, start: str, destination: str = None) -> Traversal:
        
-        if start not in self.graph.adj:
-            return False, "Invalid start location"
+        cg = self.graph.compile()
+        key = ("bfs", start, destination, cg.version)
+        return self.route_cache.get_or_compute(key, lambda: self._bfs_traversal(start, destination, cg))
+
+    def _bfs_traversal(self, start: str, destination: Optional[str], cg: CompiledGraph) -> Traversal:
+        if start not in cg.index:
+            return Traversal("BFS", start, destination=destination, error="Invalid start location")
         
-        order, parent = self.graph.bfs(start)
-        result = f"BFS order: {' -> '.join(order)}"
+        order, parent = self.graph.bfs(start, cg)
         
+        path = []
         if destination and destination in parent:
-            path = []
             cur = destination
             while cur is not None:
                 path.append(cur)
                 cur = parent[cur]
             path.reverse()
-            result += f"\nBFS path {start} -> {destination}: {' -> '.join(path)} (unweighted hops)"
-        elif destination:
-            result += f"\nDestination '{destination}' not reachable from '{start}'"
         
-        return True, result
+        return Traversal("BFS", start, tuple(order), destination, tuple(path))
     
-    def dfs_traversal(self, start: str) -> Tuple[bool, str]:
+    def dfs_traversal(self, start: str) -> Traversal:
         
-        if start not in self.graph.adj:
-            return False, "Invalid start location"
+        if start not in self.graph.compile().index:
+            return Traversal("DFS", start, error="Invalid start location")
         
-        order = self.graph.dfs(start)
-        result = f"DFS order: {' -> '.join(order)}"
-        return True, result
-    
-    def get_minimum_spanning_tree(self) -> Tuple[bool, str]:
+        return Traversal("DFS", start, tuple(self.graph.dfs(start)))
+
+    def traverse(self, algorithm: str, start: str, destination: Optional[str] = None,
+                 max_hops: Optional[int] = None,
+                 max_distance: Optional[float] = None) -> Optional[Iterator[Tuple[str, float, Optional[str]]]]:
+
+        # Streaming counterpart of bfs_traversal/dfs_traversal: nothing is
+        # materialised or cached, and the walk ends at destination or the
+        # budget. None for an unknown start.
+        if start not in self.graph.compile().index:
+            return None
+        return self.graph.traverse(algorithm, start, destination, max_hops, max_distance)
+
+    def get_minimum_spanning_tree(self) -> SpanningTree:
        
+        # Keyed on the version the published MST belongs to, which can lag
+        # the latest snapshot while an edit is in progress.
         try:
-            total, mst = self.graph.kruskal_mst()
-            result = f"MST total weight: {total}\n"
-            for u, v, w in mst:
-                result += f"{u} -- {v} (w={w})\n"
-            return True, result.strip()
+            version, (total, mst) = self.graph.versioned_mst()
         except Exception as e:
-            return False, str(e)
+            return SpanningTree(error=str(e))
+        key = ("mst", None, None, version)
+        return self.route_cache.get_or_compute(key, lambda: SpanningTree(total, tuple(mst)))
+    
+    def autocomplete(self, query: str, k: int = 10) -> List[str]:
+        
+        # Only the names matter, so edge edits keep the index.
+        cg = self.graph.compile()
+        index = getattr(self, "_autocomplete", None)
+        if index is None or self._autocomplete_nodes != cg.node_version:
+            index = AutocompleteIndex(cg.names)
+            self._autocomplete, self._autocomplete_nodes = index, cg.node_version
+        return index.search(query, k)
     
     def search_location(self, location: str) -> bool:
         
-        return self.bst.search(location)
+        return self.locations.search(location)
     
     def get_sorted_locations(self) -> List[str]:
         
-        return self.bst.inorder()
+        return self.locations.inorder()
 
 
 def print_menu():
@@ -340,39 +2790,35 @@ def print_menu():
     print("3) BFS traversal (and optional path to destination)")
     print("4) DFS traversal")
     print("5) Minimum Spanning Tree (Kruskal)")
-    print("6) Search location (BST)")
-    print("7) Show all locations sorted (BST inorder)")
+    print("6) Search location (sorted index)")
+    print("7) Show all locations sorted")
     print("0) Exit")
 
-def run_console_demo():
+def run_console_demo(navigator: Optional[CampusNavigator] = None):
    
-    navigator = CampusNavigator()
+    navigator = navigator or CampusNavigator()
     
     print("DEMO MODE: automatic runs for screenshots.\n")
     print("1) Locations:", ", ".join(navigator.get_locations()))
 
     print("\n2) Dijkstra: shortest path Cafeteria -> Auditorium")
-    success, result, _ = navigator.find_shortest_path("Cafeteria", "Auditorium")
-    print(f"   {result}")
+    print(f"   {navigator.find_shortest_path('Cafeteria', 'Auditorium')}")
 
     print("\n3) BFS from Cafeteria:")
-    success, result = navigator.bfs_traversal("Cafeteria")
-    print(f"   {result}")
+    print(f"   {navigator.bfs_traversal('Cafeteria')}")
 
     print("\n4) DFS from Cafeteria:")
-    success, result = navigator.dfs_traversal("Cafeteria")
-    print(f"   {result}")
+    print(f"   {navigator.dfs_traversal('Cafeteria')}")
 
     print("\n5) Kruskal MST:")
-    success, result = navigator.get_minimum_spanning_tree()
-    print("   " + result.replace('\n', '\n   '))
+    print("   " + navigator.get_minimum_spanning_tree().format().replace('\n', '\n   '))
 
-    print("\n6) BST inorder (sorted locations):")
+    print("\n6) Sorted locations (location index):")
     print("   ", navigator.get_sorted_locations())
 
-def run_console_interactive():
+def run_console_interactive(navigator: Optional[CampusNavigator] = None):
     
-    navigator = CampusNavigator()
+    navigator = navigator or CampusNavigator()
     
     print("Tip: Use exact location names from the list.")
     while True:
@@ -386,21 +2832,17 @@ def run_console_interactive():
         elif choice == "2":
             start = input("Start location: ").strip()
             dest = input("Destination location: ").strip()
-            success, result, _ = navigator.find_shortest_path(start, dest)
-            print(result)
+            print(navigator.find_shortest_path(start, dest))
         elif choice == "3":
             start = input("Start location: ").strip()
             dest = input("Destination (press Enter to skip): ").strip()
             dest = dest if dest else None
-            success, result = navigator.bfs_traversal(start, dest)
-            print(result)
+            print(navigator.bfs_traversal(start, dest))
         elif choice == "4":
             start = input("Start location: ").strip()
-            success, result = navigator.dfs_traversal(start)
-            print(result)
+            print(navigator.dfs_traversal(start))
         elif choice == "5":
-            success, result = navigator.get_minimum_spanning_tree()
-            print(result)
+            print(navigator.get_minimum_spanning_tree())
         elif choice == "6":
             location = input("Location name to search: ").strip()
             found = navigator.search_location(location)
@@ -413,9 +2855,40 @@ def run_console_interactive():
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--demo", action="store_true", help="Run demo output (non-interactive)")
+    parser.add_argument("--route-table", metavar="PATH", help="Precompute all-pairs routes, cached in PATH")
+    parser.add_argument("--hierarchy", metavar="PATH", help="Route with a contraction hierarchy, cached in PATH")
+    parser.add_argument("--graph", metavar="PATH", help="Load the campus from a CSV/JSONL/GeoJSON file or snapshot")
+    parser.add_argument("--bench", nargs="?", const="-", metavar="OUTPUT",
+                        help="Run the benchmark suite and write JSON to OUTPUT (default: stdout)")
+    parser.add_argument("--bench-sizes", type=int, nargs="+", metavar="N", help="Generated graph sizes for --bench")
+    parser.add_argument("--profile", nargs="?", const="campus_profile", metavar="PREFIX",
+                        help="Profile the --demo (default) or --bench run; writes PREFIX.pstats/.collapsed/.alloc.txt")
     args = parser.parse_args()
 
-    if args.demo:
-        run_console_demo()
+    def main():
+        if args.bench:
+            from benchmarks import SUITE_SIZES, run_suite
+            result = json.dumps(run_suite(args.bench_sizes or SUITE_SIZES), indent=2)
+            if args.bench == "-":
+                print(result)
+            else:
+                with open(args.bench, "w") as f:
+                    f.write(result)
+        else:
+            navigator = CampusNavigator(route_table_path=args.route_table, hierarchy_path=args.hierarchy,
+                                        graph_path=args.graph)
+            if args.demo:
+                run_console_demo(navigator)
+            else:
+                run_console_interactive(navigator)
+
+    if args.profile:
+        from profiling import Profile
+        # Profiling an interactive session is meaningless; default to the demo.
+        args.demo = args.demo or not args.bench
+        with Profile(sample_interval=0.05) as profile:
+            main()
+        print(profile.summary(), file=sys.stderr)
+        print("Profile written to " + ", ".join(profile.dump(args.profile)), file=sys.stderr)
     else:
-        run_console_interactive()
\ No newline at end of file
+        main()
\ No newline at end of file
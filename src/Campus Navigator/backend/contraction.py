@@ -0,0 +1,307 @@
+import heapq
+import json
+import mmap
+import os
+import struct
+from array import array
+from typing import Dict, Iterator, List, Tuple
+
+# Contraction hierarchies over a CompiledGraph. Nodes are contracted one at a
+# time in order of importance; whenever removing a node v would break the only
+# shortest u -> v -> x route, a shortcut u -> x (remembering v as its middle
+# node) is added. Queries then run a tiny bidirectional Dijkstra that only
+# climbs to higher-ranked nodes, and shortcuts are unpacked back into the full
+# node path.
+
+WITNESS_SETTLE_LIMIT = 60
+
+
+class ContractionHierarchy:
+
+    MAGIC = b"CNCH0001"
+    HEADER = struct.Struct("<8sQQQQ20s4x")
+
+    def __init__(self, names: List[str], up: Tuple, down: Tuple, fingerprint: bytes, buffer=None):
+        # up: CSR of edges v -> x with rank[x] > rank[v], as
+        # (offsets, targets, weights, mids). down: CSR of edges u -> v with
+        # rank[u] > rank[v], stored at v so the backward search can climb.
+        # mid is -1 for an original edge, otherwise the bypassed node.
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+        self.up = up
+        self.down = down
+        self.fingerprint = fingerprint
+        self._buffer = buffer
+
+    @classmethod
+    def build(cls, cg, settle_limit: int = WITNESS_SETTLE_LIMIT) -> "ContractionHierarchy":
+
+        n = len(cg)
+        offsets, targets, weights = cg.offsets, cg.targets, cg.weights
+        out_adj: List[Dict[int, float]] = [{} for _ in range(n)]
+        in_adj: List[Dict[int, float]] = [{} for _ in range(n)]
+        for u in range(n):
+            for i in range(offsets[u], offsets[u + 1]):
+                v, w = targets[i], weights[i]
+                if v != u and w < out_adj[u].get(v, float("inf")):
+                    out_adj[u][v] = w
+                    in_adj[v][u] = w
+        mids: Dict[Tuple[int, int], int] = {}
+        up_lists: List[List[Tuple[int, float, int]]] = [[] for _ in range(n)]
+        down_lists: List[List[Tuple[int, float, int]]] = [[] for _ in range(n)]
+        deleted_neighbors = [0] * n
+
+        def witness(u: int, skip: int, limit: float) -> Dict[int, float]:
+            dist = {u: 0.0}
+            pq = [(0.0, u)]
+            settled = 0
+            while pq and settled < settle_limit:
+                d, a = heapq.heappop(pq)
+                if d > dist[a]:
+                    continue
+                if d > limit:
+                    break
+                settled += 1
+                for b, w in out_adj[a].items():
+                    if b == skip:
+                        continue
+                    nd = d + w
+                    if nd < dist.get(b, float("inf")):
+                        dist[b] = nd
+                        heapq.heappush(pq, (nd, b))
+            return dist
+
+        def shortcuts(v: int) -> List[Tuple[int, int, float]]:
+            found = []
+            outs = out_adj[v]
+            if not outs:
+                return found
+            for u, wu in in_adj[v].items():
+                onward = [w for x, w in outs.items() if x != u]
+                if not onward:
+                    continue
+                dist = witness(u, v, wu + max(onward))
+                for x, wx in outs.items():
+                    if x == u:
+                        continue
+                    d = wu + wx
+                    if dist.get(x, float("inf")) > d:
+                        found.append((u, x, d))
+            return found
+
+        def priority(v: int, added: List[Tuple[int, int, float]]) -> int:
+            # Edge difference plus a spread term so contraction stays uniform.
+            return len(added) - len(in_adj[v]) - len(out_adj[v]) + deleted_neighbors[v]
+
+        pq = [(priority(v, shortcuts(v)), v) for v in range(n)]
+        heapq.heapify(pq)
+        contracted = [False] * n
+        while pq:
+            _, v = heapq.heappop(pq)
+            if contracted[v]:
+                continue
+            # Lazy update: re-evaluate and put back if no longer the cheapest.
+            added = shortcuts(v)
+            p = priority(v, added)
+            if pq and p > pq[0][0]:
+                heapq.heappush(pq, (p, v))
+                continue
+            for u, x, d in added:
+                if d < out_adj[u].get(x, float("inf")):
+                    out_adj[u][x] = d
+                    in_adj[x][u] = d
+                    mids[(u, x)] = v
+            for x, w in out_adj[v].items():
+                up_lists[v].append((x, w, mids.get((v, x), -1)))
+                del in_adj[x][v]
+                deleted_neighbors[x] += 1
+            for u, w in in_adj[v].items():
+                down_lists[v].append((u, w, mids.get((u, v), -1)))
+                del out_adj[u][v]
+                deleted_neighbors[u] += 1
+            out_adj[v] = {}
+            in_adj[v] = {}
+            contracted[v] = True
+        return cls(list(cg.names), cls._pack(up_lists), cls._pack(down_lists), cg.fingerprint())
+
+    @staticmethod
+    def _pack(lists: List[List[Tuple[int, float, int]]]) -> Tuple[array, array, array, array]:
+        offsets = array("q", [0])
+        targets = array("i")
+        weights = array("d")
+        mids = array("i")
+        for edges in lists:
+            for x, w, m in edges:
+                targets.append(x)
+                weights.append(w)
+                mids.append(m)
+            offsets.append(len(targets))
+        return offsets, targets, weights, mids
+
+    @classmethod
+    def load(cls, path: str) -> "ContractionHierarchy":
+
+        with open(path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, names_len, m_up, m_down, fingerprint = cls.HEADER.unpack_from(buf, 0)
+        if magic != cls.MAGIC:
+            buf.close()
+            raise ValueError(f"{path} is not a contraction hierarchy")
+        off = cls.HEADER.size
+        names = json.loads(bytes(buf[off:off + names_len]).decode("utf-8"))
+        off += names_len + (-names_len % 8)
+        view = memoryview(buf)
+        parts = []
+        for m in (m_up, m_down):
+            csr = []
+            for code, size, count in (("q", 8, n + 1), ("i", 4, m), ("d", 8, m), ("i", 4, m)):
+                csr.append(view[off:off + size * count].cast(code))
+                off += size * count
+                off += -off % 8
+            parts.append(tuple(csr))
+        return cls(names, parts[0], parts[1], fingerprint, buffer=buf)
+
+    def save(self, path: str):
+
+        blob = json.dumps(self.names).encode("utf-8")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, len(self.names), len(blob),
+                                     len(self.up[1]), len(self.down[1]), self.fingerprint))
+            f.write(blob + b"\0" * (-len(blob) % 8))
+            for csr in (self.up, self.down):
+                for a in csr:
+                    data = bytes(a)
+                    f.write(data + b"\0" * (-len(data) % 8))
+        os.replace(tmp, path)
+
+    def shortcut_count(self) -> int:
+
+        return sum(1 for m in self.up[3] if m >= 0) + sum(1 for m in self.down[3] if m >= 0)
+
+    def query(self, s: int, t: int) -> Tuple[float, List[int]]:
+
+        inf = float("inf")
+        if s == t:
+            return 0.0, [s]
+        up_off, up_tgt, up_w, up_mid = self.up
+        dn_off, dn_tgt, dn_w, dn_mid = self.down
+        dist = ({s: 0.0}, {t: 0.0})
+        parent = ({s: (-1, -1)}, {t: (-1, -1)})
+        pqs = ([(0.0, s)], [(0.0, t)])
+        csrs = ((up_off, up_tgt, up_w, up_mid), (dn_off, dn_tgt, dn_w, dn_mid))
+        best, meet = inf, -1
+        pop, push = heapq.heappop, heapq.heappush
+        while True:
+            side = -1
+            top = best
+            for i in (0, 1):
+                if pqs[i] and pqs[i][0][0] < top:
+                    side, top = i, pqs[i][0][0]
+            if side < 0:
+                break
+            d, u = pop(pqs[side])
+            mine, other = dist[side], dist[1 - side]
+            if d > mine[u]:
+                continue
+            if u in other and d + other[u] < best:
+                best, meet = d + other[u], u
+            off, tgt, wts, mid = csrs[side]
+            par = parent[side]
+            for i in range(off[u], off[u + 1]):
+                v = tgt[i]
+                nd = d + wts[i]
+                if nd < mine.get(v, inf):
+                    mine[v] = nd
+                    par[v] = (u, mid[i])
+                    push(pqs[side], (nd, v))
+        if meet < 0:
+            return inf, []
+        climb = []
+        cur = meet
+        while parent[0][cur][0] >= 0:
+            p, m = parent[0][cur]
+            climb.append((p, cur, m))
+            cur = p
+        path = [s]
+        for a, b, m in reversed(climb):
+            path.extend(self._unpack(a, b, m))
+        cur = meet
+        while parent[1][cur][0] >= 0:
+            p, m = parent[1][cur]
+            path.extend(self._unpack(cur, p, m))
+            cur = p
+        return best, path
+
+    def _upward(self, s: int, csr: Tuple) -> Dict[int, float]:
+        # Complete upward search space of s (no early stop).
+        off, tgt, wts, _ = csr
+        dist = {s: 0.0}
+        pq = [(0.0, s)]
+        while pq:
+            d, u = heapq.heappop(pq)
+            if d > dist[u]:
+                continue
+            for i in range(off[u], off[u + 1]):
+                v = tgt[i]
+                nd = d + wts[i]
+                if nd < dist.get(v, float("inf")):
+                    dist[v] = nd
+                    heapq.heappush(pq, (nd, v))
+        return dist
+
+    def iter_many_to_many(self, sources: List[str], targets: List[str]) -> Iterator[List[float]]:
+
+        # Bucket-based many-to-many: one backward upward search per target
+        # fills buckets at the nodes it reaches, then each source's forward
+        # upward search scans those buckets. Rows are yielded per source.
+        inf = float("inf")
+        buckets: Dict[int, List[Tuple[int, float]]] = {}
+        for j, name in enumerate(targets):
+            t = self.index.get(name)
+            if t is None:
+                continue
+            for v, d in self._upward(t, self.down).items():
+                buckets.setdefault(v, []).append((j, d))
+        for name in sources:
+            row = [inf] * len(targets)
+            s = self.index.get(name)
+            if s is not None:
+                for v, d in self._upward(s, self.up).items():
+                    for j, db in buckets.get(v, ()):
+                        if d + db < row[j]:
+                            row[j] = d + db
+            yield row
+
+    def _find_mid(self, csr: Tuple, at: int, other: int) -> int:
+        off, tgt, _, mid = csr
+        for i in range(off[at], off[at + 1]):
+            if tgt[i] == other:
+                return mid[i]
+        raise KeyError((at, other))
+
+    def _unpack(self, a: int, b: int, m: int) -> List[int]:
+
+        # Expands edge a -> b (bypassing m, or original when m < 0) into its
+        # node sequence excluding a, without recursion. The middle node m was
+        # contracted before both ends: a -> m sits in m's down list and
+        # m -> b in m's up list.
+        out = []
+        stack = [(a, b, m)]
+        while stack:
+            a, b, m = stack.pop()
+            if m < 0:
+                out.append(b)
+                continue
+            stack.append((m, b, self._find_mid(self.up, m, b)))
+            stack.append((a, m, self._find_mid(self.down, m, a)))
+        return out
+
+    def route(self, src: str, dst: str) -> Tuple[float, List[str]]:
+
+        s, t = self.index.get(src), self.index.get(dst)
+        if s is None or t is None:
+            return float("inf"), []
+        d, path = self.query(s, t)
+        names = self.names
+        return d, [names[u] for u in path]
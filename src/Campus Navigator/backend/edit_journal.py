@@ -0,0 +1,56 @@
+import fcntl
+import json
+import os
+import threading
+from typing import Any, Callable, List
+
+
+class EditJournal:
+
+    # Append-only file of edit batches shared by pre-forked worker processes,
+    # each of which holds its own copy-on-write copy of the graph. A worker
+    # remembers how far into the file it has applied; sync() replays anything
+    # newer, so every worker (and any replacement forked later, which starts
+    # from the beginning) converges on the same graph. Appends hold an
+    # exclusive flock and first replay everything before them, so batches
+    # have one global order and apply() sees the same state in every worker.
+
+    def __init__(self, path: str, apply: Callable[[List], Any]):
+        self.path = path
+        self.apply = apply
+        self.offset = 0
+        self._lock = threading.Lock()
+
+    def sync(self):
+
+        # One stat per call when nothing is new.
+        if os.stat(self.path).st_size != self.offset:
+            with self._lock:
+                self._replay()
+
+    def _replay(self):
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Still being written; picked up on the next sync.
+                    break
+                self.apply(json.loads(line))
+                self.offset += len(line)
+
+    def record(self, batch: List) -> Any:
+
+        # Applies batch after every batch already journalled, appends it for
+        # the other workers and returns what apply() returned.
+        line = (json.dumps(batch, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock, open(self.path, "ab") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                self._replay()
+                result = self.apply(batch)
+                f.write(line)
+                f.flush()
+                self.offset += len(line)
+                return result
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
\ No newline at end of file
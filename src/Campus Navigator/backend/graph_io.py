@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import json
+import math
+import os
+from typing import IO, Iterator, Optional
+
+from campus_navigator_backend import Graph, parse_clock
+
+# Streaming importers for campus models exported from other tools. Every
+# loader reads its input incrementally (row by row, line by line, feature by
+# feature), so peak memory is the Graph being built rather than the file.
+#
+#   CSV        edges as from,to,weight; an optional nodes file as name,x,y,floor
+#   JSON Lines one object per line: {"from", "to", "weight"} for an edge or
+#              {"name", "x", "y", "floor"} for a node
+#
+# Edge records may also carry "tags" (a list, or names separated by ";") and
+# "open"/"close" times ("HH:MM") for routing profiles.
+#   GeoJSON    Point features are nodes (properties.name, optional floor),
+#              LineString features are edges (properties.from/to, weight
+#              defaulting to the line's length)
+#
+# A loaded graph can be written once as a binary snapshot (Graph.save_snapshot)
+# and memory-mapped on later starts.
+
+FROM_KEYS = ("from", "source", "u", "start")
+TO_KEYS = ("to", "target", "v", "end")
+WEIGHT_KEYS = ("weight", "distance", "length", "w", "cost")
+SNAPSHOT_SUFFIXES = (".cngs", ".snapshot")
+
+
+def _pick(record: dict, keys: tuple):
+    for key in keys:
+        if key in record and record[key] not in (None, ""):
+            return record[key]
+    return None
+
+
+def _optional_float(value) -> Optional[float]:
+    return float(value) if value not in (None, "") else None
+
+
+def _add_node_record(graph: Graph, record: dict):
+    name = record.get("name") or record.get("id")
+    if name is None:
+        raise ValueError(f"Node record without a name: {record}")
+    x, y = _optional_float(record.get("x")), _optional_float(record.get("y"))
+    floor = record.get("floor")
+    graph.add_node(str(name), (x, y) if x is not None and y is not None else None,
+                   int(floor) if floor not in (None, "") else None)
+
+
+def _add_edge_record(graph: Graph, record: dict, weight: Optional[float] = None):
+    u, v = _pick(record, FROM_KEYS), _pick(record, TO_KEYS)
+    w = _pick(record, WEIGHT_KEYS)
+    if w is None:
+        w = weight
+    if u is None or v is None or w is None:
+        raise ValueError(f"Edge record needs from, to and weight: {record}")
+    graph.add_edge(str(u), str(v), float(w))
+    tags = record.get("tags")
+    if tags:
+        graph.set_edge_tags(str(u), str(v), tags.split(";") if isinstance(tags, str) else tags)
+    if record.get("open") not in (None, "") and record.get("close") not in (None, ""):
+        graph.set_edge_hours(str(u), str(v), (parse_clock(record["open"]), parse_clock(record["close"])))
+
+
+def _csv_records(path: str) -> Iterator[dict]:
+    # Rows as dicts. Files without a header row are read as from,to,weight
+    # (edges) or name,x,y,floor (nodes) by position.
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        keys = [h.strip().lower() for h in header]
+        if not set(keys) & set(FROM_KEYS + ("name", "id")):
+            keys = None
+            yield {"_row": header}
+        for row in reader:
+            if not row:
+                continue
+            yield dict(zip(keys, row)) if keys else {"_row": row}
+
+
+def load_csv(edges_path: str, nodes_path: Optional[str] = None, undirected: bool = True) -> Graph:
+
+    graph = Graph(undirected=undirected)
+    with graph.edit():
+        if nodes_path:
+            for record in _csv_records(nodes_path):
+                if "_row" in record:
+                    record = dict(zip(("name", "x", "y", "floor"), record["_row"]))
+                _add_node_record(graph, record)
+        for record in _csv_records(edges_path):
+            if "_row" in record:
+                record = dict(zip(("from", "to", "weight"), record["_row"]))
+            _add_edge_record(graph, record)
+    return graph
+
+
+def load_jsonl(path: str, undirected: bool = True) -> Graph:
+
+    graph = Graph(undirected=undirected)
+    with graph.edit(), open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if _pick(record, FROM_KEYS) is not None:
+                _add_edge_record(graph, record)
+            else:
+                _add_node_record(graph, record)
+    return graph
+
+
+def iter_geojson_features(f: IO[str], chunk_size: int = 1 << 16) -> Iterator[dict]:
+
+    # Walks the top-level "features" array one feature at a time, reading
+    # the file in chunks instead of json.load-ing the whole collection.
+    decoder = json.JSONDecoder()
+    buf = ""
+    while True:
+        at = buf.find('"features"')
+        bracket = buf.find("[", at) if at >= 0 else -1
+        if bracket >= 0:
+            buf = buf[bracket + 1:]
+            break
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        buf += chunk
+    while True:
+        buf = buf.lstrip(" \t\r\n,")
+        if buf.startswith("]"):
+            return
+        try:
+            feature, end = decoder.raw_decode(buf)
+        except json.JSONDecodeError:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise ValueError("Truncated GeoJSON feature collection")
+            buf += chunk
+            continue
+        yield feature
+        buf = buf[end:]
+
+
+def load_geojson(path: str, undirected: bool = True) -> Graph:
+
+    graph = Graph(undirected=undirected)
+    with graph.edit(), open(path, encoding="utf-8") as f:
+        for feature in iter_geojson_features(f):
+            geometry = feature.get("geometry") or {}
+            props = feature.get("properties") or {}
+            kind = geometry.get("type")
+            coords = geometry.get("coordinates")
+            if kind == "Point":
+                _add_node_record(graph, {**props, "x": coords[0], "y": coords[1]})
+            elif kind == "LineString":
+                length = sum(math.hypot(b[0] - a[0], b[1] - a[1]) for a, b in zip(coords, coords[1:]))
+                _add_edge_record(graph, props, weight=length)
+    return graph
+
+
+def load_graph(path: str, nodes_path: Optional[str] = None, undirected: bool = True) -> Graph:
+
+    # Picks the loader from the file extension.
+    ext = os.path.splitext(path)[1].lower()
+    if ext in SNAPSHOT_SUFFIXES:
+        return Graph.from_snapshot(path)
+    if ext == ".csv":
+        return load_csv(path, nodes_path, undirected)
+    if ext in (".jsonl", ".ndjson"):
+        return load_jsonl(path, undirected)
+    if ext in (".geojson", ".json"):
+        return load_geojson(path, undirected)
+    raise ValueError(f"Unsupported graph file: {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a campus model to a binary graph snapshot")
+    parser.add_argument("source", help="CSV, JSON Lines or GeoJSON file")
+    parser.add_argument("snapshot", help="Output snapshot path (.cngs)")
+    parser.add_argument("--nodes", help="Optional nodes CSV (name,x,y,floor)")
+    parser.add_argument("--directed", action="store_true", help="Treat edges as one-way")
+    args = parser.parse_args()
+    graph = load_graph(args.source, args.nodes, undirected=not args.directed)
+    graph.save_snapshot(args.snapshot)
+    print(f"Wrote {len(graph.nodes())} nodes to {args.snapshot}")
\ No newline at end of file
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from typing import Dict, List, Tuple
+from urllib.parse import quote, urlsplit
+
+# Closed-loop load generator for the /api/* routes. Each client thread keeps
+# one HTTP/1.1 connection open and issues requests back to back; latencies are
+# collected per route and reported as JSON (requests/sec, p50, p99).
+
+
+def percentile(samples: List[float], q: float) -> float:
+
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def build_requests(locations: List[str], seed: int = 0) -> List[Tuple[str, str, str, object]]:
+
+    rnd = random.Random(seed)
+    pick = lambda: rnd.choice(locations)
+    plan = []
+    for _ in range(200):
+        plan.append(("shortest-path", "POST", "/api/shortest-path", {"start": pick(), "end": pick()}))
+        plan.append(("routes-from", "GET", f"/api/routes-from/{quote(pick())}", None))
+        plan.append(("search", "GET", f"/api/search/{quote(pick())}", None))
+        plan.append(("autocomplete", "GET", f"/api/autocomplete?q={quote(pick()[:3])}", None))
+        plan.append(("bfs", "POST", "/api/algorithm", {"algorithm": "bfs", "start": pick(), "destination": pick()}))
+        plan.append(("dfs", "POST", "/api/algorithm", {"algorithm": "dfs", "start": pick()}))
+        plan.append(("distance-matrix", "POST", "/api/distance-matrix",
+                     {"sources": rnd.sample(locations, min(5, len(locations))),
+                      "targets": rnd.sample(locations, min(5, len(locations)))}))
+    plan.append(("locations", "GET", "/api/locations", None))
+    plan.append(("mst", "POST", "/api/algorithm", {"algorithm": "mst"}))
+    plan.append(("health", "GET", "/healthz", None))
+    rnd.shuffle(plan)
+    return plan
+
+
+def client(host: str, port: int, plan: list, deadline: float, samples: Dict[str, List[float]],
+           errors: Dict[str, int], lock: threading.Lock, offset: int):
+
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    local: Dict[str, List[float]] = {}
+    failed: Dict[str, int] = {}
+    i = offset
+    while time.perf_counter() < deadline:
+        name, method, path, body = plan[i % len(plan)]
+        i += 1
+        payload = json.dumps(body) if body is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        t0 = time.perf_counter()
+        try:
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status == 200
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            ok = False
+        elapsed = time.perf_counter() - t0
+        if ok:
+            local.setdefault(name, []).append(elapsed)
+        else:
+            failed[name] = failed.get(name, 0) + 1
+    conn.close()
+    with lock:
+        for name, values in local.items():
+            samples.setdefault(name, []).extend(values)
+        for name, count in failed.items():
+            errors[name] = errors.get(name, 0) + count
+
+
+def run(url: str, concurrency: int = 16, duration: float = 10.0) -> dict:
+
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    conn.request("GET", "/api/locations")
+    locations = json.loads(conn.getresponse().read())
+    conn.close()
+    plan = build_requests(locations)
+
+    samples: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=client, args=(host, port, plan, deadline, samples, errors, lock, i * 37))
+        for i in range(concurrency)
+    ]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+
+    everything = [s for values in samples.values() for s in values]
+    routes = {
+        name: {
+            "requests": len(values),
+            "errors": errors.get(name, 0),
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+        }
+        for name, values in sorted(samples.items())
+    }
+    return {
+        "url": url,
+        "concurrency": concurrency,
+        "duration_s": wall,
+        "requests": len(everything),
+        "errors": sum(errors.values()),
+        "requests_per_s": len(everything) / wall,
+        "p50_ms": percentile(everything, 0.50) * 1000,
+        "p99_ms": percentile(everything, 0.99) * 1000,
+        "routes": routes,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test a running Campus Navigator server")
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent keep-alive connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    args = parser.parse_args()
+    print(json.dumps(run(args.url, args.concurrency, args.duration), indent=2))
\ No newline at end of file
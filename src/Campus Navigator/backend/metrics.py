@@ -0,0 +1,91 @@
+import bisect
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from campus_navigator_backend import SEARCH_STATS, RouteCache, SearchStats
+
+# Request latency histograms and a Prometheus text-format exporter for the
+# web server. Histograms are cumulative-bucket counters like Prometheus'
+# own client (one bisect and three adds per request); the search counters
+# come from SEARCH_STATS and only move while it is enabled.
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class LatencyHistograms:
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        # (route, method, status) -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, str, int], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route: str, method: str, status: int, seconds: float):
+
+        i = bisect.bisect_left(self.buckets, seconds)
+        key = (route, method, status)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += seconds
+
+    def snapshot(self) -> Dict[Tuple[str, str, int], List[float]]:
+
+        with self._lock:
+            return {key: list(series) for key, series in self._series.items()}
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def render_prometheus(histograms: LatencyHistograms, stats: SearchStats = SEARCH_STATS,
+                      cache: Optional[RouteCache] = None) -> str:
+
+    lines = [
+        "# HELP campus_nav_request_duration_seconds Request latency by route.",
+        "# TYPE campus_nav_request_duration_seconds histogram",
+    ]
+    for (route, method, status), series in sorted(histograms.snapshot().items()):
+        cumulative = 0
+        for bound, count in zip(histograms.buckets + (float("inf"),), series[:-1]):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"campus_nav_request_duration_seconds_bucket"
+                         f"{_labels(route=route, method=method, status=status, le=le)} {cumulative}")
+        labels = _labels(route=route, method=method, status=status)
+        lines.append(f"campus_nav_request_duration_seconds_sum{labels} {series[-1]}")
+        lines.append(f"campus_nav_request_duration_seconds_count{labels} {cumulative}")
+
+    totals = stats.snapshot()
+    lines += [
+        "# HELP campus_nav_search_enabled Whether search instrumentation is on.",
+        "# TYPE campus_nav_search_enabled gauge",
+        f"campus_nav_search_enabled {int(stats.enabled)}",
+    ]
+    for field, help_text in (("calls", "Graph searches run."),
+                             ("settled", "Nodes settled by graph searches."),
+                             ("relaxed", "Edges relaxed by graph searches."),
+                             ("pushes", "Heap/queue pushes made by graph searches."),
+                             ("seconds", "Time spent in graph searches.")):
+        name = f"campus_nav_search_{field}_total"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for algorithm, values in totals.items():
+            lines.append(f"{name}{_labels(algorithm=algorithm)} {values[field]}")
+
+    if cache is not None:
+        cache_stats = cache.stats()
+        for field in ("hits", "misses", "evictions", "expirations", "invalidations"):
+            name = f"campus_nav_route_cache_{field}_total"
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {cache_stats[field]}")
+        lines.append("# TYPE campus_nav_route_cache_size gauge")
+        lines.append(f"campus_nav_route_cache_size {cache_stats['size']}")
+    return "\n".join(lines) + "\n"
\ No newline at end of file
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+import argparse
+import heapq
+import json
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from campus_navigator_backend import CompiledGraph, RouteTable, create_campus_graph
+
+# Bulk analytics fanned out over a process pool. The compiled graph is
+# written once, in its snapshot layout, into a shared memory block; every
+# worker attaches to it at start-up and reads the CSR arrays in place, so
+# tasks only carry a range of source nodes and return small results. All
+# jobs are independent single-source runs, which is what makes them scale
+# with the number of cores.
+#
+#   route_table    all-pairs distances/predecessors, rows written straight
+#                  into a second shared block
+#   closure_impact "what if this corridor closes": for every edge, the extra
+#                  distance and the pairs cut off if it were removed
+#   betweenness    Brandes betweenness centrality per node
+
+CHUNKS_PER_WORKER = 8
+
+_cg: Optional[CompiledGraph] = None
+_shm: Optional[shared_memory.SharedMemory] = None
+
+
+def _init_worker(name: str):
+    global _cg, _shm
+    _shm = shared_memory.SharedMemory(name=name)
+    _cg = CompiledGraph.from_buffer(_shm.buf)
+    _cg.reverse()
+
+
+def _table_rows(out_name: str, start: int, stop: int):
+
+    n = len(_cg)
+    out = shared_memory.SharedMemory(name=out_name)
+    dist = out.buf[:8 * n * n].cast("d")
+    pred = out.buf[8 * n * n:12 * n * n].cast("i")
+    for s in range(start, stop):
+        d, p = _cg.sssp(s)
+        dist[s * n:(s + 1) * n] = array("d", d)
+        pred[s * n:(s + 1) * n] = array("i", p)
+    dist.release()
+    pred.release()
+    out.close()
+
+
+def closure_impact_from(cg: CompiledGraph, s: int, impact: Dict[Tuple[int, int], List[float]]):
+
+    # Removing an edge can only lengthen routes to the nodes below it in s's
+    # shortest-path tree, so each tree edge p -> x is handled by re-running
+    # Dijkstra over x's subtree alone, seeded from in-edges that enter it
+    # from outside (the deletion case of repair_sssp). Subtrees are ranges
+    # of a preorder walk, which makes "is y in the subtree" two compares.
+    # impact[(a, b)] accumulates [sources affected, pairs cut off, extra
+    # distance, largest detour] for the corridor between a and b.
+    inf = float("inf")
+    n = len(cg)
+    offsets, targets, weights = cg.offsets, cg.targets, cg.weights
+    r_offsets, r_targets, r_weights = cg.reverse()
+    dist, prev = cg.sssp(s)
+    children: List[List[int]] = [[] for _ in range(n)]
+    for x, p in enumerate(prev):
+        if p >= 0:
+            children[p].append(x)
+    order: List[int] = []
+    tin = [-1] * n
+    tout = [-1] * n
+    stack = [s]
+    while stack:
+        x = stack.pop()
+        if x < 0:
+            tout[~x] = len(order)
+            continue
+        tin[x] = len(order)
+        order.append(x)
+        stack.append(~x)
+        stack.extend(children[x])
+    push, pop = heapq.heappush, heapq.heappop
+    for x in order[1:]:
+        p = prev[x]
+        lo, hi = tin[x], tout[x]
+        dx = dist[x]
+        # An equally short way into x from outside its subtree means the
+        # closure costs this source nothing.
+        if any(r_targets[i] != p and not lo <= tin[r_targets[i]] < hi
+               and dist[r_targets[i]] + r_weights[i] == dx
+               for i in range(r_offsets[x], r_offsets[x + 1])):
+            continue
+        new: Dict[int, float] = {}
+        pq = []
+        for y in order[lo:hi]:
+            best = inf
+            for i in range(r_offsets[y], r_offsets[y + 1]):
+                z = r_targets[i]
+                if lo <= tin[z] < hi or (z == p and y == x):
+                    continue
+                nd = dist[z] + r_weights[i]
+                if nd < best:
+                    best = nd
+            if best < inf:
+                new[y] = best
+                push(pq, (best, y))
+        while pq:
+            d, u = pop(pq)
+            if d > new[u]:
+                continue
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                if lo <= tin[v] < hi:
+                    nd = d + weights[i]
+                    if nd < new.get(v, inf):
+                        new[v] = nd
+                        push(pq, (nd, v))
+        cut = hi - lo - len(new)
+        extra = detour = 0.0
+        for y, d in new.items():
+            delta = d - dist[y]
+            extra += delta
+            if delta > detour:
+                detour = delta
+        if cut or extra > 0:
+            entry = impact.setdefault((min(p, x), max(p, x)), [0, 0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += cut
+            entry[2] += extra
+            if detour > entry[3]:
+                entry[3] = detour
+
+
+def _closure_chunk(sources: List[int]) -> Dict[Tuple[int, int], List[float]]:
+
+    impact: Dict[Tuple[int, int], List[float]] = {}
+    for s in sources:
+        closure_impact_from(_cg, s, impact)
+    return impact
+
+
+def betweenness_from(cg: CompiledGraph, s: int, cb: List[float]):
+
+    # One source of Brandes' algorithm over weighted edges: count shortest
+    # paths on the way out, accumulate dependencies on the way back.
+    inf = float("inf")
+    n = len(cg)
+    offsets, targets, weights = cg.offsets, cg.targets, cg.weights
+    dist = [inf] * n
+    sigma = [0.0] * n
+    preds: List[List[int]] = [[] for _ in range(n)]
+    done = [False] * n
+    dist[s] = 0.0
+    sigma[s] = 1.0
+    settled = []
+    pq = [(0.0, s)]
+    pop, push = heapq.heappop, heapq.heappush
+    while pq:
+        d, u = pop(pq)
+        if done[u]:
+            continue
+        done[u] = True
+        settled.append(u)
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            nd = d + weights[i]
+            if nd < dist[v]:
+                dist[v] = nd
+                sigma[v] = sigma[u]
+                preds[v] = [u]
+                push(pq, (nd, v))
+            elif nd == dist[v] and not done[v]:
+                sigma[v] += sigma[u]
+                preds[v].append(u)
+    delta = [0.0] * n
+    while settled:
+        w = settled.pop()
+        coeff = (1.0 + delta[w]) / sigma[w]
+        for u in preds[w]:
+            delta[u] += sigma[u] * coeff
+        if w != s:
+            cb[w] += delta[w]
+
+
+def _betweenness_chunk(sources: List[int]) -> List[float]:
+
+    cb = [0.0] * len(_cg)
+    for s in sources:
+        betweenness_from(_cg, s, cb)
+    return cb
+
+
+class SharedGraph:
+
+    # A CompiledGraph snapshot copied into a shared memory block. Only the
+    # creating process unlinks it.
+
+    def __init__(self, cg: CompiledGraph):
+        chunks = cg.snapshot_chunks()
+        self.shm = shared_memory.SharedMemory(create=True, size=sum(len(c) for c in chunks))
+        off = 0
+        for chunk in chunks:
+            self.shm.buf[off:off + len(chunk)] = chunk
+            off += len(chunk)
+        self.name = self.shm.name
+        self.nbytes = off
+
+    def close(self):
+
+        self.shm.close()
+        self.shm.unlink()
+
+
+class ParallelAnalytics:
+
+    # with ParallelAnalytics(cg, workers=8) as pa:
+    #     table = pa.route_table()
+    #     worst = pa.closure_impact()[:10]
+
+    def __init__(self, cg: CompiledGraph, workers: int = 0):
+        self.cg = cg
+        self.workers = workers or os.cpu_count() or 1
+        self.shared = SharedGraph(cg)
+        self.pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                        initargs=(self.shared.name,))
+
+    def __enter__(self) -> "ParallelAnalytics":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+
+        self.pool.shutdown()
+        self.shared.close()
+
+    def _ranges(self, n: int) -> Iterator[Tuple[int, int]]:
+        step = max(1, -(-n // (self.workers * CHUNKS_PER_WORKER)))
+        for start in range(0, n, step):
+            yield start, min(n, start + step)
+
+    def route_table(self) -> RouteTable:
+
+        n = len(self.cg)
+        out = shared_memory.SharedMemory(create=True, size=max(1, 12 * n * n))
+        try:
+            futures = [self.pool.submit(_table_rows, out.name, a, b) for a, b in self._ranges(n)]
+            for future in futures:
+                future.result()
+            dist = array("d")
+            dist.frombytes(out.buf[:8 * n * n])
+            pred = array("i")
+            pred.frombytes(out.buf[8 * n * n:12 * n * n])
+        finally:
+            out.close()
+            out.unlink()
+        return RouteTable(list(self.cg.names), dist, pred, self.cg.fingerprint())
+
+    def closure_impact(self, sources: Optional[List[int]] = None) -> List[dict]:
+
+        # One row per corridor (pair of adjacent nodes, all parallel edges
+        # and both directions closed together), worst first. Pair counts are
+        # ordered (source, destination) pairs.
+        sources = list(range(len(self.cg))) if sources is None else sources
+        impact: Dict[Tuple[int, int], List[float]] = {}
+        chunks = [sources[a:b] for a, b in self._ranges(len(sources))]
+        for part in self.pool.map(_closure_chunk, chunks):
+            for key, (affected, cut, extra, detour) in part.items():
+                entry = impact.setdefault(key, [0, 0, 0.0, 0.0])
+                entry[0] += affected
+                entry[1] += cut
+                entry[2] += extra
+                entry[3] = max(entry[3], detour)
+        cg = self.cg
+        corridors = {(min(u, v), max(u, v)) for u in range(len(cg))
+                     for v in cg.targets[cg.offsets[u]:cg.offsets[u + 1]] if u != v}
+        rows = []
+        for a, b in corridors:
+            affected, cut, extra, detour = impact.get((a, b), (0, 0, 0.0, 0.0))
+            rows.append({"from": cg.names[a], "to": cg.names[b], "pairs_disconnected": cut,
+                         "extra_distance": extra, "max_detour": detour, "sources_affected": affected})
+        rows.sort(key=lambda r: (-r["pairs_disconnected"], -r["extra_distance"], r["from"], r["to"]))
+        return rows
+
+    def betweenness(self, normalized: bool = False) -> Dict[str, float]:
+
+        n = len(self.cg)
+        cb = [0.0] * n
+        chunks = [list(range(a, b)) for a, b in self._ranges(n)]
+        for part in self.pool.map(_betweenness_chunk, chunks):
+            for i, value in enumerate(part):
+                cb[i] += value
+        # Undirected graphs count every pair from both ends; normalising
+        # divides by the number of ordered pairs excluding the node itself.
+        if normalized and n > 2:
+            scale = 1.0 / ((n - 1) * (n - 2))
+        else:
+            scale = 0.5 if self.cg.undirected else 1.0
+        return {name: value * scale for name, value in zip(self.cg.names, cb)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run bulk campus analytics on all cores")
+    parser.add_argument("job", choices=["closures", "betweenness", "table"])
+    parser.add_argument("--graph", metavar="PATH", help="CSV/JSONL/GeoJSON file or snapshot (default: built-in campus)")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--top", type=int, default=20, help="Rows to print for closures/betweenness")
+    parser.add_argument("--output", metavar="PATH", help="Route table path for the table job")
+    args = parser.parse_args()
+
+    if args.graph:
+        from graph_io import load_graph
+        graph = load_graph(args.graph)
+    else:
+        graph, _ = create_campus_graph()
+    with ParallelAnalytics(graph.compile(), args.workers) as analytics:
+        if args.job == "closures":
+            print(json.dumps(analytics.closure_impact()[:args.top], indent=2))
+        elif args.job == "betweenness":
+            ranked = sorted(analytics.betweenness().items(), key=lambda item: -item[1])
+            print(json.dumps(dict(ranked[:args.top]), indent=2))
+        else:
+            table = analytics.route_table()
+            if args.output:
+                table.save(args.output)
+            print(f"Built {len(table.names)}x{len(table.names)} route table ({table.nbytes()} bytes)")
\ No newline at end of file
@@ -0,0 +1,189 @@
+import cProfile
+import io
+import linecache
+import os
+import pstats
+import threading
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# Built-in profiling for the CLI (--profile) and the web server
+# (CAMPUS_NAV_PROFILE_RATE). A Profile runs cProfile for the calling thread
+# and tracemalloc for the process and writes three files per run:
+#
+#   <prefix>.pstats     raw cProfile data (pstats, snakeviz, gprof2dot)
+#   <prefix>.collapsed  folded stacks for flamegraph.pl / speedscope / inferno
+#   <prefix>.alloc.txt  top allocation sites by peak live size, with source lines
+#
+# Folded stacks are rebuilt from cProfile's caller/callee table: each
+# function's time is split over its call paths in proportion to the time
+# every caller spent in it, so short requests still give a complete graph.
+
+MIN_STACK_US = 1
+
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False
+
+
+def _start_tracing():
+    # tracemalloc is process-wide; concurrent profiles share one session,
+    # and a session started by someone else (PYTHONTRACEMALLOC) is left alone.
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        _tracing_users += 1
+
+
+def _stop_tracing() -> Optional[tracemalloc.Snapshot]:
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+        return snapshot
+
+
+def frame_label(func: Tuple[str, int, str]) -> str:
+
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def collapsed_stacks(stats: pstats.Stats) -> List[str]:
+
+    # "root;child;grandchild microseconds" lines, heaviest first.
+    table = stats.stats
+    children: Dict[Tuple, List[Tuple[Tuple, float]]] = defaultdict(list)
+    for func, (_, _, _, _, callers) in table.items():
+        for caller, (_, _, _, cumulative) in callers.items():
+            children[caller].append((func, cumulative))
+    folded: Dict[str, float] = defaultdict(float)
+
+    def walk(func: Tuple, path: List[str], on_path: set, budget: float):
+        _, _, own, cumulative, _ = table[func]
+        scale = budget / cumulative if cumulative else 0.0
+        if own * scale * 1e6 >= MIN_STACK_US:
+            folded[";".join(path)] += own * scale
+        for child, spent in children.get(func, ()):
+            share = spent * scale
+            if child in on_path or share * 1e6 < MIN_STACK_US:
+                continue
+            on_path.add(child)
+            path.append(frame_label(child))
+            walk(child, path, on_path, share)
+            path.pop()
+            on_path.discard(child)
+
+    for func, (_, _, _, cumulative, callers) in table.items():
+        if not callers:
+            walk(func, [frame_label(func)], {func}, cumulative)
+    ordered = sorted(folded.items(), key=lambda item: -item[1])
+    return [f"{stack} {round(seconds * 1e6)}" for stack, seconds in ordered if round(seconds * 1e6) > 0]
+
+
+_IGNORED_FILES = (tracemalloc.__file__, __file__,
+                  "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>")
+
+
+class Profile:
+
+    # With sample_interval set, a background thread also snapshots the heap
+    # periodically and keeps each line's largest live size, so short-lived
+    # structures (e.g. the dedup set in Graph.edges) show up even though they
+    # are gone by the final snapshot.
+    def __init__(self, allocations: bool = True, sample_interval: Optional[float] = None):
+        self.allocations = allocations
+        self.sample_interval = sample_interval
+        self.profiler = cProfile.Profile()
+        self._peaks: Dict[Tuple[str, int], Tuple[int, int]] = {}
+        self._done = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self) -> "Profile":
+
+        # enable() raises ValueError if another profiler owns the thread;
+        # nothing has been started yet at that point.
+        self.profiler.enable()
+        if self.allocations:
+            _start_tracing()
+            if self.sample_interval:
+                self._sampler = threading.Thread(target=self._sample, daemon=True)
+                self._sampler.start()
+        return self
+
+    def stop(self):
+
+        self.profiler.disable()
+        if self.allocations:
+            if self._sampler is not None:
+                self._done.set()
+                self._sampler.join()
+            snapshot = _stop_tracing()
+            if snapshot is not None:
+                self._merge(snapshot)
+
+    def __enter__(self) -> "Profile":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _sample(self):
+
+        while not self._done.wait(self.sample_interval):
+            self._merge(tracemalloc.take_snapshot())
+
+    def _merge(self, snapshot: tracemalloc.Snapshot):
+
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, f) for f in _IGNORED_FILES])
+        for stat in snapshot.statistics("lineno"):
+            frame = stat.traceback[0]
+            key = (frame.filename, frame.lineno)
+            if stat.size > self._peaks.get(key, (0, 0))[0]:
+                self._peaks[key] = (stat.size, stat.count)
+
+    def stats(self) -> pstats.Stats:
+
+        return pstats.Stats(self.profiler)
+
+    def top_allocations(self, limit: int = 25) -> List[str]:
+
+        # Largest live size seen per source line, with the line itself.
+        ranked = sorted(self._peaks.items(), key=lambda item: -item[1][0])[:limit]
+        sites = []
+        for (filename, line), (size, count) in ranked:
+            source = linecache.getline(filename, line).strip()
+            sites.append(f"{filename}:{line}: size={size / 1024:.1f} KiB, count={count}"
+                         + (f"  | {source}" if source else ""))
+        return sites
+
+    def dump(self, prefix: str) -> List[str]:
+
+        directory = os.path.dirname(prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        paths = [prefix + ".pstats", prefix + ".collapsed", prefix + ".alloc.txt"]
+        self.profiler.dump_stats(paths[0])
+        with open(paths[1], "w") as f:
+            f.write("\n".join(collapsed_stacks(self.stats())) + "\n")
+        with open(paths[2], "w") as f:
+            f.write("\n".join(self.top_allocations()) + "\n")
+        return paths
+
+    def summary(self, limit: int = 15) -> str:
+
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+        allocations = self.top_allocations(10)
+        if allocations:
+            out.write("Top allocation sites:\n")
+            out.writelines(f"  {line}\n" for line in allocations)
+        return out.getvalue()
\ No newline at end of file
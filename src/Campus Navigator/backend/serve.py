@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import web_server
+from edit_journal import EditJournal
+from web_server import app, navigator
+
+# Pre-fork production launcher. The navigator (graph, compiled CSR arrays,
+# search indexes and any memory-mapped route table / hierarchy) is built once
+# in the parent; workers are forked afterwards and share those pages
+# copy-on-write. Every worker accepts from the same listening socket and
+# serves HTTP/1.1 keep-alive connections on a small thread pool. With more
+# than one worker, /api/edges writes go through an EditJournal that every
+# worker replays, since each holds a private copy of the graph after fork.
+
+
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_request(self, code="-", size="-"):
+        pass
+
+
+def warm_up():
+
+    # Build everything the request path would otherwise build lazily, so it
+    # happens once before fork instead of once per worker.
+    graph = navigator.graph
+    cg = graph.compile()
+    cg.reverse()
+    navigator.get_locations()
+    navigator.autocomplete("", 1)
+    if graph.undirected:
+        graph.kruskal_mst()
+
+
+def run_worker(sock: socket.socket, host: str, port: int):
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    server = make_server(host, port, app, threaded=True,
+                         request_handler=KeepAliveRequestHandler, fd=sock.fileno())
+    server.serve_forever()
+
+
+def spawn(sock: socket.socket, host: str, port: int) -> int:
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            run_worker(sock, host, port)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def serve(host: str = "0.0.0.0", port: int = 5000, workers: int = 0, backlog: int = 1024):
+
+    workers = workers or os.cpu_count() or 1
+    warm_up()
+    journal = None
+    if workers > 1:
+        fd, journal = tempfile.mkstemp(prefix="campus-nav-edits-")
+        os.close(fd)
+        web_server.edit_journal = EditJournal(journal, web_server.apply_edits)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    # Move everything allocated so far out of the collector's view so the
+    # workers' GC passes do not touch (and un-share) the parent's pages.
+    gc.freeze()
+
+    children = {spawn(sock, host, port) for _ in range(workers)}
+    stopping = False
+
+    def stop(*_):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"Serving on http://{host}:{port} with {workers} workers (pid {os.getpid()})")
+    while children:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if not stopping:
+            # A worker died unexpectedly; replace it.
+            time.sleep(0.1)
+            children.add(spawn(sock, host, port))
+    sock.close()
+    if journal:
+        os.unlink(journal)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Campus Navigator API with pre-forked workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--backlog", type=int, default=1024, help="Listen backlog")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.backlog)
\ No newline at end of file
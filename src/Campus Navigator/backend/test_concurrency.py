@@ -0,0 +1,80 @@
+import threading
+
+from benchmarks import bench_concurrency, generate_grid_graph
+from campus_navigator_backend import CampusNavigator, IncrementalMST, create_campus_graph
+
+
+def test_queries_stay_consistent_under_edits():
+
+    # The concurrency benchmark checks every answer against its snapshot;
+    # any error it counts is a failure here.
+    result = bench_concurrency(400, readers=3, duration=0.5)
+    assert result["with_edits"]["edits"] > 0
+    assert result["read_only"]["errors"] == 0
+    assert result["with_edits"]["errors"] == 0
+
+
+def test_whole_graph_reads_do_not_wait_for_an_edit_batch():
+
+    graph, _ = create_campus_graph()
+    mst, edges = graph.kruskal_mst(), graph.edges()
+    seen = {}
+
+    def read():
+        seen["mst"], seen["edges"] = graph.kruskal_mst(), graph.edges()
+
+    with graph.edit():
+        graph.update_edge("Cafeteria", "Stairs_B2_GF", 1.0)
+        reader = threading.Thread(target=read)
+        reader.start()
+        reader.join(timeout=5)
+        assert not reader.is_alive()
+    # Mid-batch, readers get the results published before the batch.
+    assert seen == {"mst": mst, "edges": edges}
+    assert graph.kruskal_mst() == IncrementalMST(graph).result()
+    assert ("Cafeteria", "Stairs_B2_GF", 1.0) in graph.edges()
+
+
+def test_mst_reads_during_edits_are_spanning_forests():
+
+    graph = generate_grid_graph(400)
+    graph.kruskal_mst()
+    stop = threading.Event()
+    errors = []
+
+    def reader():
+        while not stop.is_set():
+            total, mst = graph.kruskal_mst()
+            if abs(total - sum(w for _, _, w in mst)) > 1e-6 or len(mst) >= len(graph.nodes()):
+                errors.append((total, len(mst)))
+
+    threads = [threading.Thread(target=reader) for _ in range(3)]
+    for t in threads:
+        t.start()
+    nodes = graph.nodes()
+    for k in range(200):
+        with graph.edit():
+            u = nodes[k * 7 % len(nodes)]
+            if graph.adj[u]:
+                graph.update_edge(u, graph.adj[u][0][0], float(k % 9 + 1))
+    stop.set()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert graph.kruskal_mst() == IncrementalMST(graph).result()
+
+
+def test_navigator_results_come_from_the_snapshot_they_are_cached_under():
+
+    # A query that captured a snapshot before an edit landed must answer
+    # (and cache) from that snapshot, not from the newer one.
+    navigator = CampusNavigator()
+    before = navigator.graph.compile()
+    old = navigator.find_shortest_path("Cafeteria", "Auditorium")
+    navigator.route_cache.clear()
+    navigator.disable_edge("Cafeteria", "Stairs_B2_GF")
+    route = navigator._cached_shortest_path("Cafeteria", "Auditorium", None, None, before)
+    assert (route.path, route.distance) == (old.path, old.distance)
+    traversal = navigator._bfs_traversal("Cafeteria", "Auditorium", before)
+    assert "Stairs_B2_GF" in traversal.order
+    assert navigator.find_shortest_path("Cafeteria", "Auditorium").distance != old.distance
\ No newline at end of file
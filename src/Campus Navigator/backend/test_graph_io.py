@@ -0,0 +1,134 @@
+import csv
+import json
+
+import pytest
+
+from campus_navigator_backend import ROUTING_PROFILES, Graph, create_campus_graph
+from graph_io import iter_geojson_features, load_graph
+
+
+def campus() -> Graph:
+
+    # The built-in campus (tagged stairs and outdoor edges, floors) plus
+    # coordinates for every node and opening hours on a few corridors,
+    # so every attribute a file can carry is present.
+    graph, _ = create_campus_graph()
+    for i, name in enumerate(sorted(graph.nodes())):
+        graph.add_node(name, (float(i % 6) * 10.0, float(i // 6) * 7.5))
+    edges = graph.edges()
+    graph.set_edge_hours(edges[0][0], edges[0][1], (8 * 60, 18 * 60))
+    graph.set_edge_hours(edges[5][0], edges[5][1], (22 * 60, 6 * 60))
+    return graph
+
+
+def describe(graph: Graph) -> dict:
+    return {
+        "nodes": sorted(graph.nodes()),
+        "edges": sorted((tuple(sorted((u, v))) if graph.undirected else (u, v)) + (w,)
+                        for u, v, w in graph.edges()),
+        "tags": {key: sorted(tags) for key, tags in graph.edge_tags.items()},
+        "hours": dict(graph.edge_hours),
+        "pos": dict(graph.pos),
+        "floor": dict(graph.floor),
+    }
+
+
+def clock(minute: int) -> str:
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def edge_record(graph: Graph, u: str, v: str, w: float) -> dict:
+    record = {"from": u, "to": v, "weight": w}
+    if (u, v) in graph.edge_tags:
+        record["tags"] = sorted(graph.edge_tags[(u, v)])
+    if (u, v) in graph.edge_hours:
+        record["open"], record["close"] = map(clock, graph.edge_hours[(u, v)])
+    return record
+
+
+def node_record(graph: Graph, name: str) -> dict:
+    x, y = graph.pos[name]
+    return {"name": name, "x": x, "y": y, "floor": graph.floor.get(name)}
+
+
+def via_csv(graph: Graph, tmp_path) -> Graph:
+    edges, nodes = tmp_path / "campus.csv", tmp_path / "nodes.csv"
+    with open(edges, "w", newline="") as f:
+        out = csv.writer(f)
+        out.writerow(["from", "to", "weight", "tags", "open", "close"])
+        for u, v, w in graph.edges():
+            record = edge_record(graph, u, v, w)
+            out.writerow([u, v, repr(w), ";".join(record.get("tags", [])),
+                          record.get("open", ""), record.get("close", "")])
+    with open(nodes, "w", newline="") as f:
+        out = csv.writer(f)
+        out.writerow(["name", "x", "y", "floor"])
+        for name in graph.nodes():
+            record = node_record(graph, name)
+            out.writerow([name, repr(record["x"]), repr(record["y"]),
+                          record["floor"] if record["floor"] is not None else ""])
+    return load_graph(str(edges), str(nodes))
+
+
+def via_jsonl(graph: Graph, tmp_path) -> Graph:
+    path = tmp_path / "campus.jsonl"
+    with open(path, "w") as f:
+        for name in graph.nodes():
+            f.write(json.dumps(node_record(graph, name)) + "\n")
+        for u, v, w in graph.edges():
+            f.write(json.dumps(edge_record(graph, u, v, w)) + "\n")
+    return load_graph(str(path))
+
+
+def via_geojson(graph: Graph, tmp_path) -> Graph:
+    path = tmp_path / "campus.geojson"
+    features = [{"type": "Feature", "geometry": {"type": "Point", "coordinates": list(graph.pos[name])},
+                 "properties": {"name": name, "floor": graph.floor.get(name)}}
+                for name in graph.nodes()]
+    features += [{"type": "Feature",
+                  "geometry": {"type": "LineString", "coordinates": [list(graph.pos[u]), list(graph.pos[v])]},
+                  "properties": edge_record(graph, u, v, w)}
+                 for u, v, w in graph.edges()]
+    with open(path, "w") as f:
+        json.dump({"type": "FeatureCollection", "features": features}, f)
+    return load_graph(str(path))
+
+
+@pytest.mark.parametrize("loader", [via_csv, via_jsonl, via_geojson])
+def test_files_and_snapshots_round_trip(loader, tmp_path):
+    original = campus()
+    expected = describe(original)
+    loaded = loader(original, tmp_path)
+    assert describe(loaded) == expected
+
+    loaded.save_snapshot(str(tmp_path / "campus.cngs"))
+    mapped = load_graph(str(tmp_path / "campus.cngs"))
+    # Queries run on the mapped CSR before anything is materialised.
+    step_free = ROUTING_PROFILES["step_free"]
+    for src, dst in (("Cafeteria", "Auditorium"), ("Library", "Cafeteria")):
+        for profile, at in ((None, None), (step_free, None), (None, 23 * 60), (None, 12 * 60)):
+            assert mapped.dijkstra(src, dst, profile, at) == original.dijkstra(src, dst, profile, at)
+    assert describe(mapped) == expected
+
+
+def test_geojson_features_split_across_chunks(tmp_path):
+    original = campus()
+    via_geojson(original, tmp_path)
+    with open(tmp_path / "campus.geojson") as f:
+        whole = json.load(f)["features"]
+    with open(tmp_path / "campus.geojson") as f:
+        assert list(iter_geojson_features(f, chunk_size=7)) == whole
+
+
+def test_directed_edges_round_trip(tmp_path):
+    path = tmp_path / "oneway.jsonl"
+    path.write_text('{"from": "a", "to": "b", "weight": 2.5, "tags": "stairs;outdoor"}\n'
+                    '{"from": "b", "to": "c", "weight": 1, "open": "07:30", "close": "19:00"}\n')
+    graph = load_graph(str(path), undirected=False)
+    graph.save_snapshot(str(tmp_path / "oneway.cngs"))
+    mapped = Graph.from_snapshot(str(tmp_path / "oneway.cngs"))
+    assert mapped.undirected is False
+    assert describe(mapped) == describe(graph)
+    assert mapped.edge_tags == {("a", "b"): frozenset({"stairs", "outdoor"})}
+    assert mapped.edge_hours == {("b", "c"): (450, 1140)}
+    assert mapped.dijkstra("c", "a") == (float("inf"), [])
\ No newline at end of file
@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from campus_navigator_backend import Graph
+
+
+def random_graph(rnd: random.Random, undirected: bool) -> Graph:
+
+    # Few nodes and few distinct weights, so parallel edges, self-loops and
+    # equal-cost paths are common and every simple path can be enumerated.
+    g = Graph(undirected=undirected)
+    n = rnd.randint(2, 8)
+    for i in range(n):
+        g.add_node(f"n{i}")
+    for _ in range(rnd.randint(1, 16)):
+        g.add_edge(f"n{rnd.randrange(n)}", f"n{rnd.randrange(n)}", float(rnd.randint(1, 5)))
+    return g
+
+
+def step_cost(g: Graph, u: str, v: str) -> float:
+    # Parallel edges count once, at their cheapest.
+    return min(w for x, w in g.adj[u] if x == v)
+
+
+def simple_path_costs(g: Graph, src: str, dst: str) -> list:
+    costs = []
+
+    def walk(u, seen, cost):
+        if u == dst:
+            costs.append(cost)
+            return
+        for v in {x for x, _ in g.adj[u]} - seen:
+            walk(v, seen | {v}, cost + step_cost(g, u, v))
+
+    walk(src, {src}, 0.0)
+    return sorted(costs)
+
+
+def check_routes(g: Graph, src: str, dst: str, k: int):
+    routes = g.k_shortest_paths(src, dst, k)
+    expected = simple_path_costs(g, src, dst)
+    assert [d for d, _ in routes] == pytest.approx(expected[:k])
+    paths = [tuple(path) for _, path in routes]
+    assert len(set(paths)) == len(paths)
+    for d, path in routes:
+        assert path[0] == src and path[-1] == dst
+        assert len(set(path)) == len(path)
+        assert sum(step_cost(g, a, b) for a, b in zip(path, path[1:])) == pytest.approx(d)
+
+
+@pytest.mark.parametrize("undirected", [True, False])
+@pytest.mark.parametrize("seed", range(60))
+def test_k_shortest_matches_brute_force(seed, undirected):
+
+    # k runs past the number of simple paths, so short answers are checked
+    # too; pairs with no path at all must give an empty list.
+    rnd = random.Random(seed)
+    g = random_graph(rnd, undirected)
+    names = g.nodes()
+    for _ in range(5):
+        src, dst = rnd.sample(names, 2)
+        check_routes(g, src, dst, rnd.randint(1, 12))
+
+
+def test_parallel_edges_are_one_path():
+    g = Graph()
+    g.add_edge("a", "b", 3.0)
+    g.add_edge("a", "b", 1.0)
+    g.add_edge("b", "c", 1.0)
+    g.add_edge("b", "c", 2.0)
+    assert g.k_shortest_paths("a", "c", 4) == [(2.0, ["a", "b", "c"])]
+
+
+def test_more_paths_asked_for_than_exist():
+    g = Graph()
+    for u, v, w in (("a", "b", 1.0), ("b", "d", 1.0), ("a", "c", 2.0), ("c", "d", 2.0), ("b", "c", 1.0)):
+        g.add_edge(u, v, w)
+    routes = g.k_shortest_paths("a", "d", 10)
+    assert [d for d, _ in routes] == simple_path_costs(g, "a", "d") == [2.0, 4.0, 4.0, 4.0]
+
+
+def test_unreachable_target():
+    g = Graph(undirected=False)
+    g.add_edge("a", "b", 1.0)
+    g.add_edge("c", "a", 1.0)
+    g.add_node("d")
+    assert g.k_shortest_paths("a", "c", 3) == []
+    assert g.k_shortest_paths("a", "d", 3) == []
+    assert g.k_shortest_paths("a", "missing", 3) == []
\ No newline at end of file
@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from benchmarks import sorted_kruskal
+from campus_navigator_backend import Graph
+
+WEIGHTS = [0.5, 1.0, 2.0, 2.0, 3.0]
+
+
+def random_edit(g: Graph, names, rnd: random.Random, step: int):
+    u = rnd.choice(list(g.adj))
+    op = rnd.random()
+    if op < 0.3:
+        g.add_edge(rnd.choice(names + [f"x{step}"]), rnd.choice(names), rnd.choice(WEIGHTS))
+    elif op < 0.5 and g.adj[u]:
+        g.remove_edge(u, rnd.choice(g.adj[u])[0])
+    elif op < 0.75 and g.adj[u]:
+        g.update_edge(u, rnd.choice(g.adj[u])[0], rnd.choice(WEIGHTS))
+    elif op < 0.9 and g.adj[u]:
+        g.disable_edge(u, rnd.choice(g.adj[u])[0])
+    elif g.disabled:
+        g.enable_edge(*rnd.choice(sorted(g.disabled)))
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_incremental_mst_matches_fresh_kruskal(seed):
+
+    # Few distinct weights, self-loops and parallel edges make ties common,
+    # so the maintained tree must break them exactly like a fresh run.
+    rnd = random.Random(seed)
+    g = Graph()
+    names = [f"n{i}" for i in range(rnd.randint(2, 15))]
+    for name in names:
+        g.add_node(name)
+    for _ in range(rnd.randint(0, 30)):
+        g.add_edge(rnd.choice(names), rnd.choice(names), rnd.choice(WEIGHTS))
+    assert g.kruskal_mst() == sorted_kruskal(g)
+    for step in range(60):
+        random_edit(g, names, rnd, step)
+        assert g.kruskal_mst() == sorted_kruskal(g), step
+
+
+def test_edit_batches_publish_the_final_tree():
+
+    rnd = random.Random(7)
+    g = Graph()
+    names = [f"n{i}" for i in range(20)]
+    for _ in range(60):
+        g.add_edge(rnd.choice(names), rnd.choice(names), rnd.choice(WEIGHTS))
+    g.kruskal_mst()
+    for batch in range(20):
+        with g.edit():
+            for step in range(5):
+                random_edit(g, names, rnd, batch * 5 + step)
+        assert g.kruskal_mst() == sorted_kruskal(g), batch
+
+
+def test_directed_graph_is_rejected():
+
+    g = Graph(undirected=False)
+    g.add_edge("a", "b", 1.0)
+    with pytest.raises(ValueError):
+        g.kruskal_mst()
\ No newline at end of file
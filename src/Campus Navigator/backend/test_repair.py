@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from campus_navigator_backend import Graph, RouteTable
+
+
+def random_graph(rnd: random.Random, undirected: bool) -> Graph:
+    g = Graph(undirected=undirected)
+    n = rnd.randint(5, 30)
+    for i in range(n):
+        g.add_node(f"n{i}")
+    for _ in range(rnd.randint(n, 4 * n)):
+        g.add_edge(f"n{rnd.randrange(n)}", f"n{rnd.randrange(n)}", float(rnd.randint(0, 9)))
+    return g
+
+
+def random_edits(g: Graph, rnd: random.Random):
+
+    # Weight increases and decreases, closures and reopenings; never a new
+    # node, so every change can be replayed from the change log.
+    nodes = g.nodes()
+    for _ in range(rnd.randint(1, 4)):
+        u = rnd.choice(nodes)
+        op = rnd.random()
+        if op < 0.3 and g.adj[u]:
+            v, w = rnd.choice(g.adj[u])
+            g.update_edge(u, v, w + rnd.randint(1, 5))
+        elif op < 0.6 and g.adj[u]:
+            v, w = rnd.choice(g.adj[u])
+            g.update_edge(u, v, float(rnd.randint(0, int(w))))
+        elif op < 0.8 and g.adj[u]:
+            g.disable_edge(u, rnd.choice(g.adj[u])[0])
+        elif g.disabled:
+            g.enable_edge(*rnd.choice(sorted(g.disabled)))
+
+
+def path_length(g: Graph, path) -> float:
+    return sum(min(w for x, w in g.adj[a] if x == b) for a, b in zip(path, path[1:]))
+
+
+@pytest.mark.parametrize("undirected", [True, False])
+@pytest.mark.parametrize("seed", range(10))
+def test_repaired_trees_and_table_match_fresh_searches(seed, undirected):
+    rnd = random.Random(seed)
+    g = random_graph(rnd, undirected)
+    cg = g.compile()
+    for name in cg.names:
+        g.shortest_path_tree(name)
+    table, version = RouteTable.build(cg), cg.version
+    for step in range(15):
+        random_edits(g, rnd)
+        cg = g.compile()
+        n = len(cg)
+        changes = g.edge_changes(version, cg)
+        assert changes is not None
+        table, version = table.repaired(cg, changes), cg.version
+        for s, name in enumerate(cg.names):
+            fresh, _ = cg.sssp(s)
+            tree = g._cached_tree(cg, name)
+            assert tree is not None and tree.version == cg.version
+            assert tree.dist == fresh, (step, name)
+            assert list(table.dist[s * n:(s + 1) * n]) == fresh, (step, name)
+            for t, target in enumerate(cg.names):
+                if fresh[t] == float("inf"):
+                    continue
+                assert path_length(g, tree.path_to(target)) == pytest.approx(fresh[t])
+                distance, path = table.route(name, target)
+                assert distance == fresh[t]
+                assert path[0] == name and path[-1] == target
+                assert path_length(g, path) == pytest.approx(fresh[t])
\ No newline at end of file
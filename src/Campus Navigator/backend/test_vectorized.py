@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+import vectorized
+from campus_navigator_backend import Graph
+
+needs_numpy = pytest.mark.skipif(vectorized.np is None, reason="NumPy is not installed")
+
+
+def random_graph(seed: int, undirected: bool) -> Graph:
+
+    # Random edges plus a self-loop, a parallel pair with different weights
+    # and an isolated node, so every backend meets each of them.
+    rnd = random.Random(seed)
+    g = Graph(undirected=undirected)
+    n = rnd.randint(8, 60)
+    for i in range(n):
+        g.add_node(f"n{i}")
+    for _ in range(n * 2):
+        g.add_edge(f"n{rnd.randrange(n - 1)}", f"n{rnd.randrange(n - 1)}", float(rnd.randint(1, 9)))
+    g.add_edge("n0", "n0", 2.0)
+    g.add_edge("n1", "n2", 5.0)
+    g.add_edge("n1", "n2", 3.0)
+    return g
+
+
+def as_lists(result):
+    # NumPy arrays, array.arrays and tuples as the nested lists they hold.
+    if hasattr(result, "tolist"):
+        return result.tolist()
+    if isinstance(result, (list, tuple)):
+        return [as_lists(x) for x in result]
+    return result
+
+
+def jobs(cg, rnd: random.Random):
+    nodes = list(range(len(cg)))
+    sources = rnd.sample(nodes, min(6, len(nodes)))
+    edges = [(u, v) for u in nodes for v, _ in cg.neighbors(u)]
+    closed = rnd.sample(edges, len(edges) // 5)
+    return {
+        "bfs": lambda fast: vectorized.bfs(cg, sources[0], fast),
+        "levels": lambda fast: vectorized.levels(cg, sources[:3], fast),
+        "hop_matrix": lambda fast: vectorized.hop_matrix(cg, sources, fast),
+        "components": lambda fast: vectorized.components(cg, closed, fast),
+        "distance_matrix": lambda fast: vectorized.distance_matrix(cg, sources, fast),
+    }
+
+
+@pytest.fixture(params=["scipy", "numpy"])
+def backend(request, monkeypatch):
+    # Runs each check with SciPy (when installed) and on NumPy alone.
+    if request.param == "scipy" and vectorized.csgraph is None:
+        pytest.skip("SciPy is not installed")
+    if request.param == "numpy":
+        monkeypatch.setattr(vectorized, "csgraph", None)
+        monkeypatch.setattr(vectorized, "csr_matrix", None)
+    return request.param
+
+
+@needs_numpy
+@pytest.mark.parametrize("undirected", [True, False])
+@pytest.mark.parametrize("seed", range(8))
+def test_numpy_matches_python(backend, undirected, seed):
+    cg = random_graph(seed, undirected).compile()
+    for name, job in jobs(cg, random.Random(seed)).items():
+        assert as_lists(job(True)) == as_lists(job(False)), name
+
+
+@needs_numpy
+def test_bfs_matches_compiled_graph():
+    cg = random_graph(3, False).compile()
+    for s in range(len(cg)):
+        assert as_lists(vectorized.bfs(cg, s, True)) == as_lists(cg.bfs(s))
+
+
+def test_fallback_without_numpy(monkeypatch):
+    monkeypatch.setattr(vectorized, "np", None)
+    cg = random_graph(5, True).compile()
+    # vectorized=None uses the loops; asking for NumPy is an error.
+    for name, job in jobs(cg, random.Random(5)).items():
+        assert as_lists(job(None)) == as_lists(job(False)), name
+        with pytest.raises(ImportError):
+            job(True)
+    with pytest.raises(ImportError):
+        vectorized.adjacency_matrix(cg)
\ No newline at end of file
@@ -0,0 +1,312 @@
+from collections import deque
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
+
+from campus_navigator_backend import CompiledGraph
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from scipy.sparse import csgraph, csr_matrix
+except ImportError:
+    csgraph = csr_matrix = None
+
+# Whole-graph analytics over a CompiledGraph: BFS, multi-source reachability,
+# hop-distance matrices, connected components and batched shortest paths.
+# With NumPy installed they run a frontier (or a batch of sources) at a time
+# over NumPy views of the CSR arrays, handing off to scipy.sparse.csgraph
+# where SciPy is available too; without NumPy they fall back to plain loops.
+#
+# The array backend returns NumPy arrays and the fallback returns lists;
+# .tolist() of the one equals the other, node for node and hop for hop.
+# Every function takes vectorized=None (use NumPy if present), True or False.
+#
+#   bfs(cg, s)                  (order, parent) exactly as CompiledGraph.bfs
+#   levels(cg, sources)         hops from the nearest source, -1 if unreachable
+#   hop_matrix(cg, sources)     one row of hop counts per source
+#   components(cg, closed)      weak component label per node, numbered in
+#                               order of each component's first node, with
+#                               the corridors in closed treated as removed
+#   distance_matrix(cg, sources) one row of shortest distances per source
+#   adjacency_matrix(cg)        the graph as a scipy.sparse CSR matrix
+
+STATE_LIMIT = 1 << 24
+
+
+class VectorGraph:
+
+    # Zero-copy NumPy views of a CompiledGraph. Parallel edges stay in the
+    # CSR; csr() collapses them to the cheapest for matrix consumers.
+
+    def __init__(self, cg: CompiledGraph):
+        self.n = len(cg)
+        self.undirected = cg.undirected
+        self.offsets = np.frombuffer(cg.offsets, dtype=np.int64)
+        self.targets = np.frombuffer(cg.targets, dtype=np.int32)
+        self.weights = np.frombuffer(cg.weights, dtype=np.float64)
+        self.degree = np.diff(self.offsets)
+        self.tails = np.repeat(np.arange(self.n, dtype=np.int32), self.degree)
+        self._csr = None
+        self._stamp = None
+
+    def _edges_of(self, nodes) -> "np.ndarray":
+
+        # Edge indices of every node in nodes, in CSR order, node by node.
+        counts = self.degree[nodes]
+        total = int(counts.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64)
+        ends = np.cumsum(counts)
+        return np.repeat(self.offsets[nodes] - ends + counts, counts) + np.arange(total)
+
+    def csr(self) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+
+        # (indptr, indices, data) with one entry per (u, v): the cheapest of
+        # any parallel edges, columns ascending within each row.
+        if self._csr is None:
+            key = self.tails.astype(np.int64) * self.n + self.targets
+            order = np.lexsort((self.weights, key))
+            keep = np.ones(len(order), dtype=bool)
+            keep[1:] = key[order][1:] != key[order][:-1]
+            order = order[keep]
+            indptr = np.zeros(self.n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.tails[order], minlength=self.n), out=indptr[1:])
+            self._csr = (indptr, self.targets[order], self.weights[order])
+        return self._csr
+
+    def bfs(self, s: int) -> Tuple["np.ndarray", "np.ndarray"]:
+
+        # A level is the first unseen occurrence of each target among the
+        # previous level's edges, in edge order: the same queue order and
+        # parents as the deque-based search.
+        parent = np.full(self.n, -2, dtype=np.int32)
+        parent[s] = -1
+        frontier = np.array([s], dtype=np.int32)
+        order = [frontier]
+        while frontier.size:
+            e = self._edges_of(frontier)
+            t = self.targets[e]
+            fresh = parent[t] == -2
+            e, t = e[fresh], t[fresh]
+            first = np.sort(np.unique(t, return_index=True)[1])
+            frontier = t[first]
+            parent[frontier] = self.tails[e[first]]
+            order.append(frontier)
+        return np.concatenate(order), parent
+
+    def levels(self, sources: Sequence[int]) -> "np.ndarray":
+
+        hops = np.full(self.n, -1, dtype=np.int32)
+        frontier = np.unique(np.asarray(sources, dtype=np.int32))
+        hops[frontier] = 0
+        depth = 0
+        while frontier.size:
+            depth += 1
+            t = self.targets[self._edges_of(frontier)]
+            frontier = self._first(t[hops[t] == -1])
+            hops[frontier] = depth
+        return hops
+
+    def hop_matrix(self, sources: Sequence[int]) -> "np.ndarray":
+
+        sources = np.asarray(sources, dtype=np.int32)
+        if csgraph is not None:
+            hops = csgraph.shortest_path(self.sparse(), directed=True, unweighted=True, indices=sources)
+            return np.where(np.isinf(hops), -1, hops).astype(np.int32).reshape(len(sources), self.n)
+        out = np.full((len(sources), self.n), -1, dtype=np.int32)
+        for b, rows in self._batches(len(sources)):
+            flat = out[b:b + rows].reshape(-1)
+            states = np.arange(rows, dtype=np.int64) * self.n + sources[b:b + rows]
+            flat[states] = 0
+            depth = 0
+            while states.size:
+                depth += 1
+                e, keys = self._expand(states)
+                keys = self._first(keys[flat[keys] == -1])
+                flat[keys] = depth
+                states = keys
+        return out
+
+    # The batched searches below run over (source row, node) states packed
+    # as row * n + node into one flat array, so a level of every search in
+    # the batch is a single gather over the edges leaving its states.
+
+    def _batches(self, k: int) -> Iterator[Tuple[int, int]]:
+        rows = max(1, STATE_LIMIT // max(1, self.n))
+        for b in range(0, k, rows):
+            yield b, min(rows, k - b)
+
+    def _expand(self, states) -> Tuple["np.ndarray", "np.ndarray"]:
+
+        # Edge indices leaving each state's node, and the states they lead to.
+        rows, nodes = np.divmod(states, self.n)
+        e = self._edges_of(nodes)
+        return e, np.repeat(rows * self.n, self.degree[nodes]) + self.targets[e]
+
+    def _first(self, keys) -> "np.ndarray":
+
+        # keys without repeats, in O(len) rather than a sort: the slot of a
+        # repeated key keeps only one position's stamp.
+        size = int(keys.max()) + 1 if len(keys) else 0
+        if self._stamp is None or len(self._stamp) < size:
+            self._stamp = np.zeros(max(size, 2 * len(self._stamp) if self._stamp is not None else 0),
+                                   dtype=np.int64)
+        stamp = self._stamp
+        at = np.arange(len(keys))
+        stamp[keys] = at
+        return keys[stamp[keys] == at]
+
+    def components(self, closed: Iterable[Tuple[int, int]] = ()) -> "np.ndarray":
+
+        tails, heads = self.tails, self.targets
+        closed = list(closed)
+        if closed:
+            pairs = np.array(closed, dtype=np.int64).reshape(-1, 2)
+            banned = np.concatenate([pairs[:, 0] * self.n + pairs[:, 1], pairs[:, 1] * self.n + pairs[:, 0]])
+            keep = ~np.isin(tails.astype(np.int64) * self.n + heads, banned)
+            tails, heads = tails[keep], heads[keep]
+        if csgraph is not None:
+            data = np.ones(len(tails), dtype=np.int8)
+            matrix = csr_matrix((data, (tails, heads)), shape=(self.n, self.n))
+            labels = csgraph.connected_components(matrix, directed=True, connection="weak")[1]
+        else:
+            # Min-label propagation along both edge directions with pointer
+            # jumping, until every edge joins equal labels.
+            labels = np.arange(self.n)
+            while True:
+                before = labels.copy()
+                np.minimum.at(labels, tails, labels[heads])
+                np.minimum.at(labels, heads, labels[tails])
+                while True:
+                    jumped = labels[labels]
+                    if np.array_equal(jumped, labels):
+                        break
+                    labels = jumped
+                if np.array_equal(labels, before):
+                    break
+        # Renumber by each component's first node.
+        _, first, inverse = np.unique(labels, return_index=True, return_inverse=True)
+        rank = np.empty(len(first), dtype=np.int32)
+        rank[np.argsort(first)] = np.arange(len(first), dtype=np.int32)
+        return rank[inverse]
+
+    def distance_matrix(self, sources: Sequence[int]) -> "np.ndarray":
+
+        sources = np.asarray(sources, dtype=np.int32)
+        if csgraph is not None:
+            return csgraph.dijkstra(self.sparse(), directed=True, indices=sources).reshape(len(sources), self.n)
+        # Bellman-Ford for every source in the batch at once, relaxing only
+        # the edges out of states whose distance dropped in the last round.
+        dist = np.full((len(sources), self.n), np.inf)
+        for b, rows in self._batches(len(sources)):
+            flat = dist[b:b + rows].reshape(-1)
+            states = np.arange(rows, dtype=np.int64) * self.n + sources[b:b + rows]
+            flat[states] = 0.0
+            while states.size:
+                e, keys = self._expand(states)
+                cand = np.repeat(flat[states], self.degree[states % self.n]) + self.weights[e]
+                better = cand < flat[keys]
+                keys, cand = keys[better], cand[better]
+                np.minimum.at(flat, keys, cand)
+                states = self._first(keys)
+        return dist
+
+    def sparse(self):
+
+        if csr_matrix is None:
+            raise ImportError("adjacency_matrix needs SciPy")
+        indptr, indices, data = self.csr()
+        return csr_matrix((data, indices, indptr), shape=(self.n, self.n))
+
+
+def vector_graph(cg: CompiledGraph) -> VectorGraph:
+
+    # One set of views per compiled snapshot.
+    vg = getattr(cg, "_vector", None)
+    if vg is None:
+        vg = cg._vector = VectorGraph(cg)
+    return vg
+
+
+def _use_numpy(vectorized: Optional[bool]) -> bool:
+    if vectorized and np is None:
+        raise ImportError("vectorized=True needs NumPy")
+    return np is not None if vectorized is None else vectorized
+
+
+def bfs(cg: CompiledGraph, s: int, vectorized: Optional[bool] = None):
+
+    if _use_numpy(vectorized):
+        return vector_graph(cg).bfs(s)
+    return cg.bfs(s)
+
+
+def levels(cg: CompiledGraph, sources: Sequence[int], vectorized: Optional[bool] = None):
+
+    if _use_numpy(vectorized):
+        return vector_graph(cg).levels(sources)
+    offsets, targets = cg.offsets, cg.targets
+    hops = [-1] * len(cg)
+    q = deque()
+    for s in sources:
+        if hops[s] == -1:
+            hops[s] = 0
+            q.append(s)
+    while q:
+        u = q.popleft()
+        for v in targets[offsets[u]:offsets[u + 1]]:
+            if hops[v] == -1:
+                hops[v] = hops[u] + 1
+                q.append(v)
+    return hops
+
+
+def hop_matrix(cg: CompiledGraph, sources: Sequence[int], vectorized: Optional[bool] = None):
+
+    if _use_numpy(vectorized):
+        return vector_graph(cg).hop_matrix(sources)
+    return [levels(cg, [s], False) for s in sources]
+
+
+def components(cg: CompiledGraph, closed: Iterable[Tuple[int, int]] = (),
+               vectorized: Optional[bool] = None):
+
+    if _use_numpy(vectorized):
+        return vector_graph(cg).components(closed)
+    banned = set()
+    for u, v in closed:
+        banned.add((u, v))
+        banned.add((v, u))
+    offsets, targets = cg.offsets, cg.targets
+    r_offsets, r_targets, _ = cg.reverse()
+    label = [-1] * len(cg)
+    count = 0
+    for s in range(len(cg)):
+        if label[s] != -1:
+            continue
+        label[s] = count
+        stack = [s]
+        while stack:
+            u = stack.pop()
+            for v in list(targets[offsets[u]:offsets[u + 1]]) + list(r_targets[r_offsets[u]:r_offsets[u + 1]]):
+                if label[v] == -1 and (u, v) not in banned:
+                    label[v] = count
+                    stack.append(v)
+        count += 1
+    return label
+
+
+def distance_matrix(cg: CompiledGraph, sources: Sequence[int], vectorized: Optional[bool] = None):
+
+    if _use_numpy(vectorized):
+        return vector_graph(cg).distance_matrix(sources)
+    return [cg.sssp(s)[0] for s in sources]
+
+
+def adjacency_matrix(cg: CompiledGraph):
+
+    if np is None:
+        raise ImportError("adjacency_matrix needs NumPy and SciPy")
+    return vector_graph(cg).sparse()
\ No newline at end of file
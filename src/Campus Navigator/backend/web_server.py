@@ -1,38 +1,326 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
+import json
+import math
 import sys
 import os
+import random
+import re
+import time
 
 # Add the directory containing campus_navigator.py to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from campus_navigator_backend import CampusNavigator
+from campus_navigator_backend import SEARCH_STATS, CampusNavigator, parse_clock
+from metrics import LatencyHistograms, render_prometheus
+from profiling import Profile
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend requests
-navigator = CampusNavigator()
+# Set CAMPUS_NAV_ROUTE_TABLE to a file path to serve routes from a precomputed
+# all-pairs table, or CAMPUS_NAV_HIERARCHY to route with a contraction
+# hierarchy (both built on first start, memory-mapped on later ones).
+# CAMPUS_NAV_GRAPH loads the campus from an exported file or a snapshot.
+navigator = CampusNavigator(
+    graph_path=os.environ.get('CAMPUS_NAV_GRAPH'),
+    route_table_path=os.environ.get('CAMPUS_NAV_ROUTE_TABLE'),
+    hierarchy_path=os.environ.get('CAMPUS_NAV_HIERARCHY'),
+    cache_size=int(os.environ.get('CAMPUS_NAV_CACHE_SIZE', 1024)),
+    cache_ttl=float(os.environ['CAMPUS_NAV_CACHE_TTL']) if os.environ.get('CAMPUS_NAV_CACHE_TTL') else None,
+    bidirectional=os.environ.get('CAMPUS_NAV_BIDIRECTIONAL') == '1',
+)
+
+# CAMPUS_NAV_PROFILE_RATE=0.01 profiles one request in a hundred with cProfile
+# and tracemalloc, writing <time>-<pid>-<route>.pstats/.collapsed/.alloc.txt
+# under CAMPUS_NAV_PROFILE_DIR (default: profiles). Registered before the
+# latency hooks so writing the files is not counted as request time.
+profile_rate = float(os.environ.get('CAMPUS_NAV_PROFILE_RATE', 0))
+profile_dir = os.environ.get('CAMPUS_NAV_PROFILE_DIR', 'profiles')
+
+@app.before_request
+def start_profile():
+    if profile_rate and random.random() < profile_rate:
+        try:
+            g.profile = Profile().start()
+        except ValueError:
+            # Another profiler is already active; skip this sample.
+            pass
+
+@app.teardown_request
+def stop_profile(exc):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profile.stop()
+        route = re.sub(r'[^A-Za-z0-9]+', '_', request.url_rule.rule if request.url_rule else 'unmatched').strip('_')
+        profile.dump(os.path.join(profile_dir, f'{int(time.time() * 1000)}-{os.getpid()}-{route}'))
+
+# Per-route latency histograms, served with the search counters (enabled
+# with CAMPUS_NAV_METRICS=1) at /api/metrics in Prometheus text format.
+latency = LatencyHistograms()
+
+@app.before_request
+def start_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_latency(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        latency.observe(route, request.method, response.status_code, time.perf_counter() - started)
+    return response
+
+# serve.py sets this to an EditJournal when it runs several worker processes:
+# /api/edges then goes through the journal and every worker replays batches
+# it has not seen before handling a request, so edits reach all of them.
+edit_journal = None
+
+@app.before_request
+def sync_edits():
+    if edit_journal is not None:
+        edit_journal.sync()
+
+@app.route('/api/metrics')
+def metrics():
+    return Response(render_prometheus(latency, SEARCH_STATS, navigator.route_cache),
+                    mimetype='text/plain; version=0.0.4')
+
+@app.route('/healthz')
+def healthz():
+    # Kept trivial so load balancers get an answer even under load.
+    return {'status': 'ok', 'version': navigator.graph.version}
+
+# Most routes /api/shortest-path returns for "alternatives"; each one costs
+# up to K_SHORTEST_SCAN spur rounds, so the client may not pick any k.
+MAX_ALTERNATIVES = 5
+
+def parse_alternatives(data):
+    # (k, max_overlap) from a request body, or an error message.
+    k = data.get('alternatives')
+    if k is None:
+        k = 1
+    if isinstance(k, bool) or not isinstance(k, int) or not 1 <= k <= MAX_ALTERNATIVES:
+        return None, None, f'"alternatives" must be a whole number from 1 to {MAX_ALTERNATIVES}'
+    overlap = data.get('max_overlap', navigator.ALTERNATIVE_MAX_OVERLAP)
+    if overlap is not None:
+        if isinstance(overlap, bool) or not isinstance(overlap, (int, float)) or not 0 < overlap <= 1:
+            return None, None, '"max_overlap" must be a number above 0 and at most 1, or null'
+        overlap = float(overlap)
+    return k, overlap, None
 
 @app.route('/api/shortest-path', methods=['POST'])
 def shortest_path():
+    # Optional "profile" (see /api/profiles) and "at" ("HH:MM") restrict the
+    # route, e.g. to step-free paths or to corridors open at that time.
     data = request.json
-    success, result, distance = navigator.find_shortest_path(
-        data['start'], data['end']
-    )
+    try:
+        at = parse_clock(data['at']) if data.get('at') not in (None, '') else None
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': f"Invalid time: {data['at']}"}), 400
+    k, overlap, error = parse_alternatives(data)
+    if error:
+        return jsonify({'success': False, 'error': error}), 400
+    route = navigator.find_shortest_path(data['start'], data['end'], data.get('profile') or None, at)
     
-    if success:
-        # Extract path from result string
-        # "Shortest path A -> B: A -> C -> B (distance=X)"
-        path_part = result.split(': ')[1].split(' (distance=')[0]
-        path = path_part.split(' -> ')
-        
-        return jsonify({
+    if route.success:
+        result = {
             'success': True,
-            'path': path,
-            'distance': distance,
-            'formatted': result
-        })
+            'path': route.path,
+            'distance': route.distance,
+            'hops': route.hops,
+            'formatted': route.format()
+        }
+        # "alternatives": k adds up to k routes, this one first. Each shares
+        # at most "max_overlap" of its length with an earlier one (default
+        # 0.8; null lists the plain k shortest).
+        if k > 1:
+            routes = navigator.alternative_routes(data['start'], data['end'], k, data.get('profile') or None, at,
+                                                  overlap)
+            result['routes'] = [{'path': r.path, 'distance': r.distance, 'hops': r.hops} for r in routes]
+        return jsonify(result)
+    
+    return jsonify({'success': False, 'error': route.error})
+
+@app.route('/api/profiles')
+def profiles():
+    return jsonify([
+        {'name': p.name, 'avoid': sorted(p.avoid), 'penalties': dict(p.penalties), 'respect_hours': p.respect_hours}
+        for p in navigator.profiles.values()
+    ])
+
+# Largest sources x targets matrix one request may ask for; every source is
+# a full search, so an unbounded matrix could occupy a worker indefinitely.
+MAX_MATRIX_CELLS = 100_000
+
+def is_name_list(value):
+    return isinstance(value, list) and len(value) > 0 and all(isinstance(name, str) for name in value)
+
+@app.route('/api/distance-matrix', methods=['POST'])
+def distance_matrix():
+    # Body: {"sources": [...], "targets": [...]}; targets default to sources.
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'error': 'Expected a JSON object'}), 400
+    sources = data.get('sources')
+    targets = data.get('targets')
+    if targets is None:
+        targets = sources
+    if not is_name_list(sources) or not is_name_list(targets):
+        return jsonify({'success': False, 'error': '"sources" and "targets" must be non-empty lists of names'}), 400
+    if len(sources) * len(targets) > MAX_MATRIX_CELLS:
+        return jsonify({'success': False,
+                        'error': f'At most {MAX_MATRIX_CELLS} source/target pairs per request'}), 400
+    unknown = sorted({name for name in sources + targets if name not in navigator.graph.compile().index})
+    if unknown:
+        return jsonify({'success': False, 'error': f"Unknown locations: {', '.join(unknown)}"})
     
-    return jsonify({'success': False, 'error': result})
+    # Stream one row per source; unreachable pairs are null.
+    def generate():
+        yield json.dumps({'success': True, 'sources': sources, 'targets': targets}, separators=(',', ':'))[:-1]
+        yield ',"distances":['
+        for i, row in enumerate(navigator.distance_matrix(sources, targets)):
+            cells = [d if d != float('inf') else None for d in row]
+            yield (',' if i else '') + json.dumps(cells, separators=(',', ':'))
+        yield ']}'
+    
+    return Response(generate(), mimetype='application/json')
+
+# Visits per chunk of a streamed traversal.
+TRAVERSE_CHUNK = 256
+
+TRAVERSE_ALGORITHMS = ('bfs', 'dfs', 'dijkstra')
+
+def parse_limit(data, key, whole):
+    # A non-negative, finite limit (or None when absent), or an error message.
+    value = data.get(key)
+    if value is None:
+        return None, None
+    error = f'"{key}" must be a non-negative {"whole number" if whole else "number"}'
+    if isinstance(value, bool):
+        return None, error
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None, error
+    if not math.isfinite(number) or number < 0 or (whole and not number.is_integer()):
+        return None, error
+    return (int(number) if whole else number), None
+
+@app.route('/api/traverse', methods=['POST'])
+def traverse():
+    # Body: {"algorithm": "bfs"|"dfs"|"dijkstra", "start", "destination",
+    # "max_hops", "max_distance"}; all but start are optional. Visits are
+    # streamed as they are found, TRAVERSE_CHUNK at a time, and "found"
+    # comes last since it is only known once the walk ends.
+    data = request.json
+    algorithm = data.get('algorithm', 'bfs')
+    if algorithm not in TRAVERSE_ALGORITHMS:
+        return jsonify({'success': False, 'error': f'Unknown algorithm: {algorithm}'}), 400
+    destination = data.get('destination') or None
+    max_hops, error = parse_limit(data, 'max_hops', whole=True)
+    if error is None:
+        max_distance, error = parse_limit(data, 'max_distance', whole=False)
+    if error:
+        return jsonify({'success': False, 'error': error}), 400
+    visits = navigator.traverse(algorithm, data.get('start'), destination, max_hops, max_distance)
+    if visits is None:
+        return jsonify({'success': False, 'error': 'Invalid start location'})
+
+    def generate():
+        yield json.dumps({'success': True, 'algorithm': algorithm, 'start': data['start'],
+                          'destination': destination}, separators=(',', ':'))[:-1]
+        yield ',"visits":['
+        found = False
+        chunk = []
+        for i, (node, depth, parent) in enumerate(visits):
+            found = found or node == destination
+            chunk.append((',' if i else '') + json.dumps({'node': node, 'depth': depth, 'parent': parent},
+                                                         separators=(',', ':')))
+            if len(chunk) == TRAVERSE_CHUNK:
+                yield ''.join(chunk)
+                chunk = []
+        yield ''.join(chunk) + f'],"found":{json.dumps(found)}}}'
+
+    return Response(generate(), mimetype='application/json')
+
+@app.route('/api/routes-from/<start>')
+def routes_from(start):
+    routes = navigator.routes_from(start)
+    if routes is None:
+        return jsonify({'success': False, 'error': 'Invalid start location'})
+    
+    return jsonify({
+        'success': True,
+        'start': start,
+        'routes': [
+            {'destination': r.destination, 'distance': r.distance, 'path': r.path, 'hops': r.hops}
+            for r in routes
+        ]
+    })
+
+EDIT_ACTIONS = ('update', 'disable', 'enable')
+
+def parse_edits(data):
+    # [(action, from, to, weight)] for a request body, or an error message.
+    # Everything is checked before any edit is applied.
+    edits = data.get('edits', [data]) if isinstance(data, dict) else None
+    if not isinstance(edits, list) or not edits:
+        return None, 'Expected an edit or {"edits": [...]}'
+    parsed = []
+    for k, edit in enumerate(edits):
+        if not isinstance(edit, dict):
+            return None, f'Edit {k} is not an object'
+        action = edit.get('action', 'update')
+        if action not in EDIT_ACTIONS:
+            return None, f'Unknown action: {action}'
+        start, end = edit.get('from'), edit.get('to')
+        if not isinstance(start, str) or not isinstance(end, str):
+            return None, f'Edit {k} needs "from" and "to" locations'
+        weight = None
+        if action == 'update':
+            try:
+                weight = float(edit['weight'])
+            except (KeyError, TypeError, ValueError):
+                return None, f'Edit {k} needs a numeric "weight"'
+            if not math.isfinite(weight) or weight < 0:
+                return None, f'Invalid weight: {edit["weight"]}'
+        parsed.append((action, start, end, weight))
+    return parsed, None
+
+def apply_edits(edits):
+    # Applies parsed edits (or their journalled JSON form) as one batch;
+    # True for each edit that took effect.
+    results = []
+    with navigator.graph.edit():
+        for action, start, end, weight in edits:
+            if action == 'update':
+                results.append(navigator.update_edge(start, end, weight))
+            elif action == 'disable':
+                results.append(navigator.disable_edge(start, end))
+            else:
+                results.append(navigator.enable_edge(start, end))
+    return results
+
+@app.route('/api/edges', methods=['POST'])
+def edit_edges():
+    # Body is one edit or {"edits": [...]}, each {"from", "to", "action",
+    # "weight"} with action update (default), disable or enable. A batch is
+    # applied atomically: queries see either none or all of it, and a batch
+    # with any malformed edit is rejected with 400 before anything changes.
+    # "applied" is false for edits naming an edge that is not there.
+    edits, error = parse_edits(request.get_json(silent=True))
+    if error:
+        return jsonify({'success': False, 'error': error}), 400
+    results = apply_edits(edits) if edit_journal is None else edit_journal.record(edits)
+    return jsonify({
+        'success': all(results),
+        'applied': results,
+        'version': navigator.graph.version
+    })
+
+@app.route('/api/edges/disabled')
+def disabled_edges():
+    return jsonify([{'from': u, 'to': v, 'weight': w} for u, v, w in navigator.disabled_edges()])
 
 @app.route('/api/locations')
 def get_locations():
@@ -43,6 +331,16 @@ def search_location(location):
     found = navigator.search_location(location)
     return jsonify({'found': found, 'query': location})
 
+@app.route('/api/autocomplete')
+def autocomplete():
+    query = request.args.get('q', '')
+    limit = request.args.get('limit', 10, type=int)
+    return jsonify({'query': query, 'matches': navigator.autocomplete(query, limit)})
+
+@app.route('/api/cache-stats')
+def cache_stats():
+    return jsonify(navigator.route_cache.stats())
+
 @app.route('/api/algorithm', methods=['POST'])
 def run_algorithm():
     data = request.json
@@ -52,32 +350,33 @@ def run_algorithm():
     
     try:
         if algorithm == 'bfs':
-            if destination and destination.strip():
-                # BFS with destination - get both order and path
-                success, result = navigator.bfs_traversal(start, destination)
-            else:
-                # BFS without destination - just traversal order
-                success, result = navigator.bfs_traversal(start)
-            
+            # With a destination the result carries both the order and the path
+            traversal = navigator.bfs_traversal(start, destination if destination and destination.strip() else None)
             return jsonify({
-                'success': success, 
-                'result': result, 
+                'success': traversal.success, 
+                'result': traversal.format(), 
+                'order': traversal.order,
+                'path': traversal.path,
+                'hops': traversal.hops,
                 'title': 'BFS Result'
             })
             
         elif algorithm == 'dfs':
-            success, result = navigator.dfs_traversal(start)
+            traversal = navigator.dfs_traversal(start)
             return jsonify({
-                'success': success, 
-                'result': result, 
+                'success': traversal.success, 
+                'result': traversal.format(), 
+                'order': traversal.order,
                 'title': 'DFS Result'
             })
             
         elif algorithm == 'mst':
-            success, result = navigator.get_minimum_spanning_tree()
+            tree = navigator.get_minimum_spanning_tree()
             return jsonify({
-                'success': success, 
-                'result': result, 
+                'success': tree.success, 
+                'result': tree.format(), 
+                'total': tree.total,
+                'edges': [{'from': u, 'to': v, 'weight': w} for u, v, w in tree.edges],
                 'title': 'MST Result'
             })
             
@@ -85,4 +384,5 @@ def run_algorithm():
         return jsonify({'success': False, 'error': str(e)})
 
 if __name__ == '__main__':
+    # Development server with the reloader; use serve.py in production.
     app.run(debug=True, port=5000, host='0.0.0.0')
\ No newline at end of file